@@ -39,6 +39,7 @@ from rally.deployment import engine as deploy_engine
 from rally import exceptions
 from rally.task import engine
 from rally.task import exporter as texporter
+from rally.task.processing import stats
 from rally.verification import context as vcontext
 from rally.verification import manager as vmanager
 from rally.verification import reporter as vreporter
@@ -269,14 +270,18 @@ class _Task(APIGroup):
         return [task.to_dict() for task in objects.Task.list(**filters)]
 
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/get", method="GET")
-    def get(self, task_id, detailed=False):
+    def get(self, task_id, detailed=False, lazy_data=False):
         """Get task data
 
         :param task_id: Task UUID
         :param detailed: whether return detailed information(including
             subtasks and workloads) or not.
+        :param lazy_data: whether return raw data of workloads as lazy
+            iterables, which load the data from the database chunk by chunk
+            only when they are iterated over, or not.
         """
-        return objects.Task.get(task_id, detailed=detailed).to_dict()
+        return objects.Task.get(task_id, detailed=detailed,
+                                lazy_data=lazy_data).to_dict()
 
     # TODO(andreykurilin): move it to some kind of utils
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/render_template",
@@ -553,23 +558,22 @@ class _Task(APIGroup):
                     position=workload["position"], runner=workload["runner"],
                     context=workload["context"], hooks=workload["hooks"],
                     sla=workload["sla"], args=workload["args"])
-            chunk_size = CONF.raw_result_chunk_size
-            workload_data_count = 0
-            while len(workload["data"]) > chunk_size:
-                results_chunk = workload["data"][:chunk_size]
-                workload["data"] = workload["data"][chunk_size:]
-                results_chunk.sort(key=lambda x: x["timestamp"])
-                workload_obj.add_workload_data(workload_data_count,
-                                               {"raw": results_chunk})
-                workload_data_count += 1
-            workload_obj.add_workload_data(workload_data_count,
-                                           {"raw": workload["data"]})
-            workload_obj.set_results(
-                sla_results=workload["sla_results"].get("sla"),
-                hooks_results=workload["hooks"],
-                start_time=workload["start_time"],
-                full_duration=workload["full_duration"],
-                load_duration=workload["load_duration"])
+                workload_stats = stats.WorkloadStats()
+                chunks = utils.iterate_chunks(workload["data"],
+                                              CONF.raw_result_chunk_size)
+                for chunk_order, results_chunk in enumerate(chunks):
+                    for iteration in results_chunk:
+                        workload_stats.add_iteration(iteration)
+                    results_chunk.sort(key=lambda x: x["timestamp"])
+                    workload_obj.add_workload_data(chunk_order,
+                                                   {"raw": results_chunk})
+                workload_obj.set_results(
+                    sla_results=workload["sla_results"].get("sla"),
+                    hooks_results=workload["hooks"],
+                    start_time=workload["start_time"],
+                    full_duration=workload["full_duration"],
+                    load_duration=workload["load_duration"],
+                    stats=workload_stats.to_dict())
             subtask_obj.update_status(consts.SubtaskStatus.FINISHED)
         task_inst.update_status(consts.SubtaskStatus.FINISHED)
 
@@ -589,7 +593,9 @@ class _Task(APIGroup):
 
         tasks_results = []
         for task_uuid in tasks_uuids:
-            tasks_results.append(self.get(task_id=task_uuid, detailed=True))
+            tasks_results.append(
+                self.get(task_id=task_uuid, detailed=True,
+                         lazy_data=not self.api.endpoint_url))
 
         reporter_cls = texporter.TaskExporter.get(output_type)
         reporter_cls.validate(output_dest)
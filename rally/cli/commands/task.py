@@ -22,9 +22,11 @@ import itertools
 import json
 import os
 import sys
+import tempfile
 import webbrowser
 
 import jsonschema
+from oslo_config import cfg
 from oslo_utils import uuidutils
 import six
 
@@ -32,6 +34,7 @@ from rally.cli import cliutils
 from rally.cli import envutils
 from rally.common import fileutils
 from rally.common.i18n import _
+from rally.common.io import json_stream
 from rally.common.io import junit
 from rally.common import logging
 from rally.common import utils as rutils
@@ -47,6 +50,7 @@ from rally.task.processing import utils as putils
 from rally.task import utils as tutils
 
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
@@ -310,7 +314,7 @@ class TaskCommands(object):
         :param task_id: str, task uuid
         :param iterations_data: bool, include results for each iteration
         """
-        task = api.task.get(task_id=task_id, detailed=True)
+        task = self._get_task_with_data(api, task_id)
 
         if not task:
             print("The task %s can not be found" % task_id)
@@ -482,7 +486,7 @@ class TaskCommands(object):
 
         :param task_id: Task uuid
         """
-        task = api.task.get(task_id=task_id, detailed=True)
+        task = self._get_task_with_data(api, task_id)
         finished_statuses = (consts.TaskStatus.FINISHED,
                              consts.TaskStatus.ABORTED)
         if task["status"] not in finished_statuses:
@@ -491,13 +495,15 @@ class TaskCommands(object):
             return 1
 
         # TODO(chenhb): Ensure `rally task results` puts out old format.
-        for workload in itertools.chain(
-                *[s["workloads"] for s in task["subtasks"]]):
-            for itr in workload["data"]:
+        def format_data(data):
+            result = []
+            for itr in data:
                 itr["atomic_actions"] = collections.OrderedDict(
                     tutils.WrapperForAtomicActions(
                         itr["atomic_actions"]).items()
                 )
+                result.append(itr)
+            return result
 
         results = [
             {
@@ -513,7 +519,7 @@ class TaskCommands(object):
                         "hooks": [r["config"] for r in w["hooks"]],
                     }
                 },
-                "result": w["data"],
+                "result": format_data(w["data"]),
                 "sla": w["sla_results"].get("sla", []),
                 "hooks": w["hooks"],
                 "load_duration": w["load_duration"],
@@ -603,9 +609,54 @@ class TaskCommands(object):
                 print(_("There are no tasks. To run a new task, use:\n"
                         "\trally task start"))
 
-    def _load_task_results_file(self, api, task_id):
-        """Load the json file which is created by `rally task results` """
+    @staticmethod
+    def _make_workload(result, start_time):
+        """Convert a workload result of the old format except iterations."""
+        updated_at = dt.datetime.strptime(result["created_at"],
+                                          "%Y-%m-%dT%H:%M:%S")
+        updated_at += dt.timedelta(seconds=result["full_duration"])
+        updated_at = updated_at.strftime(consts.TimeFormat.ISO8601)
+        pass_sla = all(s.get("success") for s in result["sla"])
+        return {"name": result["key"]["name"],
+                "position": result["key"]["pos"],
+                "description": result["key"].get("description", ""),
+                "full_duration": result["full_duration"],
+                "load_duration": result["load_duration"],
+                "start_time": start_time,
+                "created_at": result["created_at"],
+                "updated_at": updated_at,
+                "args": result["key"]["kw"]["args"],
+                "runner": result["key"]["kw"]["runner"],
+                "hooks": [{"config": h}
+                          for h in result["key"]["kw"]["hooks"]],
+                "sla": result["key"]["kw"]["sla"],
+                "sla_results": {"sla": result["sla"]},
+                "pass_sla": pass_sla,
+                "context": result["key"]["kw"]["context"]}
+
+    @staticmethod
+    def _get_task_with_data(api, task_id):
+        """Get a detailed task with its workload data.
+
+        The data is loaded lazily unless the task is got from the remote Rally
+        instance, which can not transfer lazily loaded data.
+        """
+        return api.task.get(task_id=task_id, detailed=True,
+                            lazy_data=not api.endpoint_url)
+
+    def _load_task_results_file(self, api, task_id, lazy=False):
+        """Load the json file which is created by `rally task results`
+
+        :param lazy: if True and the file is in JSON, it is parsed
+            incrementally while subtasks and iterations of the result are
+            iterated over. The result can be iterated over only once and
+            contains only data required to import it.
+        """
         with open(os.path.expanduser(task_id)) as inp_js:
+            if lazy and json_stream.JSONStreamReader(inp_js).peek() == "[":
+                return {"subtasks": self._iter_task_results_file(api,
+                                                                 task_id)}
+            inp_js.seek(0)
             tasks_results = yaml.safe_load(inp_js)
 
         if type(tasks_results) == list:
@@ -671,44 +722,73 @@ class TaskCommands(object):
                 for itr in result["result"]:
                     durations_stat.add_iteration(itr)
 
-                updated_at = dt.datetime.strptime(result["created_at"],
-                                                  "%Y-%m-%dT%H:%M:%S")
-                updated_at += dt.timedelta(seconds=result["full_duration"])
-                updated_at = updated_at.strftime(consts.TimeFormat.ISO8601)
-                pass_sla = all(s.get("success") for s in result["sla"])
-                workload = {"name": result["key"]["name"],
-                            "position": result["key"]["pos"],
-                            "description": result["key"].get("description",
-                                                             ""),
-                            "full_duration": result["full_duration"],
-                            "load_duration": result["load_duration"],
-                            "total_iteration_count": iter_count,
-                            "failed_iteration_count": failed_iter_count,
-                            "min_duration": min_duration,
-                            "max_duration": max_duration,
-                            "start_time": start_time,
-                            "created_at": result["created_at"],
-                            "updated_at": updated_at,
-                            "args": result["key"]["kw"]["args"],
-                            "runner": result["key"]["kw"]["runner"],
-                            "hooks": [{"config": h}
-                                      for h in result["key"]["kw"]["hooks"]],
-                            "sla": result["key"]["kw"]["sla"],
-                            "sla_results": {"sla": result["sla"]},
-                            "pass_sla": pass_sla,
-                            "context": result["key"]["kw"]["context"],
-                            "data": sorted(result["result"],
-                                           key=lambda x: x["timestamp"]),
-                            "statistics": {
-                                "durations": durations_stat.to_dict(),
-                                "atomics": atomics},
-                            }
+                workload = self._make_workload(result, start_time)
+                workload.update({
+                    "total_iteration_count": iter_count,
+                    "failed_iteration_count": failed_iter_count,
+                    "min_duration": min_duration,
+                    "max_duration": max_duration,
+                    "data": sorted(result["result"],
+                                   key=lambda x: x["timestamp"]),
+                    "statistics": {
+                        "durations": durations_stat.to_dict(),
+                        "atomics": atomics}})
                 task["subtasks"].append({"workloads": [workload]})
             return task
         else:
             raise FailedToLoadResults(
                 source=task_id, msg="Wrong format")
 
+    def _iter_task_results_file(self, api, task_id):
+        """Parse the json file in the old format incrementally.
+
+        Other fields of a workload result can follow its iterations, so
+        the iterations are spooled to a temporary file while the workload
+        result is parsed.
+        """
+        # NOTE: jsonschema.validate checks the schema itself on each call,
+        #     so a validator is created once for all iterations
+        iteration_validator = jsonschema.Draft4Validator(
+            api.task.TASK_RESULT_SCHEMA["properties"]["result"]["items"])
+        start_time = float("inf")
+        with open(os.path.expanduser(task_id)) as inp_js:
+            reader = json_stream.JSONStreamReader(inp_js)
+            try:
+                for i in reader.iter_array(decode=False):
+                    with tempfile.TemporaryFile(mode="w+") as spool:
+                        result = {}
+                        for key in reader.iter_object():
+                            if key != "result":
+                                result[key] = reader.read_value()
+                                continue
+                            result[key] = []
+                            for itr in reader.iter_array():
+                                iteration_validator.validate(itr)
+                                if itr["timestamp"] < start_time:
+                                    start_time = itr["timestamp"]
+                                spool.write(json.dumps(itr) + "\n")
+                        jsonschema.validate(result,
+                                            api.task.TASK_RESULT_SCHEMA)
+                        spool.seek(0)
+                        workload = self._make_workload(result, start_time)
+                        workload["data"] = self._iter_spooled_iterations(
+                            spool)
+                        yield {"workloads": [workload]}
+                reader.check_end()
+            except (jsonschema.ValidationError, ValueError) as e:
+                raise FailedToLoadResults(source=task_id,
+                                          msg=six.text_type(e))
+
+    @staticmethod
+    def _iter_spooled_iterations(spool):
+        for line in spool:
+            itr = json.loads(line)
+            # NOTE(chenhb): back compatible for atomic_actions
+            itr["atomic_actions"] = list(
+                tutils.WrapperForAtomicActions(itr["atomic_actions"],
+                                               itr["timestamp"]))
+            yield itr
+
     @cliutils.args("--out", metavar="<path>",
                    type=str, dest="out", required=False,
                    help="Path to output file.")
@@ -731,7 +811,7 @@ class TaskCommands(object):
             if os.path.exists(os.path.expanduser(task_id)):
                 task_results = self._load_task_results_file(api, task_id)
             elif uuidutils.is_uuid_like(task_id):
-                task_results = api.task.get(task_id=task_id, detailed=True)
+                task_results = self._get_task_with_data(api, task_id)
             else:
                 print(_("ERROR: Invalid UUID or file name passed: %s")
                       % task_id, file=sys.stderr)
@@ -807,7 +887,7 @@ class TaskCommands(object):
             if os.path.exists(os.path.expanduser(task_file_or_uuid)):
                 task = self._load_task_results_file(api, task_file_or_uuid)
             elif uuidutils.is_uuid_like(task_file_or_uuid):
-                task = api.task.get(task_id=task_file_or_uuid, detailed=True)
+                task = self._get_task_with_data(api, task_file_or_uuid)
             else:
                 print(_("ERROR: Invalid UUID or file name passed: %s"
                         ) % task_file_or_uuid,
@@ -824,8 +904,19 @@ class TaskCommands(object):
             results.append(task)
 
         if out_format.startswith("html"):
-            result = plot.plot(results,
-                               include_libs=(out_format == "html_static"))
+            include_libs = (out_format == "html_static")
+            if out:
+                # NOTE: write the report workload by workload to not keep
+                #     the whole report in memory
+                output_file = os.path.expanduser(out)
+                with open(output_file, "w+") as f:
+                    plot.write_plot(results, f, include_libs=include_libs,
+                                    workers=CONF.report_workers)
+                if open_it:
+                    webbrowser.open_new_tab("file://" + os.path.realpath(out))
+                return
+            result = plot.plot(results, include_libs=include_libs,
+                               workers=CONF.report_workers)
         elif out_format == "junit-xml":
             test_suite = junit.JUnit("Rally test suite")
             for task in results:
@@ -904,7 +995,7 @@ class TaskCommands(object):
         :param task_id: Task uuid.
         :returns: Number of failed criteria.
         """
-        task = api.task.get(task_id=task_id, detailed=True)
+        task = self._get_task_with_data(api, task_id)
         failed_criteria = 0
         data = []
         STATUS_PASS = "PASS"
@@ -974,9 +1065,8 @@ class TaskCommands(object):
                 output_file = os.path.expanduser(path)
                 with open(output_file, "w+") as f:
                     f.write(report["files"][path])
-                if open_it:
-                    if "open" in report:
-                        webbrowser.open_new_tab(report["open"])
+        if open_it and "open" in report:
+            webbrowser.open_new_tab(report["open"])
 
         if "print" in report:
             print(report["print"])
@@ -1023,7 +1113,10 @@ class TaskCommands(object):
         """
 
         if os.path.exists(os.path.expanduser(task_file)):
-            tasks_results = self._load_task_results_file(api, task_file)
+            # NOTE: results are passed to the remote Rally instance as a
+            #     whole, so they can be parsed incrementally only locally
+            tasks_results = self._load_task_results_file(
+                api, task_file, lazy=not api.endpoint_url)
             task = api.task.import_results(deployment=deployment,
                                            task_results=tasks_results,
                                            tags=tags)
@@ -0,0 +1,70 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Helpers for code which runs in asyncio event loop."""
+
+from rally.common import logging
+
+try:
+    import asyncio
+except ImportError:
+    # NOTE: asyncio is a part of standard library since Python 3.4
+    asyncio = None
+
+
+LOG = logging.getLogger(__name__)
+
+# finalizers of resources bound to the event loop, per loop
+_finalizers = {}
+
+
+def ensure_future(coro_or_future, loop):
+    """Wrap a coroutine or an awaitable into asyncio Future."""
+    # NOTE: asyncio.async was renamed to asyncio.ensure_future in Python
+    #     3.4.4 and `async` is a reserved keyword since Python 3.7
+    func = getattr(asyncio, "ensure_future", None) or getattr(asyncio,
+                                                              "async")
+    return func(coro_or_future, loop=loop)
+
+
+def add_finalizer(loop, finalizer):
+    """Register a function to release a resource bound to the event loop.
+
+    Finalizers are called by close_loop() before the loop is closed.
+
+    :param loop: event loop
+    :param finalizer: function without arguments. If it returns an awaitable
+        object (for example, a coroutine), it is run until complete
+    """
+    _finalizers.setdefault(loop, []).append(finalizer)
+
+
+def close_loop(loop):
+    """Call finalizers registered for the event loop and close it.
+
+    :param loop: event loop
+    """
+    try:
+        for finalizer in _finalizers.pop(loop, []):
+            try:
+                result = finalizer()
+                if result is not None:
+                    loop.run_until_complete(ensure_future(result, loop))
+            except Exception as e:
+                LOG.warning("Failed to release a resource of the event "
+                            "loop: %s" % e)
+                if logging.is_debug():
+                    LOG.exception(e)
+    finally:
+        loop.close()
@@ -16,12 +16,26 @@
 import collections
 import threading
 
+from six.moves import queue as Queue
+
 from rally.common.i18n import _LW
 from rally.common import logging
 
 
 LOG = logging.getLogger(__name__)
 
+# NOTE: a marker which tells a pipelined consumer to stop
+_STOP = object()
+
+
+def _consume(consume, cache, args):
+    try:
+        consume(cache, args)
+    except Exception as e:
+        LOG.warning(_LW("Failed to consume a task from the queue: %s") % e)
+        if logging.is_debug():
+            LOG.exception(e)
+
 
 def _consumer(consume, queue):
     """Infinity worker that consumes tasks from queue.
@@ -39,12 +53,7 @@ def _consumer(consume, queue):
             except IndexError:
                 # consumed by other thread
                 continue
-        try:
-            consume(cache, args)
-        except Exception as e:
-            LOG.warning(_LW("Failed to consume a task from the queue: %s") % e)
-            if logging.is_debug():
-                LOG.exception(e)
+        _consume(consume, cache, args)
 
 
 def _publisher(publish, queue):
@@ -61,6 +70,50 @@ def _publisher(publish, queue):
             LOG.exception(e)
 
 
+class _PipelineQueue(Queue.Queue):
+    """Bounded queue which can be filled by publish() like a deque."""
+
+    def append(self, item):
+        self.put(item)
+
+
+def _pipelined_consumer(consume, queue):
+    """Worker that consumes tasks from queue until it gets a stop marker.
+
+    :param consume: method that consumes an object taken from the queue
+    :param queue: _PipelineQueue object to get objects from
+    """
+    cache = {}
+    while True:
+        args = queue.get()
+        if args is _STOP:
+            break
+        _consume(consume, cache, args)
+
+
+def _pipelined_publisher(publishers, queue):
+    """Worker that calls publish methods until there are no more of them.
+
+    :param publishers: deque object to popleft() publish methods from
+    :param queue: _PipelineQueue object to be filled by publish methods
+    """
+    while True:
+        try:
+            publish = publishers.popleft()
+        except IndexError:
+            break
+        _publisher(publish, queue)
+
+
+def _start_threads(count, target, args):
+    threads = []
+    for i in range(count):
+        thread = threading.Thread(target=target, args=args)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
 def run(publish, consume, consumers_count=1):
     """Run broker.
 
@@ -76,11 +129,38 @@ def run(publish, consume, consumers_count=1):
     queue = collections.deque()
     _publisher(publish, queue)
 
-    consumers = []
-    for i in range(consumers_count):
-        consumer = threading.Thread(target=_consumer, args=(consume, queue))
-        consumer.start()
-        consumers.append(consumer)
+    for consumer in _start_threads(consumers_count, _consumer,
+                                   (consume, queue)):
+        consumer.join()
 
+
+def run_pipelined(publishers, consume, consumers_count=1, publishers_count=1,
+                  queue_size=0):
+    """Run broker with publishers and consumers working at the same time.
+
+    Unlike run(), consumers are started at once and process values while
+    they are still being published. Each of publishers is called once by one
+    of publishers threads. When all publishers are finished, consumers
+    process the rest of values from the queue and stop.
+
+    :param publishers: Functions that put values to the queue
+    :param consume: Function that processes a single value from the queue
+    :param consumers_count: Number of consumers
+    :param publishers_count: Number of threads to call publishers
+    :param queue_size: Maximum number of values in the queue. Publishers are
+        blocked while the queue is full. Zero means unlimited size.
+    """
+    queue = _PipelineQueue(queue_size)
+    consumers = _start_threads(consumers_count, _pipelined_consumer,
+                               (consume, queue))
+
+    publishers = collections.deque(publishers)
+    for publisher in _start_threads(min(publishers_count, len(publishers)),
+                                    _pipelined_publisher,
+                                    (publishers, queue)):
+        publisher.join()
+
+    for consumer in consumers:
+        queue.put(_STOP)
     for consumer in consumers:
         consumer.join()
@@ -69,6 +69,15 @@ def engine_reset():
     get_impl().engine_reset()
 
 
+def engine_reset_after_fork():
+    """Reset DB engine inherited by a forked process.
+
+    The forked process connects to the database on its own, while
+    connections of the parent process are left intact.
+    """
+    get_impl().engine_reset_after_fork()
+
+
 def schema_cleanup():
     """Drop DB schema. This method drops existing database."""
     get_impl().schema_cleanup()
@@ -94,15 +103,17 @@ def schema_stamp(revision):
     return get_impl().schema_stamp(revision)
 
 
-def task_get(uuid, detailed=False):
+def task_get(uuid, detailed=False, load_data=True):
     """Returns task by uuid.
 
     :param uuid: UUID of the task.
     :param detailed: whether return results of task or not (Defaults to False).
+    :param load_data: whether load raw data of workloads or not. It makes
+        sense only for detailed task (Defaults to True).
     :raises TaskNotFound: if the task does not exist.
     :returns: task dict with data on the task.
     """
-    task = get_impl().task_get(uuid, detailed=detailed)
+    task = get_impl().task_get(uuid, detailed=detailed, load_data=load_data)
     if detailed:
         for subtask in task["subtasks"]:
             for workload in subtask["workloads"]:
@@ -256,8 +267,32 @@ def workload_data_create(task_uuid, workload_uuid, chunk_order, data):
                                            chunk_order, data)
 
 
+def workload_data_create_many(task_uuid, workload_uuid, chunks):
+    """Create several workload data chunks in one transaction.
+
+    :param task_uuid: string with UUID of Task instance.
+    :param workload_uuid: string with UUID of Workload instance.
+    :param chunks: list of (chunk_order, data) pairs, where data is a dict
+        with record values on the workload data.
+    """
+    return get_impl().workload_data_create_many(task_uuid, workload_uuid,
+                                                chunks)
+
+
+def workload_data_get_iter(workload_uuid):
+    """Iterate over raw data of a workload.
+
+    Chunks of the workload data are loaded only when the iteration reaches
+    them and merged, so only chunks overlapping in time are kept in memory.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :returns: iterator over iteration results ordered by timestamp
+    """
+    return get_impl().workload_data_get_iter(workload_uuid)
+
+
 def workload_set_results(workload_uuid, subtask_uuid, task_uuid, load_duration,
-                         full_duration, start_time, sla_results,
+                         full_duration, start_time, sla_results, stats,
                          hooks_results=None):
     """Set workload results.
 
@@ -269,6 +304,8 @@ def workload_set_results(workload_uuid, subtask_uuid, task_uuid, load_duration,
         generating load, executing contexts and etc)
     :param start_time: a timestamp of load start
     :param sla_results: a list with Workload's SLA results
+    :param stats: a dict with statistics of Workload's iterations (see
+        rally.task.processing.stats.WorkloadStats.to_dict)
     :param hooks_results: a list with Workload's Hooks results
     :returns: a dict with data on the workload.
     """
@@ -279,6 +316,7 @@ def workload_set_results(workload_uuid, subtask_uuid, task_uuid, load_duration,
                                            full_duration=full_duration,
                                            start_time=start_time,
                                            sla_results=sla_results,
+                                           stats=stats,
                                            hooks_results=hooks_results)
 
 
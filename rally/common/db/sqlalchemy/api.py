@@ -16,10 +16,14 @@
 SQLAlchemy implementation for DB.API
 """
 
+import base64
 import collections
 import datetime as dt
+import heapq
+import json
 import os
 import time
+import zlib
 
 import alembic
 from alembic import config as alembic_config
@@ -38,16 +42,77 @@ from rally.common.db.sqlalchemy import models
 from rally.common.i18n import _
 from rally import consts
 from rally import exceptions
-from rally.task import atomic
-from rally.task.processing import charts
 
 
 CONF = cfg.CONF
 
 _FACADE = None
+# NOTE: the facade inherited from the parent process by a forked one is kept
+#     referenced, since its connections are closed on garbage collection,
+#     which would break them for the parent process as well
+_INHERITED_FACADE = None
 
 INITIAL_REVISION_UUID = "ca3626f62937"
 
+# NOTE: raw workload data is stored in chunks compressed by the codec. The
+#     name of the codec is saved in each chunk, chunks without it are not
+#     compressed (they were created before the compression was introduced).
+CHUNK_CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress)
+}
+DEFAULT_CHUNK_CODEC = "zlib"
+
+# NOTE: starts of chunks are stored with the precision of the database
+#     DateTime column, which may be rounded to seconds, so chunks are opened
+#     a bit (in seconds) earlier than the merge reaches their start.
+CHUNK_START_PRECISION = 2
+
+# NOTE: chunks saved without started_at_timestamp have only started_at, the
+#     local time of the host. The offset of the local time from the real one
+#     changes with DST, so such chunks are opened earlier by the maximum
+#     shift of the local time (in seconds).
+LOCAL_TIME_SHIFT = 3600
+
+
+def encode_chunk(raw_data, codec=DEFAULT_CHUNK_CODEC):
+    """Compress raw workload data to be stored as a chunk.
+
+    :param raw_data: list of iteration results
+    :param codec: name of the codec from CHUNK_CODECS or None to store the
+        data uncompressed
+    :returns: tuple of chunk data, size of json-encoded raw data and size
+        of the chunk data as it is stored in the database (in bytes)
+    """
+    encoded = json.dumps(raw_data).encode("utf-8")
+    if codec is None:
+        chunk_data = {"raw": raw_data}
+    else:
+        # NOTE: chunk_data column is json-encoded text (like the rest of
+        #     json columns), so compressed data is stored in base64. It keeps
+        #     chunks saved before the compression readable without rewriting
+        #     them to a binary column.
+        compressed = CHUNK_CODECS[codec][0](encoded)
+        chunk_data = {"codec": codec,
+                      "data": base64.b64encode(compressed).decode("ascii")}
+    return chunk_data, len(encoded), len(json.dumps(chunk_data))
+
+
+def decode_chunk(chunk_data):
+    """Return raw workload data stored in the chunk.
+
+    :param chunk_data: chunk data produced by encode_chunk
+    :returns: list of iteration results
+    """
+    codec = chunk_data.get("codec")
+    if codec is None:
+        return chunk_data["raw"]
+    if codec not in CHUNK_CODECS:
+        raise exceptions.RallyException(
+            _("Unknown codec of workload data chunk: %s") % codec)
+    encoded = CHUNK_CODECS[codec][1](base64.b64decode(chunk_data["data"]))
+    return json.loads(encoded.decode("utf-8"),
+                      object_pairs_hook=collections.OrderedDict)
+
 
 def serialize_data(data):
     if data is None:
@@ -124,6 +189,11 @@ class Connection(object):
 
         _FACADE = None
 
+    def engine_reset_after_fork(self):
+        global _FACADE, _INHERITED_FACADE
+
+        _INHERITED_FACADE, _FACADE = _FACADE, None
+
     def schema_cleanup(self):
         models.drop_db()
 
@@ -226,12 +296,31 @@ class Connection(object):
 
         return list(set(t.tag for t in tags))
 
-    def _uuids_by_tags_get(self, tag_type, tags):
-        tags = (self.model_query(models.Tag).
+    def _tags_get_all(self, tag_type, uuids, session=None):
+        """Get tags of several objects by one query.
+
+        :param tag_type: type of the tags
+        :param uuids: query which selects UUIDs of the objects
+        :param session: session to use
+        :returns: dict with UUIDs of objects as keys and sorted lists of
+            their tags as values
+        """
+        tags = (self.model_query(models.Tag, session=session).
+                options(sa_loadonly("uuid", "tag")).
                 filter(models.Tag.type == tag_type,
-                       models.Tag.tag.in_(tags)).all())
+                       models.Tag.uuid.in_(uuids.subquery())))
 
-        return list(set(tag.uuid for tag in tags))
+        result = collections.defaultdict(set)
+        for tag in tags:
+            result[tag.uuid].add(tag.tag)
+        return dict((uuid, sorted(tags)) for uuid, tags in result.items())
+
+    def _uuids_by_tags_get(self, tag_type, tags):
+        """Get a query which selects UUIDs of objects with given tags."""
+        return (self.model_query(models.Tag).
+                with_entities(models.Tag.uuid).
+                filter(models.Tag.type == tag_type,
+                       models.Tag.tag.in_(tags)))
 
     def _task_get(self, uuid, load_only=None, session=None):
         pre_query = self.model_query(models.Task, session=session)
@@ -245,24 +334,88 @@ class Connection(object):
         return task
 
     def _task_workload_data_get_all(self, workload_uuid):
-        session = get_session()
-        with session.begin():
-            results = (self.model_query(models.WorkloadData, session=session).
-                       filter_by(workload_uuid=workload_uuid).
-                       order_by(models.WorkloadData.chunk_order.asc()))
-
-        return sorted([raw for workload_data in results
-                       for raw in workload_data.chunk_data["raw"]],
-                      key=lambda x: x["timestamp"])
+        return list(self.workload_data_get_iter(workload_uuid))
+
+    def _workload_data_chunk_iter(self, chunk):
+        """Iterate over (timestamp, chunk order, position, raw) of a chunk."""
+        chunk_data = (self.model_query(models.WorkloadData).
+                      options(sa_loadonly("chunk_data")).
+                      filter_by(id=chunk.id).first())
+        if chunk_data is None:
+            # NOTE: the chunk was deleted along with the task
+            return iter([])
+        raw_data = sorted(decode_chunk(chunk_data.chunk_data),
+                          key=lambda x: x["timestamp"])
+        return ((raw["timestamp"], chunk.chunk_order, position, raw)
+                for position, raw in enumerate(raw_data))
+
+    def workload_data_get_iter(self, workload_uuid):
+        """Iterate over raw iterations of the workload ordered by timestamp.
+
+        Each chunk is sorted on its own, so chunks are k-way merged. A chunk
+        is loaded from the database only when the merge reaches its start,
+        so only chunks which overlap in time are kept in memory at once.
+        Iterations with equal timestamps keep the order of chunks.
+
+        Chunks are ordered and opened by the start in seconds since the
+        epoch. Chunks saved before it was stored have only local time of
+        the host which saved them, so it is used relative to the start of
+        the first loaded chunk, whose real start is known, and with a slack
+        for DST shifts.
+        """
+        chunks = list(
+            self.model_query(models.WorkloadData).
+            options(sa_loadonly("id", "chunk_order", "started_at",
+                                "started_at_timestamp")).
+            filter_by(workload_uuid=workload_uuid))
+
+        if all(c.started_at_timestamp is not None for c in chunks):
+            starts = dict((c.id, c.started_at_timestamp) for c in chunks)
+            slack = CHUNK_START_PRECISION
+            # the real start of a chunk minus the stored one
+            offset = 0
+        else:
+            epoch = dt.datetime(1970, 1, 1)
+            starts = dict((c.id, c.started_at and
+                           (c.started_at - epoch).total_seconds())
+                          for c in chunks)
+            slack = CHUNK_START_PRECISION + LOCAL_TIME_SHIFT
+            offset = None
+        chunks.sort(key=lambda c: (starts[c.id] is not None, starts[c.id],
+                                   c.chunk_order))
+
+        heap = []
+        opened = 0
+        while heap or opened < len(chunks):
+            if opened < len(chunks):
+                chunk = chunks[opened]
+                start = starts[chunk.id]
+                if (not heap or start is None or offset is None
+                        or heap[0][0] >= start + offset - slack):
+                    chunk_iter = self._workload_data_chunk_iter(chunk)
+                    opened += 1
+                    for item in chunk_iter:
+                        if offset is None and start is not None:
+                            offset = item[0] - start
+                        heapq.heappush(heap, item + (chunk_iter,))
+                        break
+                    continue
+
+            timestamp, chunk_order, position, raw, chunk_iter = (
+                heapq.heappop(heap))
+            yield raw
+            for item in chunk_iter:
+                heapq.heappush(heap, item + (chunk_iter,))
+                break
 
     @serialize
-    def task_get(self, uuid=None, detailed=False):
+    def task_get(self, uuid=None, detailed=False, load_data=True):
         session = get_session()
         task = serialize_data(self._task_get(uuid, session=session))
 
         if detailed:
             task["subtasks"] = self._subtasks_get_all_by_task_uuid(
-                uuid, session=session)
+                uuid, session=session, load_data=load_data)
 
         return task
 
@@ -350,11 +503,13 @@ class Connection(object):
             if tags:
                 uuids = self._uuids_by_tags_get(
                     consts.TagType.TASK, tags)
-                query = query.filter(models.Task.uuid.in_(uuids))
+                query = query.filter(models.Task.uuid.in_(uuids.subquery()))
 
+            tasks_tags = self._tags_get_all(
+                consts.TagType.TASK, query.with_entities(models.Task.uuid),
+                session)
             for task in query.all():
-                task.tags = sorted(
-                    self._tags_get(task.uuid, consts.TagType.TASK, session))
+                task.tags = tasks_tags.get(task.uuid, [])
                 tasks.append(task)
 
         return tasks
@@ -390,7 +545,8 @@ class Connection(object):
                                                            actual=task.status)
                 raise exceptions.TaskNotFound(uuid=uuid)
 
-    def _subtasks_get_all_by_task_uuid(self, task_uuid, session=None):
+    def _subtasks_get_all_by_task_uuid(self, task_uuid, session=None,
+                                       load_data=True):
         result = (self.model_query(models.Subtask, session=session).filter_by(
             task_uuid=task_uuid).all())
         subtasks = []
@@ -400,8 +556,9 @@ class Connection(object):
             workloads = (self.model_query(models.Workload, session=session).
                          filter_by(subtask_uuid=subtask["uuid"]).all())
             for workload in workloads:
-                workload.data = self._task_workload_data_get_all(
-                    workload.uuid)
+                if load_data:
+                    workload.data = self._task_workload_data_get_all(
+                        workload.uuid)
                 subtask["workloads"].append(serialize_data(workload))
             subtasks.append(subtask)
         return subtasks
@@ -450,12 +607,8 @@ class Connection(object):
         workload.save()
         return workload
 
-    @serialize
-    def workload_data_create(self, task_uuid, workload_uuid, chunk_order,
-                             data):
-        workload_data = models.WorkloadData(task_uuid=task_uuid,
-                                            workload_uuid=workload_uuid)
-
+    def _workload_data_values(self, task_uuid, workload_uuid, chunk_order,
+                              data):
         raw_data = data.get("raw", [])
         iter_count = len(raw_data)
 
@@ -483,72 +636,48 @@ class Connection(object):
         if finished_at == 0:
             finished_at = now
 
-        workload_data.update({
+        chunk_data, chunk_size, compressed_chunk_size = encode_chunk(raw_data)
+
+        return {
             "task_uuid": task_uuid,
             "workload_uuid": workload_uuid,
             "chunk_order": chunk_order,
             "iteration_count": iter_count,
             "failed_iteration_count": failed_iter_count,
-            "chunk_data": {"raw": raw_data},
-            # TODO(ikhudoshyn)
-            "chunk_size": 0,
-            "compressed_chunk_size": 0,
+            "chunk_data": chunk_data,
+            "chunk_size": chunk_size,
+            "compressed_chunk_size": compressed_chunk_size,
             "started_at": dt.datetime.fromtimestamp(started_at),
+            "started_at_timestamp": int(started_at),
             "finished_at": dt.datetime.fromtimestamp(finished_at)
-        })
+        }
+
+    @serialize
+    def workload_data_create(self, task_uuid, workload_uuid, chunk_order,
+                             data):
+        workload_data = models.WorkloadData(task_uuid=task_uuid,
+                                            workload_uuid=workload_uuid)
+        workload_data.update(self._workload_data_values(
+            task_uuid, workload_uuid, chunk_order, data))
         workload_data.save()
         return workload_data
 
+    def workload_data_create_many(self, task_uuid, workload_uuid, chunks):
+        values = [self._workload_data_values(task_uuid, workload_uuid,
+                                             chunk_order, data)
+                  for chunk_order, data in chunks]
+        if not values:
+            return
+        session = get_session()
+        with session.begin():
+            session.bulk_insert_mappings(models.WorkloadData, values)
+
     @serialize
     def workload_set_results(self, workload_uuid, subtask_uuid, task_uuid,
                              load_duration, full_duration, start_time,
-                             sla_results, hooks_results):
+                             sla_results, stats, hooks_results):
         session = get_session()
         with session.begin():
-            workload_results = self._task_workload_data_get_all(workload_uuid)
-
-            iter_count = len(workload_results)
-
-            failed_iter_count = 0
-            max_duration = 0
-            min_duration = 0
-
-            for d in workload_results:
-                if d.get("error"):
-                    failed_iter_count += 1
-
-                duration = d.get("duration", 0)
-
-                if duration > max_duration:
-                    max_duration = duration
-
-                if min_duration and min_duration > duration:
-                    min_duration = duration
-
-            atomics = collections.OrderedDict()
-
-            for itr in workload_results:
-                merged_atomic = atomic.merge_atomic(itr["atomic_actions"])
-                for name, value in merged_atomic.items():
-                    duration = value["duration"]
-                    count = value["count"]
-                    if name not in atomics or count > atomics[name]["count"]:
-                        atomics[name] = {"min_duration": duration,
-                                         "max_duration": duration,
-                                         "count": count}
-                    elif count == atomics[name]["count"]:
-                        if duration < atomics[name]["min_duration"]:
-                            atomics[name]["min_duration"] = duration
-                        if duration > atomics[name]["max_duration"]:
-                            atomics[name]["max_duration"] = duration
-
-            durations_stat = charts.MainStatsTable(
-                {"total_iteration_count": iter_count,
-                 "statistics": {"atomics": atomics}})
-
-            for itr in workload_results:
-                durations_stat.add_iteration(itr)
-
             sla = sla_results or []
             # NOTE(ikhudoshyn): we call it 'pass_sla'
             # for the sake of consistency with other models
@@ -563,13 +692,12 @@ class Connection(object):
                     "hooks": hooks_results or [],
                     "load_duration": load_duration,
                     "full_duration": full_duration,
-                    "min_duration": min_duration,
-                    "max_duration": max_duration,
-                    "total_iteration_count": iter_count,
-                    "failed_iteration_count": failed_iter_count,
+                    "min_duration": stats["min_duration"],
+                    "max_duration": stats["max_duration"],
+                    "total_iteration_count": stats["total_iteration_count"],
+                    "failed_iteration_count": stats["failed_iteration_count"],
                     "start_time": start_time,
-                    "statistics": {"durations": durations_stat.to_dict(),
-                                   "atomics": atomics},
+                    "statistics": stats["statistics"],
                     "pass_sla": success}
             )
             task_values = {
@@ -777,18 +905,21 @@ class Connection(object):
             if filter_by:
                 query = query.filter_by(**filter_by)
 
-            def add_tags_to_verifications(verifications):
-                for verification in verifications:
-                    verification.tags = sorted(self._tags_get(
-                        verification.uuid, consts.TagType.VERIFICATION))
-                return verifications
-
             if tags:
                 uuids = self._uuids_by_tags_get(
                     consts.TagType.VERIFICATION, tags)
-                query = query.filter(models.Verification.uuid.in_(uuids))
-
-        return add_tags_to_verifications(query.all())
+                query = query.filter(
+                    models.Verification.uuid.in_(uuids.subquery()))
+
+            verifications_tags = self._tags_get_all(
+                consts.TagType.VERIFICATION,
+                query.with_entities(models.Verification.uuid), session)
+            verifications = query.all()
+            for verification in verifications:
+                verification.tags = verifications_tags.get(
+                    verification.uuid, [])
+
+        return verifications
 
     def verification_delete(self, verification_uuid):
         session = get_session()
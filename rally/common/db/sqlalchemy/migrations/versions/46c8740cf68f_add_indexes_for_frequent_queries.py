@@ -0,0 +1,51 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add indexes for frequent queries
+
+Revision ID: 46c8740cf68f
+Revises: c517b0011857
+Create Date: 2026-10-18 04:13:10.051887
+
+"""
+
+from alembic import op
+
+from rally import exceptions
+
+# revision identifiers, used by Alembic.
+revision = "46c8740cf68f"
+down_revision = "c517b0011857"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("task_deployment_status", "tasks",
+                    ["deployment_uuid", "status"])
+    op.create_index("subtask_task_uuid", "subtasks", ["task_uuid"])
+    op.create_index("workload_task_uuid", "workloads", ["task_uuid"])
+    op.create_index("workload_subtask_uuid", "workloads", ["subtask_uuid"])
+    op.create_index("workload_data_task_uuid", "workloaddata", ["task_uuid"])
+    op.create_index("workload_data_workload_uuid_chunk_order", "workloaddata",
+                    ["workload_uuid", "chunk_order"])
+    op.create_index("tag_type_tag", "tags", ["type", "tag"])
+    op.create_index("verification_verifier_uuid", "verifications",
+                    ["verifier_uuid"])
+    op.create_index("verification_deployment_uuid", "verifications",
+                    ["deployment_uuid"])
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
@@ -0,0 +1,44 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Add started_at_timestamp to workload data
+
+Revision ID: 728f4e8bad29
+Revises: 46c8740cf68f
+Create Date: 2026-10-18 11:02:37.415529
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from rally import exceptions
+
+# revision identifiers, used by Alembic.
+revision = "728f4e8bad29"
+down_revision = "46c8740cf68f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NOTE: the start of existing chunks is known only as local time of the
+    #     host which saved them, so the column stays empty for them
+    op.add_column("workloaddata",
+                  sa.Column("started_at_timestamp", sa.BigInteger,
+                            nullable=True))
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
@@ -142,6 +142,7 @@ class Task(BASE, RallyBase):
         sa.Index("task_uuid", "uuid", unique=True),
         sa.Index("task_status", "status"),
         sa.Index("task_deployment", "deployment_uuid"),
+        sa.Index("task_deployment_status", "deployment_uuid", "status"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -178,6 +179,7 @@ class Subtask(BASE, RallyBase):
     __table_args__ = (
         sa.Index("subtask_uuid", "uuid", unique=True),
         sa.Index("subtask_status", "status"),
+        sa.Index("subtask_task_uuid", "task_uuid"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -215,6 +217,8 @@ class Workload(BASE, RallyBase):
     __tablename__ = "workloads"
     __table_args__ = (
         sa.Index("workload_uuid", "uuid", unique=True),
+        sa.Index("workload_task_uuid", "task_uuid"),
+        sa.Index("workload_subtask_uuid", "subtask_uuid"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -286,6 +290,9 @@ class WorkloadData(BASE, RallyBase):
     __tablename__ = "workloaddata"
     __table_args__ = (
         sa.Index("workload_data_uuid", "uuid", unique=True),
+        sa.Index("workload_data_task_uuid", "task_uuid"),
+        sa.Index("workload_data_workload_uuid_chunk_order",
+                 "workload_uuid", "chunk_order"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -319,6 +326,10 @@ class WorkloadData(BASE, RallyBase):
                            nullable=False)
     finished_at = sa.Column(sa.DateTime, default=lambda: timeutils.utcnow(),
                             nullable=False)
+    # NOTE: started_at is local time of the host which saved the chunk, so
+    #     chunks are ordered by the timezone independent start (seconds
+    #     since the epoch, rounded down)
+    started_at_timestamp = sa.Column(sa.BigInteger, nullable=True)
     chunk_data = sa.Column(
         sa_types.MutableJSONEncodedDict, default={}, nullable=False)
 
@@ -327,6 +338,7 @@ class Tag(BASE, RallyBase):
     __tablename__ = "tags"
     __table_args__ = (
         sa.Index("d_type_tag", "uuid", "type", "tag", unique=True),
+        sa.Index("tag_type_tag", "type", "tag"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -370,6 +382,8 @@ class Verification(BASE, RallyBase):
     __tablename__ = "verifications"
     __table_args__ = (
         sa.Index("verification_uuid", "uuid", unique=True),
+        sa.Index("verification_verifier_uuid", "verifier_uuid"),
+        sa.Index("verification_deployment_uuid", "deployment_uuid"),
     )
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
@@ -0,0 +1,158 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import re
+
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+BUFFER_SIZE = 64 * 1024
+
+
+class JSONStreamReader(object):
+    """Incremental reader of a JSON document.
+
+    The document is read from a file by pieces, so only the values which
+    are decoded at the moment are kept in memory. Arrays and objects can be
+    either decoded as a whole or iterated item by item:
+
+        reader = JSONStreamReader(f)
+        for key in reader.iter_object():
+            if key == "huge_list":
+                for item in reader.iter_array():
+                    process(item)
+            else:
+                value = reader.read_value()
+    """
+
+    def __init__(self, stream, buffer_size=BUFFER_SIZE):
+        """JSONStreamReader constructor.
+
+        :param stream: file-like object to read the document from
+        :param buffer_size: minimal size of a piece read from the stream
+        """
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer = ""
+        self._pos = 0
+        # the position of the buffer start in the stream
+        self._offset = 0
+        self._decoder = json.JSONDecoder()
+
+    def _read(self):
+        """Read the next piece of the stream into the buffer.
+
+        :returns: False if the end of the stream is reached
+        """
+        # NOTE: the size of the piece grows along with the buffer, so a big
+        #     value is decoded a logarithmic number of times at most
+        data = self.stream.read(max(self.buffer_size,
+                                    len(self._buffer) - self._pos))
+        if not data:
+            return False
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _error(self, msg):
+        return ValueError("%s: char %d" % (msg, self._offset + self._pos))
+
+    def _expect(self, char):
+        if self.peek() != char:
+            raise self._error("Expecting '%s'" % char)
+        self._pos += 1
+
+    def _next_item(self, end_char):
+        """Skip a separator of items and return True if there is an item."""
+        char = self.peek()
+        self._pos += 1
+        if char == ",":
+            return True
+        elif char == end_char:
+            return False
+        self._pos -= 1
+        raise self._error("Expecting ',' or '%s'" % end_char)
+
+    def peek(self):
+        """Return the first char of the next value.
+
+        :returns: the char or an empty string if the end of the document is
+            reached
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ""
+
+    def read_value(self):
+        """Decode the next value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer,
+                                                      self._pos)
+            except ValueError:
+                if self._read():
+                    continue
+                raise self._error("Expecting value")
+            if end == len(self._buffer) and self._read():
+                # NOTE: a number could be cut by the end of the buffer
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self, decode=True):
+        """Iterate over items of the next value which should be an array.
+
+        :param decode: whether to decode the items. If False, indexes of
+            items are yielded instead and each item should be read by the
+            caller before the next iteration.
+        """
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield self.read_value() if decode else index
+            if not self._next_item("]"):
+                return
+            index += 1
+
+    def iter_object(self):
+        """Iterate over keys of the next value which should be an object.
+
+        The value of each key should be read by the caller before the next
+        iteration.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != "\"":
+                raise self._error("Expecting property name")
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            if not self._next_item("}"):
+                return
+
+    def check_end(self):
+        """Check that nothing but whitespace is left in the stream."""
+        if self.peek():
+            raise self._error("Extra data")
@@ -375,8 +375,14 @@ class Task(object):
         return db_task
 
     @classmethod
-    def get(cls, uuid, detailed=False):
-        return cls(db.api.task_get(uuid, detailed=detailed))
+    def get(cls, uuid, detailed=False, lazy_data=False):
+        task = db.api.task_get(uuid, detailed=detailed,
+                               load_data=not lazy_data)
+        if detailed and lazy_data:
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    workload["data"] = WorkloadData(workload["uuid"])
+        return cls(task)
 
     @staticmethod
     def get_status(uuid):
@@ -465,6 +471,21 @@ class Subtask(object):
                         args=args)
 
 
+class WorkloadData(object):
+    """Raw data of a workload which is loaded on demand.
+
+    Each iteration over the object reads the workload data from the database
+    chunk by chunk, so the whole data is never kept in memory. Iterations
+    are ordered by timestamp.
+    """
+
+    def __init__(self, workload_uuid):
+        self.workload_uuid = workload_uuid
+
+    def __iter__(self):
+        return iter(db.workload_data_get_iter(self.workload_uuid))
+
+
 class Workload(object):
     """Represents a workload object."""
 
@@ -484,8 +505,16 @@ class Workload(object):
                                 self.workload["uuid"], chunk_order,
                                 workload_data)
 
+    def add_workload_data_chunks(self, chunks):
+        """Store several chunks of workload data in one transaction.
+
+        :param chunks: list of (chunk_order, workload_data) pairs
+        """
+        db.workload_data_create_many(self.workload["task_uuid"],
+                                     self.workload["uuid"], chunks)
+
     def set_results(self, load_duration, full_duration, start_time,
-                    sla_results, hooks_results=None):
+                    sla_results, stats, hooks_results=None):
         db.workload_set_results(workload_uuid=self.workload["uuid"],
                                 subtask_uuid=self.workload["subtask_uuid"],
                                 task_uuid=self.workload["task_uuid"],
@@ -493,6 +522,7 @@ class Workload(object):
                                 full_duration=full_duration,
                                 start_time=start_time,
                                 sla_results=sla_results,
+                                stats=stats,
                                 hooks_results=hooks_results)
 
     @classmethod
@@ -20,6 +20,7 @@ from rally.common import logging
 from rally import osclients
 from rally.plugins.openstack.cfg import opts as openstack_opts
 from rally.task import engine
+from rally.task.processing import plot
 
 CONF = cfg.CONF
 
@@ -32,7 +33,8 @@ def list_opts():
         merged_opts[category].extend(options)
     merged_opts["DEFAULT"] = itertools.chain(logging.DEBUG_OPTS,
                                              osclients.OSCLIENTS_OPTS,
-                                             engine.TASK_ENGINE_OPTS)
+                                             engine.TASK_ENGINE_OPTS,
+                                             plot.REPORT_OPTS)
     return merged_opts.items()
 
 
@@ -20,8 +20,6 @@ import math
 
 import six
 
-from rally.task.processing import utils
-
 
 @six.add_metaclass(abc.ABCMeta)
 class StreamingAlgorithm(object):
@@ -153,43 +151,189 @@ class MaxComputation(StreamingAlgorithm):
         return self._value
 
 
+class QuantileSketch(object):
+    """Mergeable sketch of a stream of numbers for computing quantiles.
+
+    While the stream is short, the values are kept as is and quantiles are
+    exact. After `exact_size` values, they are moved into buckets with
+    logarithmically growing bounds (the approach of DDSketch), so the memory
+    depends only on the range of values and quantiles are computed with
+    relative error not greater than `relative_accuracy`. Unlike sampling or
+    zipping of values, the result does not depend on the order of values
+    and sketches of different streams can be merged.
+    """
+
+    # NOTE: all values closer to zero are counted as zero to bound the
+    #     number of buckets
+    MIN_INDEXABLE_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy=0.01, exact_size=10000):
+        """Init sketch.
+
+        :param relative_accuracy: relative error of computed quantiles
+            (from 0.00..1 to 0.999..)
+        :param exact_size: maximum number of values to keep as is
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(
+                "Unexpected relative accuracy: %s" % relative_accuracy)
+        self.relative_accuracy = relative_accuracy
+        self.exact_size = exact_size
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+        self.count = 0
+        self.min = None
+        self.max = None
+        # NOTE: the values are kept until exact_size is reached, then it
+        #     becomes None
+        self._values = []
+        self._positive = {}
+        self._negative = {}
+        self._zero_count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, value):
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _add_to_buckets(self, value, count=1):
+        if value > self.MIN_INDEXABLE_VALUE:
+            key = self._key(value)
+            self._positive[key] = self._positive.get(key, 0) + count
+        elif value < -self.MIN_INDEXABLE_VALUE:
+            key = self._key(-value)
+            self._negative[key] = self._negative.get(key, 0) + count
+        else:
+            self._zero_count += count
+
+    def _collapse(self):
+        if self._values is not None:
+            for value in self._values:
+                self._add_to_buckets(value)
+            self._values = None
+
+    def add(self, value):
+        """Process a single value from the input stream."""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise TypeError("Non-numerical value: %r" % value)
+
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        if self._values is None:
+            self._add_to_buckets(value)
+        else:
+            self._values.append(value)
+            if len(self._values) > self.exact_size:
+                self._collapse()
+
+    def merge(self, other):
+        """Merge values processed by another sketch."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches with different relative accuracy "
+                             "can not be merged.")
+        if not other.count:
+            return
+        self.count += other.count
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+
+        if (self._values is not None and other._values is not None and
+                len(self._values) + len(other._values) <= self.exact_size):
+            self._values.extend(other._values)
+            return
+
+        self._collapse()
+        if other._values is not None:
+            for value in other._values:
+                self._add_to_buckets(value)
+        else:
+            for key, count in other._positive.items():
+                self._positive[key] = self._positive.get(key, 0) + count
+            for key, count in other._negative.items():
+                self._negative[key] = self._negative.get(key, 0) + count
+            self._zero_count += other._zero_count
+
+    def _bucket_value(self, key):
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def _buckets(self):
+        """Yield (value, count) of buckets in ascending order of values."""
+        for key in sorted(self._negative, reverse=True):
+            yield -self._bucket_value(key), self._negative[key]
+        if self._zero_count:
+            yield 0.0, self._zero_count
+        for key in sorted(self._positive):
+            yield self._bucket_value(key), self._positive[key]
+
+    def _value_at(self, rank):
+        if self._values is not None:
+            return self._values[rank]
+        if rank == 0:
+            return self.min
+        if rank == self.count - 1:
+            return self.max
+        processed = 0
+        for value, count in self._buckets():
+            processed += count
+            if processed > rank:
+                # NOTE: the estimation of the bucket can be out of the
+                #     range of real values
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantile(self, percent):
+        """Return the quantile of the values processed so far.
+
+        :param percent: numeric percent (from 0.00..1 to 0.999..)
+        """
+        if not self.count:
+            return None
+        if self._values is not None:
+            self._values.sort()
+        k = (self.count - 1) * percent
+        f = math.floor(k)
+        c = math.ceil(k)
+        if f == c:
+            return self._value_at(int(k))
+        d0 = self._value_at(int(f)) * (c - k)
+        d1 = self._value_at(int(c)) * (k - f)
+        return d0 + d1
+
+
 class PercentileComputation(StreamingAlgorithm):
     """Compute percentile value from a stream of numbers."""
 
-    def __init__(self, percent, length):
+    def __init__(self, percent, length=None):
         """Init streaming computation.
 
         :param percent: numeric percent (from 0.00..1 to 0.999..)
-        :param length: count of the measurements
+        :param length: count of the measurements. It is not required
+            anymore and is kept for backward compatibility
         """
         if not 0 < percent < 1:
             raise ValueError("Unexpected percent: %s" % percent)
         self._percent = percent
 
-        self._graph_zipper = utils.GraphZipper(length, 10000)
+        self._sketch = QuantileSketch()
 
     def add(self, value):
-        self._graph_zipper.add_point(value)
+        self._sketch.add(value)
 
     def merge(self, other):
-        # TODO(ikhudoshyn): Implement me
-        raise NotImplementedError()
+        self._sketch.merge(other._sketch)
 
     def result(self):
-        results = list(
-            map(lambda x: x[1], self._graph_zipper.get_zipped_graph()))
-        if results:
-            # NOTE(amaretskiy): Calculate percentile of a list of values
-            results.sort()
-            k = (len(results) - 1) * self._percent
-            f = math.floor(k)
-            c = math.ceil(k)
-            if f == c:
-                return results[int(k)]
-            d0 = results[int(f)] * (c - k)
-            d1 = results[int(c)] * (k - f)
-            return (d0 + d1)
-        return None
+        return self._sketch.quantile(self._percent)
 
 
 class IncrementComputation(StreamingAlgorithm):
@@ -19,6 +19,7 @@ import copy
 import ctypes
 import heapq
 import inspect
+import itertools
 import multiprocessing
 import os
 import random
@@ -27,6 +28,7 @@ import shutil
 import string
 import sys
 import tempfile
+import threading
 import time
 import uuid
 
@@ -149,6 +151,50 @@ class RAMInt(object):
             self.__int.value = 0
 
 
+class LRUCache(object):
+    """Bounded cache which drops the least recently used items.
+
+    Items are kept in two generations. Items which are got or set go to the
+    current generation, and once it holds a half of maxsize items, the
+    previous generation is dropped and the current one takes its place.
+
+    Only atomic operations of dicts are used, so the cache is safe to use
+    from several threads without locks (which may be left held by a thread
+    terminated by an asynchronous exception). A race may only drop an item,
+    which is computed again then.
+    """
+
+    def __init__(self, maxsize):
+        self._generation_size = max(1, maxsize // 2)
+        self._current = {}
+        self._previous = {}
+
+    def get(self, key, default=None):
+        try:
+            return self._current[key]
+        except KeyError:
+            pass
+        try:
+            value = self._previous[key]
+        except KeyError:
+            return default
+        self[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        current = self._current
+        if len(current) >= self._generation_size:
+            current = {}
+            self._previous, self._current = self._current, current
+        current[key] = value
+
+    def __iter__(self):
+        return iter(set(self._previous) | set(self._current))
+
+    def __len__(self):
+        return len(set(self._previous) | set(self._current))
+
+
 def get_method_class(func):
     """Return the class that defined the given method.
 
@@ -265,19 +311,31 @@ class RandomNameGeneratorMixin(object):
     RESOURCE_NAME_ALLOWED_CHARACTERS = string.ascii_letters + string.digits
 
     @classmethod
-    def _generate_random_part(cls, length):
+    def _generate_random_part(cls, length, rng=None):
         """Generate a random string.
 
         :param length: The length of the random string.
+        :param rng: random.Random instance to use, by default the instance
+                    of the current thread is used
         :returns: string, randomly-generated string of the specified length
                   containing only characters from
                   cls.RESOURCE_NAME_ALLOWED_CHARACTERS
         """
-        return "".join(random.choice(cls.RESOURCE_NAME_ALLOWED_CHARACTERS)
+        rng = rng or _get_random()
+        return "".join(rng.choice(cls.RESOURCE_NAME_ALLOWED_CHARACTERS)
                        for i in range(length))
 
     @classmethod
     def _generate_task_id_part(cls, task_id, length):
+        key = (task_id, length, cls.RESOURCE_NAME_ALLOWED_CHARACTERS)
+        task_id_part = _task_id_parts.get(key)
+        if task_id_part is None:
+            task_id_part = cls._make_task_id_part(task_id, length)
+            _task_id_parts[key] = task_id_part
+        return task_id_part
+
+    @classmethod
+    def _make_task_id_part(cls, task_id, length):
         # NOTE(stpierre): the first part of the random name is a
         # subset of the task ID
         task_id_part = task_id.replace("-", "")[0:length]
@@ -301,13 +359,11 @@ class RandomNameGeneratorMixin(object):
         # task portion; or the portion of the task ID that we
         # would use contains only characters in
         # resource_name_allowed_characters.
-        try:
-            # NOTE(stpierre): seed pRNG with task ID so that all random
-            # names with the same task ID have the same task ID part
-            random.seed(task_id)
-            return cls._generate_random_part(length)
-        finally:
-            random.seed()
+        # NOTE: pRNG seeded with task ID is used so that all random
+        #     names with the same task ID have the same task ID part. It is
+        #     a separate instance, so the random generators used by other
+        #     threads are not reseeded.
+        return cls._generate_random_part(length, random.Random(task_id))
 
     def get_owner_id(self):
         if hasattr(self, "task"):
@@ -359,6 +415,14 @@ class RandomNameGeneratorMixin(object):
                       created thusly.)
         :returns: bool
         """
+        return bool(cls._get_name_matcher(task_id, exact).match(name))
+
+    @classmethod
+    def _get_name_pattern(cls, task_id=None, exact=True):
+        """Return regular expression of names which this class generates.
+
+        See name_matches_object() for the description of arguments.
+        """
         match = cls._resource_name_placeholder_re.match(
             cls.RESOURCE_NAME_FORMAT)
         parts = match.groupdict()
@@ -369,16 +433,55 @@ class RandomNameGeneratorMixin(object):
             "chars": re.escape(cls.RESOURCE_NAME_ALLOWED_CHARACTERS),
             "rand_length": len(parts["rand"])}
         if task_id:
-            subst["task_id"] = cls._generate_task_id_part(task_id,
-                                                          len(parts["task"]))
+            subst["task_id"] = re.escape(
+                cls._generate_task_id_part(task_id, len(parts["task"])))
         else:
             subst["task_id"] = "[%s]{%s}" % (subst["chars"],
                                              len(parts["task"]))
         subst["extra"] = "" if exact else ".*"
-        name_re = re.compile(
-            "%(prefix)s%(task_id)s%(sep)s"
-            "[%(chars)s]{%(rand_length)s}%(suffix)s%(extra)s$" % subst)
-        return bool(name_re.match(name))
+        return ("%(prefix)s%(task_id)s%(sep)s"
+                "[%(chars)s]{%(rand_length)s}%(suffix)s%(extra)s$" % subst)
+
+    @classmethod
+    def _get_name_matcher(cls, task_id=None, exact=True):
+        """Return compiled name regular expression, cached per name options.
+
+        See name_matches_object() for the description of arguments.
+        """
+        key = ((cls.RESOURCE_NAME_FORMAT,
+                cls.RESOURCE_NAME_ALLOWED_CHARACTERS),), task_id, exact
+        matcher = _name_matchers.get(key)
+        if matcher is None:
+            matcher = re.compile(cls._get_name_pattern(task_id, exact))
+            _name_matchers[key] = matcher
+        return matcher
+
+
+# NOTE: random.Random instances used to generate names in the current
+#     thread. Each thread has its own instance, so threads do not contend
+#     on the global generator.
+_thread_local = threading.local()
+
+# NOTE: task ID parts of names, keyed by (task ID, length, allowed chars)
+_task_id_parts = LRUCache(256)
+
+
+def _get_random():
+    """Return random.Random instance of the current thread."""
+    rng = getattr(_thread_local, "random", None)
+    # NOTE: the instance is copied to the forked processes, so it is
+    #     recreated in each process to avoid generating the same names
+    if rng is None or _thread_local.pid != os.getpid():
+        rng = _thread_local.random = random.Random()
+        _thread_local.pid = os.getpid()
+    return rng
+
+
+# NOTE: compiled regular expressions of names which are checked by
+#     name_matches_object(). Keys are tuples of (name options of classes,
+#     task id, exact), where name options are pairs of
+#     (RESOURCE_NAME_FORMAT, RESOURCE_NAME_ALLOWED_CHARACTERS).
+_name_matchers = LRUCache(256)
 
 
 def name_matches_object(name, *objects, **kwargs):
@@ -405,8 +508,32 @@ def name_matches_object(name, *objects, **kwargs):
         key = (obj.RESOURCE_NAME_FORMAT, obj.RESOURCE_NAME_ALLOWED_CHARACTERS)
         if key not in unique_rng_options:
             unique_rng_options[key] = obj
-    return any(obj.name_matches_object(name, **kwargs)
-               for obj in unique_rng_options.values())
+
+    # NOTE: names of objects which do not override name_matches_object()
+    #     are checked by one combined regular expression
+    default_method = RandomNameGeneratorMixin.name_matches_object.__func__
+    custom = []
+    patterns = {}
+    for key, obj in unique_rng_options.items():
+        if getattr(obj.name_matches_object, "__func__",
+                   None) is default_method:
+            patterns[key] = obj
+        else:
+            custom.append(obj)
+
+    if patterns:
+        task_id = kwargs.get("task_id")
+        exact = kwargs.get("exact", True)
+        keys = tuple(sorted(patterns))
+        matcher = _name_matchers.get((keys, task_id, exact))
+        if matcher is None:
+            matcher = re.compile("|".join(
+                "(?:%s)" % patterns[key]._get_name_pattern(task_id, exact)
+                for key in keys))
+            _name_matchers[(keys, task_id, exact)] = matcher
+        if matcher.match(name):
+            return True
+    return any(obj.name_matches_object(name, **kwargs) for obj in custom)
 
 
 def make_name_matcher(*names):
@@ -508,6 +635,25 @@ def merge(length, *sources):
             return
 
 
+def iterate_chunks(iterable, size):
+    """Split an iterable into lists of the given size.
+
+    Items are taken from the iterable only when the next chunk is
+    requested, so the iterable can be a generator which is too big to be
+    kept in memory. The last chunk can be shorter.
+
+    :param iterable: iterable to split
+    :param size: size of chunks
+    :returns: generator of lists
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def interruptable_sleep(sleep_time, atomic_delay=0.1):
     """Return after sleep_time seconds.
 
@@ -548,17 +694,32 @@ def terminate_thread(thread_ident, exc_type=exceptions.ThreadTimeoutException):
         ctypes.c_long(thread_ident), ctypes.py_object(exc_type))
 
 
+def cancel_thread_termination(thread_ident):
+    """Cancel termination requested by terminate_thread().
+
+    The exception is raised in the thread asynchronously, so it can be
+    cancelled if the thread has not run into it yet.
+
+    :param thread_ident: threading.Thread.ident value
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_long(thread_ident), None)
+
+
 def timeout_thread(queue):
     """Terminate threads by timeout.
 
     Function need to be run in separate thread. Its designed to terminate
     threads which are running longer then timeout.
 
-    Parent thread will put tuples (thread_ident, deadline) in the queue,
-    where `thread_ident` is Thread.ident value of thread to watch, and
-    `deadline` is timestamp when thread should be terminated. Also tuple
-    (None, None) should be put when all threads are exited and no more
-    threads to watch.
+    Parent thread will put tuples (thread, deadline) in the queue,
+    where `thread` is Thread object to watch, and `deadline` is timestamp
+    when thread should be terminated. Also tuple (None, None) should be put
+    when all threads are exited and no more threads to watch.
+
+    Instead of Thread, an object with ident attribute, isAlive() and
+    terminate() methods can be watched. It is terminated by its own
+    terminate() method.
 
     :param queue: Queue object to communicate with parent thread.
     """
@@ -578,7 +739,12 @@ def timeout_thread(queue):
             # ValueError means that timeout lower than 0.
             if thread.isAlive():
                 LOG.info("Thread %s is timed out. Terminating." % thread.ident)
-                terminate_thread(thread.ident)
+                if hasattr(thread, "terminate"):
+                    # NOTE: the object can check if it is still alive and
+                    #     terminate itself atomically
+                    thread.terminate()
+                else:
+                    terminate_thread(thread.ident)
             all_threads.popleft()
 
         if next_thread == (None, None,):
@@ -15,11 +15,16 @@
 import itertools
 import os
 
+from oslo_config import cfg
+
 from rally.common.io import junit
 from rally.task import exporter
 from rally.task.processing import plot
 
 
+CONF = cfg.CONF
+
+
 @exporter.configure("html")
 class HTMLExporter(exporter.TaskExporter):
     """Generates task report in HTML format."""
@@ -47,13 +52,18 @@ class HTMLExporter(exporter.TaskExporter):
                     processed_names[workload["name"]] = 0
             results.append(task)
 
-        report = plot.plot(results, include_libs=self.INCLUDE_LIBS)
-
         if self.output_destination:
-            return {"files": {self.output_destination: report},
-                    "open": "file://" + os.path.abspath(
-                        self.output_destination)}
+            # NOTE: the report of big tasks can be huge, so it is written
+            #     to the file workload by workload instead of returning it
+            #     as a whole
+            output_file = os.path.expanduser(self.output_destination)
+            with open(output_file, "w+") as f:
+                plot.write_plot(results, f, include_libs=self.INCLUDE_LIBS,
+                                workers=CONF.report_workers)
+            return {"open": "file://" + os.path.abspath(output_file)}
         else:
+            report = plot.plot(results, include_libs=self.INCLUDE_LIBS,
+                               workers=CONF.report_workers)
             return {"print": report}
 
 
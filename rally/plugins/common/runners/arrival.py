@@ -0,0 +1,410 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+import math
+import multiprocessing
+import random
+import time
+
+from rally.common import logging
+from rally.common import validation
+from rally import consts
+from rally import exceptions
+from rally.task import runner
+
+LOG = logging.getLogger(__name__)
+
+# how often (in seconds) the worker checks whether the load generation is
+# aborted while waiting for the next arrival
+ABORT_CHECK_INTERVAL = 0.1
+
+DEFAULT_MAX_CONCURRENCY = 1000
+
+
+def _profile_offsets(profile, poisson, rng):
+    """Generate start offsets of iterations for the piecewise rate profile.
+
+    The offsets are obtained by inversion of the cumulative arrival rate,
+    so the rate may change linearly within a phase (from `rate` to
+    `end_rate`). Uniform arrivals are spread evenly, Poisson arrivals have
+    exponentially distributed gaps.
+
+    :param profile: list of phases, dicts with "duration", "rate" and
+        optional "end_rate" keys
+    :param poisson: whether to generate Poisson arrivals
+    :param rng: random.Random object for Poisson arrivals
+    :returns: generator of offsets (in seconds) from the start of the load
+    """
+    phase_start = 0.0
+    # the number of arrivals expected by the end of the previous phases
+    phase_arrivals = 0.0
+    target = rng.expovariate(1.0) if poisson else 0.0
+    for phase in profile:
+        duration = phase.get("duration", float("inf"))
+        rate = float(phase["rate"])
+        end_rate = float(phase.get("end_rate", rate))
+        # the number of arrivals within the phase
+        arrivals = (rate + end_rate) / 2 * duration
+        while target - phase_arrivals < arrivals:
+            x = target - phase_arrivals
+            if rate == end_rate:
+                offset = x / rate
+            else:
+                # solve (end_rate - rate) / (2 * duration) * t^2 + rate * t
+                # = x for t
+                a = (end_rate - rate) / (2 * duration)
+                offset = (math.sqrt(rate ** 2 + 4 * a * x) - rate) / (2 * a)
+            yield phase_start + offset
+            target += rng.expovariate(1.0) if poisson else 1.0
+        phase_start += duration
+        phase_arrivals += arrivals
+
+
+def _load_trace(path, time_scale=1.0):
+    """Load start offsets of iterations from the file with timestamps.
+
+    Each line of the file starts with the timestamp (in seconds) of the
+    recorded request. Anything after the first whitespace or comma is
+    ignored as well as empty lines and comments.
+
+    :param path: path to the file
+    :param time_scale: how many times the replay should be faster than the
+        recorded load
+    :returns: sorted list of offsets (in seconds) from the first request
+    """
+    timestamps = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            timestamps.append(float(line.replace(",", " ").split()[0]))
+    timestamps.sort()
+    return [(t - timestamps[0]) / time_scale for t in timestamps]
+
+
+def _worker_process(queue, profile, poisson, seed, trace, start, times,
+                    duration, max_concurrent, timeout, context, cls,
+                    method_name, args, event_queue, aborted, info):
+    """Start the scenario iterations at the scheduled times.
+
+    The load is open-loop: every iteration is started at its own scheduled
+    time regardless of how long the previous iterations take. All processes
+    generate the same schedule and each of them starts every
+    `processes_to_start`-th iteration of it. The worker sleeps until the
+    absolute scheduled time of the next iteration, so the errors of
+    sleeping don't accumulate.
+
+    :param queue: queue object to append results
+    :param profile: list of phases of the rate profile
+    :param poisson: whether to generate Poisson arrivals
+    :param seed: seed of the random generator for Poisson arrivals
+    :param trace: list of offsets of the replayed trace, it is used instead
+        of the profile if it is not None
+    :param start: start time of the load (in seconds since the epoch)
+    :param times: maximum number of scenario iterations to be run or None
+    :param duration: maximum number of seconds to generate load for or None
+    :param max_concurrent: maximum worker concurrency
+    :param timeout: operation's timeout
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param event_queue: queue object to append events
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of launched process
+    """
+    runner._log_worker_info(profile=profile, poisson=poisson, seed=seed,
+                            times=times, duration=duration,
+                            max_concurrent=max_concurrent, timeout=timeout,
+                            cls=cls, method_name=method_name, args=args)
+
+    if trace is not None:
+        offsets = iter(trace)
+    else:
+        offsets = _profile_offsets(profile, poisson, random.Random(seed))
+    if times is not None:
+        offsets = itertools.islice(offsets, times)
+    if duration is not None:
+        offsets = itertools.takewhile(lambda o: o <= duration, offsets)
+    offsets = itertools.islice(enumerate(offsets), info["processes_counter"],
+                               None, info["processes_to_start"])
+
+    pool = runner.WorkerThreadPool(max_concurrent, queue, cls, method_name,
+                                   context, args, event_queue, timeout)
+    max_lag = 0
+    for iteration, offset in offsets:
+        scheduled_at = start + offset
+        delay = scheduled_at - time.time()
+        while delay > 0 and not aborted.is_set():
+            time.sleep(min(delay, ABORT_CHECK_INTERVAL))
+            delay = scheduled_at - time.time()
+        if aborted.is_set():
+            break
+        # NOTE: if all slots are busy, the iteration starts late and the
+        #     lag is reported instead of shifting the rest of the schedule
+        pool.wait_for_slot()
+        max_lag = max(max_lag, time.time() - scheduled_at)
+        pool.submit(iteration, scheduled_at)
+
+    pool.join()
+    LOG.debug("Worker %s: the maximum lag of dispatching iterations is "
+              "%.3f s" % (info["processes_counter"], max_lag))
+
+
+@validation.configure("check_arrival")
+class CheckArrivalValidator(validation.Validator):
+    """Additional schema validation for arrival runner"""
+
+    def validate(self, credentials, config, plugin_cls, plugin_cfg):
+        arrivals = plugin_cfg.get("arrivals", {})
+        sources = [k for k in ("rate", "profile", "trace") if k in arrivals]
+        if len(sources) != 1:
+            return self.fail("Exactly one of 'rate', 'profile' and 'trace' "
+                             "should be specified in 'arrivals' section.")
+        if "trace" in arrivals:
+            if "poisson" in arrivals:
+                return self.fail("Parameter 'poisson' can't be used with "
+                                 "'trace'.")
+        elif "time_scale" in arrivals:
+            return self.fail("Parameter 'time_scale' can be used only with "
+                             "'trace'.")
+        if ("rate" in arrivals and "times" not in plugin_cfg
+                and "duration" not in plugin_cfg):
+            return self.fail("Parameter 'times' or 'duration' should be "
+                             "specified for the constant arrival rate.")
+        profile = arrivals.get("profile", [])
+        for phase in profile[:-1]:
+            if "duration" not in phase:
+                return self.fail("Only the last phase of 'profile' can be "
+                                 "endless.")
+        if profile and "duration" not in profile[-1]:
+            if "end_rate" in profile[-1] or not profile[-1]["rate"]:
+                return self.fail("The endless phase of 'profile' should "
+                                 "have the constant non-zero rate.")
+            if "times" not in plugin_cfg and "duration" not in plugin_cfg:
+                return self.fail("Parameter 'times' or 'duration' should be "
+                                 "specified for the endless 'profile'.")
+
+
+@validation.add("check_arrival")
+@runner.configure(name="arrival")
+class ArrivalScenarioRunner(runner.ScenarioRunner):
+    """Scenario runner that starts iterations by the arrival schedule.
+
+    Unlike the other runners, it generates an open-loop load: iterations
+    are started at the scheduled times independently of the completion
+    of the previous ones, like requests of real users. The schedule is
+    defined by one of:
+
+    * constant arrival `rate` (iterations per second);
+    * piecewise rate `profile` - list of phases, each phase has `duration`
+      and `rate`. The rate changes linearly to `end_rate` within the phase
+      if it is specified;
+    * `trace` - path to the file with the recorded timestamps (one per line)
+      of production requests which should be replayed (`time_scale` times
+      faster).
+
+    The arrivals are spread evenly by default or form a Poisson process if
+    `poisson` is true. The lag between the scheduled and the actual start
+    of each iteration is reported as "Start lag" output, so it is possible
+    to tell the slowness of the load generator (coordinated omission) from
+    the slowness of the cloud.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string",
+                "description": "Type of Runner."
+            },
+            "arrivals": {
+                "type": "object",
+                "description": "The schedule of iterations.",
+                "properties": {
+                    "rate": {
+                        "type": "number",
+                        "exclusiveMinimum": True,
+                        "minimum": 0,
+                        "description": "The number of iterations to start "
+                                       "per second."
+                    },
+                    "profile": {
+                        "type": "array",
+                        "description": "Phases of the piecewise rate "
+                                       "profile.",
+                        "minItems": 1,
+                        "items": {
+                            "type": "object",
+                            "description": "Phase of the rate profile.",
+                            "properties": {
+                                "duration": {
+                                    "type": "number",
+                                    "exclusiveMinimum": True,
+                                    "minimum": 0,
+                                    "description": "Duration of the phase "
+                                                   "in seconds (the last "
+                                                   "phase is endless if it "
+                                                   "is not specified)."
+                                },
+                                "rate": {
+                                    "type": "number",
+                                    "minimum": 0,
+                                    "description": "The number of "
+                                                   "iterations per second "
+                                                   "at the beginning of "
+                                                   "the phase."
+                                },
+                                "end_rate": {
+                                    "type": "number",
+                                    "minimum": 0,
+                                    "description": "The number of "
+                                                   "iterations per second "
+                                                   "at the end of the "
+                                                   "phase (equal to 'rate' "
+                                                   "by default)."
+                                }
+                            },
+                            "required": ["rate"],
+                            "additionalProperties": False
+                        }
+                    },
+                    "trace": {
+                        "type": "string",
+                        "description": "Path to the file with timestamps of "
+                                       "recorded requests."
+                    },
+                    "time_scale": {
+                        "type": "number",
+                        "exclusiveMinimum": True,
+                        "minimum": 0,
+                        "description": "How many times faster the trace "
+                                       "should be replayed."
+                    },
+                    "poisson": {
+                        "type": "boolean",
+                        "description": "Generate Poisson arrivals instead of "
+                                       "evenly spread ones."
+                    },
+                    "seed": {
+                        "type": "integer",
+                        "description": "Seed of the random generator for "
+                                       "Poisson arrivals."
+                    }
+                },
+                "additionalProperties": False
+            },
+            "times": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The maximum number of iteration executions."
+            },
+            "duration": {
+                "type": "number",
+                "minimum": 0.0,
+                "description": "The maximum number of seconds during which "
+                               "to generate a load."
+            },
+            "max_concurrency": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The maximum number of parallel iteration "
+                               "executions."
+            },
+            "timeout": {
+                "type": "number",
+                "description": "Operation's timeout."
+            },
+            "max_cpu_count": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The maximum number of processes to create load"
+                               " from."
+            }
+        },
+        "required": ["type", "arrivals"],
+        "additionalProperties": False
+    }
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        arrivals = self.config["arrivals"]
+        times = self.config.get("times")
+        duration = self.config.get("duration")
+        timeout = self.config.get("timeout", 0)  # 0 means no timeout
+        max_concurrency = self.config.get("max_concurrency",
+                                          DEFAULT_MAX_CONCURRENCY)
+        profile = arrivals.get("profile") or [{"rate": arrivals.get("rate")}]
+        poisson = arrivals.get("poisson", False)
+        seed = arrivals.get("seed")
+        if seed is None:
+            # NOTE: all workers should generate the same schedule
+            seed = random.randint(0, 2 ** 32)
+
+        trace = None
+        if "trace" in arrivals:
+            # NOTE: the trace is loaded once by the parent process and is
+            #     inherited by the workers
+            try:
+                trace = _load_trace(arrivals["trace"],
+                                    arrivals.get("time_scale", 1.0))
+            except (IOError, ValueError, IndexError) as e:
+                raise exceptions.RallyException(
+                    "Failed to load the trace %s: %s" % (arrivals["trace"],
+                                                         e))
+
+        cpu_count = multiprocessing.cpu_count()
+        max_cpu_used = min(cpu_count,
+                           self.config.get("max_cpu_count", cpu_count))
+        processes_to_start = min(max_cpu_used, max_concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            max_concurrency, processes_to_start)
+
+        self._log_debug_info(arrivals=arrivals, seed=seed,
+                             times=times, duration=duration,
+                             max_concurrency=max_concurrency,
+                             timeout=timeout, max_cpu_used=max_cpu_used,
+                             processes_to_start=processes_to_start)
+
+        result_queue, event_queue = self._create_queues()
+        start = time.time()
+
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, profile, poisson, seed, trace, start,
+                       times, duration,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       timeout, context, cls, method_name, args, event_queue,
+                       self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, _worker_process,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue, event_queue)
@@ -0,0 +1,361 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+import traceback
+
+from rally.common import asyncutils
+from rally.common import logging
+from rally.common import utils as rutils
+from rally.common import validation
+from rally import consts
+from rally import exceptions
+from rally.task import runner
+from rally.task import utils
+
+try:
+    import asyncio
+except ImportError:
+    # NOTE: asyncio is a part of standard library since Python 3.4
+    asyncio = None
+
+
+LOG = logging.getLogger(__name__)
+
+# how often (in seconds) the event loop checks whether the load generation
+# is aborted
+ABORT_CHECK_INTERVAL = 0.1
+
+
+def _format_exc(exc):
+    # NOTE: rally.task.utils.format_exc takes the traceback of the exception
+    #     which is being handled, but the exception of the future is not
+    return [exc.__class__.__name__, str(exc),
+            "".join(traceback.format_exception(
+                type(exc), exc, getattr(exc, "__traceback__", None)))]
+
+
+def _start_iteration(loop, cls, method_name, context_obj, scenario_kwargs,
+                     event_queue, timeout, callback):
+    """Start a single iteration of asynchronous scenario.
+
+    It is an asynchronous version of rally.task.runner._run_scenario_once.
+    The scenario method should be a coroutine function or return an
+    awaitable object. The result of the iteration is passed to the callback
+    when the awaitable is done.
+
+    :param loop: event loop to run the iteration in
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param context_obj: scenario context object of the iteration
+    :param scenario_kwargs: scenario args
+    :param event_queue: queue object to append events
+    :param timeout: operation's timeout, 0 means no timeout
+    :param callback: function to call with the result of the iteration
+    """
+    iteration = context_obj["iteration"]
+    event_queue.put({"type": "iteration", "value": iteration})
+
+    # provide arguments isolation between iterations
+    scenario_kwargs = copy.deepcopy(scenario_kwargs)
+
+    LOG.info("Task %(task)s | ITER: %(iteration)s START" %
+             {"task": context_obj["task"]["uuid"], "iteration": iteration})
+
+    scenario_inst = cls(context_obj)
+    timer = rutils.Timer()
+    timer.__enter__()
+
+    def finish(error):
+        timer.__exit__(None, None, None)
+        status = "Error %s: %s" % tuple(error[0:2]) if error else "OK"
+        LOG.info("Task %(task)s | ITER: %(iteration)s END: %(status)s" %
+                 {"task": context_obj["task"]["uuid"], "iteration": iteration,
+                  "status": status})
+        callback({"duration": timer.duration() - scenario_inst.idle_duration(),
+                  "timestamp": timer.timestamp(),
+                  "idle_duration": scenario_inst.idle_duration(),
+                  "error": error,
+                  "output": scenario_inst._output,
+                  "atomic_actions": scenario_inst.atomic_actions()})
+
+    try:
+        future = asyncutils.ensure_future(
+            getattr(scenario_inst, method_name)(**scenario_kwargs), loop)
+    except Exception as e:
+        if logging.is_debug():
+            LOG.exception(e)
+        # NOTE: the callback should not be called from the scheduler itself
+        loop.call_soon(finish, utils.format_exc(e))
+        return
+
+    timeout_handle = None
+    if timeout:
+        timeout_handle = loop.call_later(timeout, future.cancel)
+
+    def on_done(future):
+        if timeout_handle:
+            timeout_handle.cancel()
+        if future.cancelled():
+            error = _format_exc(exceptions.ThreadTimeoutException())
+        elif future.exception():
+            error = _format_exc(future.exception())
+        else:
+            error = []
+        finish(error)
+
+    future.add_done_callback(on_done)
+
+
+class _LoadGenerator(object):
+    """Schedules iterations of asynchronous scenario in the event loop."""
+
+    def __init__(self, loop, queue, times, duration, concurrency, rps,
+                 timeout, context, cls, method_name, args, event_queue,
+                 aborted):
+        self.loop = loop
+        self.queue = queue
+        self.times = times
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rps = rps
+        self.timeout = timeout
+        self.context = context
+        self.cls = cls
+        self.method_name = method_name
+        self.args = args
+        self.event_queue = event_queue
+        self.aborted = aborted
+
+        self.started = 0
+        self.in_flight = 0
+        self.start_time = None
+        self.deadline = None
+        self.next_start = None
+        self.done = asyncio.Future(loop=loop)
+
+    def run(self):
+        self.start_time = self.loop.time()
+        if self.duration is not None:
+            self.deadline = self.start_time + self.duration
+        self.loop.call_soon(self._schedule)
+        self.loop.call_soon(self._check_aborted)
+        self.loop.run_until_complete(self.done)
+
+    def _can_start(self):
+        if self.aborted.is_set():
+            return False
+        if self.times is not None and self.started >= self.times:
+            return False
+        if self.deadline is not None and (self.started and
+                                          self.loop.time() > self.deadline):
+            # NOTE: the first iteration is started even if duration is 0
+            return False
+        return True
+
+    def _check_aborted(self):
+        if not self.done.done():
+            if self.aborted.is_set():
+                self._schedule()
+            else:
+                self.loop.call_later(ABORT_CHECK_INTERVAL,
+                                     self._check_aborted)
+
+    def _schedule(self):
+        if self.next_start:
+            self.next_start.cancel()
+            self.next_start = None
+        while self.in_flight < self.concurrency and self._can_start():
+            if self.rps:
+                start_at = self.start_time + self.started / float(self.rps)
+                if start_at > self.loop.time():
+                    self.next_start = self.loop.call_at(start_at,
+                                                        self._schedule)
+                    break
+            self._start_next()
+
+        if not self.in_flight and not self.next_start and (
+                not self._can_start()):
+            if not self.done.done():
+                self.done.set_result(None)
+
+    def _start_next(self):
+        scenario_context = runner._get_scenario_context(self.started,
+                                                        self.context)
+        self.started += 1
+        self.in_flight += 1
+        _start_iteration(self.loop, self.cls, self.method_name,
+                         scenario_context, self.args, self.event_queue,
+                         self.timeout, self._on_result)
+
+    def _on_result(self, result):
+        self.queue.put(result)
+        self.in_flight -= 1
+        self._schedule()
+
+
+def _worker_process(queue, times, duration, concurrency, rps, timeout,
+                    context, cls, method_name, args, event_queue, aborted,
+                    info):
+    """Start the scenario within an event loop.
+
+    All iterations are executed by a single thread which runs asyncio event
+    loop, so the number of concurrent iterations is limited only by the
+    resources of the cloud under test and the load generator, not by the
+    number of threads.
+
+    :param queue: queue object to append results
+    :param times: total number of scenario iterations to be run or None
+    :param duration: number of seconds to generate load for or None
+    :param concurrency: maximum number of concurrent scenario iterations
+    :param rps: number of iterations to start per second or None
+    :param timeout: operation's timeout
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param event_queue: queue object to append events
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of launched process
+    """
+    runner._log_worker_info(times=times, duration=duration,
+                            concurrency=concurrency, rps=rps, timeout=timeout,
+                            cls=cls, method_name=method_name, args=args)
+
+    loop = asyncio.new_event_loop()
+    # NOTE: scenarios can obtain the loop via asyncio.get_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        _LoadGenerator(loop, queue, times, duration, concurrency, rps,
+                       timeout, context, cls, method_name, args, event_queue,
+                       aborted).run()
+    finally:
+        # NOTE: resources bound to the loop (for example, HTTP sessions of
+        #     the scenarios) are released before it is closed
+        asyncutils.close_loop(loop)
+
+
+@validation.configure("check_asyncio")
+class CheckAsyncioValidator(validation.Validator):
+    """Additional validation for asyncio runner"""
+
+    def validate(self, credentials, config, plugin_cls, plugin_cfg):
+        if ("times" in plugin_cfg) == ("duration" in plugin_cfg):
+            return self.fail("Exactly one of 'times' and 'duration' "
+                             "parameters should be specified.")
+
+
+@validation.add("check_asyncio")
+@runner.configure(name="asyncio")
+class AsyncioScenarioRunner(runner.ScenarioRunner):
+    """Creates load executing asynchronous scenario in asyncio event loop.
+
+    Iterations are executed as coroutines by a single event loop in a
+    separate process instead of threads or processes per iteration, so
+    it can keep tens of thousands of iterations in flight. It works only
+    with scenarios which `run` method is a coroutine function or returns
+    an awaitable object (for example, HttpRequests.check_request_async),
+    and requires Python 3.4+.
+
+    The runner supports three modes:
+
+    * constant - `times` iterations are executed keeping `concurrency`
+      of them running at the same time;
+    * rps - `times` iterations are started with `rps` frequency (no more
+      than `concurrency` of them run at the same time);
+    * duration - iterations are started during `duration` seconds keeping
+      `concurrency` (or `rps`) of them running.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string",
+                "description": "Type of Runner."
+            },
+            "times": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "Total number of iteration executions."
+            },
+            "duration": {
+                "type": "number",
+                "minimum": 0.0,
+                "description": "The number of seconds during which to generate"
+                               " a load."
+            },
+            "concurrency": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The maximum number of parallel iteration "
+                               "executions."
+            },
+            "rps": {
+                "type": "number",
+                "exclusiveMinimum": True,
+                "minimum": 0,
+                "description": "The number of iterations to start per second."
+            },
+            "timeout": {
+                "type": "number",
+                "description": "Operation's timeout."
+            }
+        },
+        "required": ["type"],
+        "additionalProperties": False
+    }
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        if asyncio is None:
+            raise exceptions.RallyException(
+                "The 'asyncio' runner requires asyncio module which is "
+                "available since Python 3.4.")
+
+        times = self.config.get("times")
+        duration = self.config.get("duration")
+        rps = self.config.get("rps")
+        # NOTE: rps mode is not limited by concurrency by default
+        concurrency = self.config.get("concurrency",
+                                      float("inf") if rps else 1)
+        timeout = self.config.get("timeout", 0)  # 0 means no timeout
+
+        self._log_debug_info(times=times, duration=duration,
+                             concurrency=concurrency, rps=rps,
+                             timeout=timeout)
+
+        result_queue, event_queue = self._create_queues()
+
+        def worker_args_gen():
+            while True:
+                yield (result_queue, times, duration, concurrency, rps,
+                       timeout, context, cls, method_name, args, event_queue,
+                       self.aborted)
+
+        process_pool = self._create_process_pool(1, _worker_process,
+                                                 worker_args_gen())
+        self._join_processes(process_pool, result_queue, event_queue)
@@ -24,7 +24,6 @@ from rally.common import utils
 from rally.common import validation
 from rally import consts
 from rally.task import runner
-from rally.task import utils as butils
 
 
 def _worker_process(queue, iteration_gen, timeout, concurrency, times,
@@ -116,6 +115,52 @@ def _worker_process(queue, iteration_gen, timeout, concurrency, times,
         collector_thr_by_timeout.join()
 
 
+def _worker_process_with_pool(queue, iteration_gen, timeout, concurrency,
+                              times, context, cls, method_name, args,
+                              event_queue, aborted, info):
+    """Start the scenario within a pool of long-lived threads.
+
+    It works the same way as _worker_process, but instead of spawning a new
+    thread for each iteration, iterations are executed by a fixed set of
+    threads (no more than `concurrency`) which are reused during the whole
+    load generation. Waiting for a free thread doesn't involve any polling.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: operation's timeout
+    :param concurrency: number of concurrently running scenario iterations
+    :param times: total number of scenario iterations to be run
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param event_queue: queue object to append events
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of launched process
+    """
+    runner._log_worker_info(times=times, concurrency=concurrency,
+                            timeout=timeout, cls=cls, method_name=method_name,
+                            args=args)
+
+    pool = runner.WorkerThreadPool(concurrency, queue, cls, method_name,
+                                   context, args, event_queue, timeout)
+    while not aborted.is_set():
+        pool.wait_for_slot()
+        iteration = next(iteration_gen)
+        if iteration >= times or aborted.is_set():
+            pool.release_slot()
+            break
+        pool.submit(iteration)
+
+    # Wait until all iterations are done
+    pool.join()
+
+
+WORKER_MODES = {"thread_per_iteration": _worker_process,
+                "thread_pool": _worker_process_with_pool}
+
+
 @validation.configure("check_constant")
 class CheckConstantValidator(validation.Validator):
     """Additional schema validation for constant runner"""
@@ -172,6 +217,14 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
                 "minimum": 1,
                 "description": "The maximum number of processes to create load"
                                " from."
+            },
+            "worker_mode": {
+                "enum": sorted(WORKER_MODES),
+                "description": "The way iterations are executed inside of "
+                               "each process: 'thread_per_iteration' starts "
+                               "a new thread for each iteration, "
+                               "'thread_pool' reuses a fixed set of "
+                               "long-lived threads."
             }
         },
         "required": ["type"],
@@ -198,6 +251,7 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
         timeout = self.config.get("timeout", 0)  # 0 means no timeout
         times = self.config.get("times", 1)
         concurrency = self.config.get("concurrency", 1)
+        worker_mode = self.config.get("worker_mode", "thread_per_iteration")
         iteration_gen = utils.RAMInt()
 
         cpu_count = multiprocessing.cpu_count()
@@ -214,8 +268,7 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
                              concurrency_per_worker=concurrency_per_worker,
                              concurrency_overhead=concurrency_overhead)
 
-        result_queue = multiprocessing.Queue()
-        event_queue = multiprocessing.Queue()
+        result_queue, event_queue = self._create_queues()
 
         def worker_args_gen(concurrency_overhead):
             while True:
@@ -227,21 +280,53 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
                     concurrency_overhead -= 1
 
         process_pool = self._create_process_pool(
-            processes_to_start, _worker_process,
+            processes_to_start, WORKER_MODES[worker_mode],
             worker_args_gen(concurrency_overhead))
         self._join_processes(process_pool, result_queue, event_queue)
 
 
-def _run_scenario_once_with_unpack_args(args):
-    # NOTE(andreykurilin): `pool.imap` is used in
-    #     ConstantForDurationScenarioRunner. It does not want to work with
-    #     instance-methods, class-methods and static-methods. Also, it can't
-    #     transmit positional or keyword arguments to destination function.
-    #     While original `rally.task.runner._run_scenario_once` accepts
-    #     multiple arguments instead of one big tuple with all arguments, we
-    #     need to hardcode unpacking here(all other runners are able to
-    #     transmit arguments in proper way).
-    return runner._run_scenario_once(*args)
+def _worker_process_for_duration(queue, iteration_gen, timeout, concurrency,
+                                 deadline, context, cls, method_name, args,
+                                 event_queue, aborted, info):
+    """Start the scenario within a pool of threads until the deadline.
+
+    Iterations are executed by a pool of long-lived threads (no more than
+    `concurrency`) without pausing between iterations. New iterations are
+    not started after the deadline, the iterations which are in progress
+    are waited for (they are limited by the timeout).
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: operation's timeout
+    :param concurrency: number of concurrently running scenario iterations
+    :param deadline: time (in seconds since the epoch) after which new
+                     iterations should not be started
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param event_queue: queue object to append events
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param info: info about all processes count and counter of launched process
+    """
+    runner._log_worker_info(deadline=deadline, concurrency=concurrency,
+                            timeout=timeout, cls=cls, method_name=method_name,
+                            args=args)
+
+    pool = runner.WorkerThreadPool(concurrency, queue, cls, method_name,
+                                   context, args, event_queue, timeout)
+    while not aborted.is_set():
+        pool.wait_for_slot()
+        iteration = next(iteration_gen)
+        # NOTE: the first iteration is executed even if duration is 0
+        if (iteration and time.time() >= deadline) or aborted.is_set():
+            pool.release_slot()
+            break
+        pool.submit(iteration)
+
+    # Wait until all iterations are done
+    pool.join()
 
 
 @runner.configure(name="constant_for_duration")
@@ -281,24 +366,25 @@ class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
                 "type": "number",
                 "minimum": 1,
                 "description": "Operation's timeout."
+            },
+            "max_cpu_count": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The maximum number of processes to create load"
+                               " from."
             }
         },
         "required": ["type", "duration"],
         "additionalProperties": False
     }
 
-    @staticmethod
-    def _iter_scenario_args(cls, method, ctx, args, event_queue, aborted):
-        def _scenario_args(i):
-            if aborted.is_set():
-                raise StopIteration()
-            return (cls, method, runner._get_scenario_context(i, ctx), args,
-                    event_queue)
-        return _scenario_args
-
     def _run_scenario(self, cls, method, context, args):
         """Runs the specified benchmark scenario with given arguments.
 
+        Iterations are executed by a pool of threads in each of the worker
+        processes (no more than the number of CPUs), new iterations are not
+        started after the duration has elapsed.
+
         :param cls: The Scenario class where the scenario is implemented
         :param method: Name of the method that implements the scenario
         :param context: Benchmark context that contains users, admin & other
@@ -311,46 +397,35 @@ class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
         timeout = self.config.get("timeout", 600)
         concurrency = self.config.get("concurrency", 1)
         duration = self.config.get("duration")
+        iteration_gen = utils.RAMInt()
 
-        # FIXME(andreykurilin): unify `_worker_process`, use it here and remove
-        #     usage of `multiprocessing.Pool`(usage of separate process for
-        #     each concurrent iteration is redundant).
-        pool = multiprocessing.Pool(concurrency)
-        manager = multiprocessing.Manager()
-        event_queue = manager.Queue()
-        stop_event_listener = threading.Event()
-
-        def event_listener():
-            while not stop_event_listener.isSet():
-                while not event_queue.empty():
-                    self.send_event(**event_queue.get())
-                else:
-                    time.sleep(0.01)
-
-        event_listener_thread = threading.Thread(target=event_listener)
-        event_listener_thread.start()
-
-        run_args = butils.infinite_run_args_generator(
-            self._iter_scenario_args(
-                cls, method, context, args, event_queue, self.aborted))
-        iter_result = pool.imap(_run_scenario_once_with_unpack_args, run_args)
-
-        start = time.time()
-        while True:
-            try:
-                result = iter_result.next(timeout)
-            except multiprocessing.TimeoutError as e:
-                result = runner.format_result_on_timeout(e, timeout)
-            except StopIteration:
-                break
+        cpu_count = multiprocessing.cpu_count()
+        max_cpu_used = min(cpu_count,
+                           self.config.get("max_cpu_count", cpu_count))
 
-            self._send_result(result)
+        processes_to_start = min(max_cpu_used, concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            concurrency, processes_to_start)
 
-            if time.time() - start > duration:
-                break
+        self._log_debug_info(duration=duration, concurrency=concurrency,
+                             timeout=timeout, max_cpu_used=max_cpu_used,
+                             processes_to_start=processes_to_start,
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
+
+        result_queue, event_queue = self._create_queues()
+        deadline = time.time() + duration
 
-        stop_event_listener.set()
-        event_listener_thread.join()
-        pool.terminate()
-        pool.join()
-        self._flush_results()
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       deadline, context, cls, method, args, event_queue,
+                       self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, _worker_process_for_duration,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue, event_queue)
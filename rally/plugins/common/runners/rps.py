@@ -121,6 +121,77 @@ def _worker_process(queue, iteration_gen, timeout, times, max_concurrent,
         collector_thr_by_timeout.join()
 
 
+def _worker_process_with_pool(queue, iteration_gen, timeout, times,
+                              max_concurrent, context, cls, method_name, args,
+                              event_queue, aborted, runs_per_second, rps_cfg,
+                              processes_to_start, info):
+    """Start scenario within a pool of long-lived threads.
+
+    It works the same way as _worker_process, but iterations are executed by
+    a set of reused threads (no more than max_concurrent) instead of a new
+    thread per iteration. The process sleeps until the start time of the
+    next iteration rather than polling the achieved rps.
+
+    :param queue: queue object to append results
+    :param iteration_gen: next iteration number generator
+    :param timeout: operation's timeout
+    :param times: total number of scenario iterations to be run
+    :param max_concurrent: maximum worker concurrency
+    :param context: scenario context object
+    :param cls: scenario class
+    :param method_name: scenario method name
+    :param args: scenario args
+    :param aborted: multiprocessing.Event that aborts load generation if
+                    the flag is set
+    :param runs_per_second: function that should return desired rps value
+    :param rps_cfg: rps section from task config
+    :param processes_to_start: int, number of started processes for scenario
+                               execution
+    :param info: info about all processes count and counter of runned process
+    """
+    if isinstance(rps_cfg, dict):
+        rps = rps_cfg["start"]
+        # NOTE: desired rps changes over time, so it should be re-evaluated
+        #     while waiting for the next iteration
+        max_wait = 0.1
+    else:
+        rps = rps_cfg
+        max_wait = None
+    sleep = 1.0 / rps
+
+    runner._log_worker_info(times=times, rps=rps, timeout=timeout,
+                            cls=cls, method_name=method_name, args=args)
+
+    time.sleep(
+        (sleep * info["processes_counter"]) / info["processes_to_start"])
+
+    pool = runner.WorkerThreadPool(max_concurrent, queue, cls, method_name,
+                                   context, args, event_queue, timeout)
+    start = time.time()
+
+    i = 0
+    while i < times and not aborted.is_set():
+        pool.wait_for_slot()
+        while not aborted.is_set():
+            delay = (start + i / runs_per_second(
+                rps_cfg, start, processes_to_start) - time.time())
+            if delay <= 0:
+                break
+            aborted.wait(min(delay, max_wait) if max_wait else delay)
+        if aborted.is_set():
+            pool.release_slot()
+            break
+
+        pool.submit(next(iteration_gen))
+        i += 1
+
+    pool.join()
+
+
+WORKER_MODES = {"thread_per_iteration": _worker_process,
+                "thread_pool": _worker_process_with_pool}
+
+
 @validation.configure("check_rps")
 class CheckPRSValidator(validation.Validator):
     """Additional schema validation for rps runner"""
@@ -203,6 +274,14 @@ class RPSScenarioRunner(runner.ScenarioRunner):
             "max_cpu_count": {
                 "type": "integer",
                 "minimum": 1
+            },
+            "worker_mode": {
+                "enum": sorted(WORKER_MODES),
+                "description": "The way iterations are executed inside of "
+                               "each process: 'thread_per_iteration' starts "
+                               "a new thread for each iteration, "
+                               "'thread_pool' reuses a set of long-lived "
+                               "threads."
             }
         },
         "required": ["type", "times", "rps"],
@@ -228,6 +307,7 @@ class RPSScenarioRunner(runner.ScenarioRunner):
         """
         times = self.config["times"]
         timeout = self.config.get("timeout", 0)  # 0 means no timeout
+        worker_mode = self.config.get("worker_mode", "thread_per_iteration")
         iteration_gen = utils.RAMInt()
 
         cpu_count = multiprocessing.cpu_count()
@@ -262,8 +342,7 @@ class RPSScenarioRunner(runner.ScenarioRunner):
                              concurrency_per_worker=concurrency_per_worker,
                              concurrency_overhead=concurrency_overhead)
 
-        result_queue = multiprocessing.Queue()
-        event_queue = multiprocessing.Queue()
+        result_queue, event_queue = self._create_queues()
 
         def worker_args_gen(times_overhead, concurrency_overhead):
             """Generate arguments for process worker.
@@ -293,6 +372,6 @@ class RPSScenarioRunner(runner.ScenarioRunner):
                     concurrency_overhead -= 1
 
         process_pool = self._create_process_pool(
-            processes_to_start, _worker_process,
+            processes_to_start, WORKER_MODES[worker_mode],
             worker_args_gen(times_overhead, concurrency_overhead))
         self._join_processes(process_pool, result_queue, event_queue)
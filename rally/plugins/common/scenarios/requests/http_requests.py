@@ -54,3 +54,43 @@ class HttpRequestsCheckRandomRequest(utils.RequestScenario):
         request = random.choice(requests)
         request.setdefault("status_code", status_code)
         self._check_request(**request)
+
+
+@scenario.configure(name="HttpRequests.check_request_async")
+class HttpRequestsCheckRequestAsync(utils.AsyncRequestScenario):
+
+    def run(self, url, method, status_code, **kwargs):
+        """Asynchronously benchmark web services.
+
+        This benchmark makes request and checks it with expected response
+        without blocking the thread, so it should be launched by the
+        `asyncio` runner. It requires aiohttp library (Python 3.5+).
+
+        :param url: url for the Request object
+        :param method: method for the Request object
+        :param status_code: expected response code
+        :param kwargs: optional additional request parameters (see
+                       aiohttp.ClientSession.request)
+        """
+
+        return self._check_request_async(url, method, status_code, **kwargs)
+
+
+@scenario.configure(name="HttpRequests.check_random_request_async")
+class HttpRequestsCheckRandomRequestAsync(utils.AsyncRequestScenario):
+
+    def run(self, requests, status_code):
+        """Asynchronously benchmark the list of requests
+
+        This scenario takes random url from list of requests, and fails if
+        the response is not the expected response. It should be launched by
+        the `asyncio` runner and requires aiohttp library (Python 3.5+).
+
+        :param requests: List of request dicts
+        :param status_code: Expected Response Code it will
+        be used only if we doesn't specified it in request proper
+        """
+
+        request = random.choice(requests)
+        request.setdefault("status_code", status_code)
+        return self._check_request_async(**request)
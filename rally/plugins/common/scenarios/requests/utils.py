@@ -12,10 +12,19 @@
 
 import requests
 
+from rally.common import asyncutils
 from rally.common.i18n import _
+from rally import exceptions
 from rally.task import atomic
 from rally.task import scenario
 
+try:
+    import aiohttp
+except ImportError:
+    # NOTE: aiohttp is an optional requirement which is used only by
+    #     asynchronous scenarios (see optional-requirements.txt)
+    aiohttp = None
+
 
 class RequestScenario(scenario.Scenario):
     """Base class for Request scenarios with basic atomic actions."""
@@ -37,3 +46,92 @@ class RequestScenario(scenario.Scenario):
             error_msg = _("Expected HTTP request code is `%s` actual `%s`")
             raise ValueError(
                 error_msg % (status_code, resp.status_code))
+
+
+class AsyncRequestScenario(scenario.Scenario):
+    """Base class for asynchronous Request scenarios.
+
+    Such scenarios should be launched by the `asyncio` runner.
+    """
+
+    # NOTE: sessions keep the pools of connections, so they are shared by
+    #     all iterations which run in the same event loop
+    _sessions = {}
+
+    @classmethod
+    def _get_session(cls, loop):
+        if aiohttp is None:
+            raise exceptions.RallyException(
+                _("Asynchronous HTTP requests require aiohttp library. "
+                  "To install it run `pip install aiohttp`."))
+        session = cls._sessions.get(loop)
+        if session is None or session.closed:
+            if loop not in cls._sessions:
+                asyncutils.add_finalizer(
+                    loop, lambda: cls._close_session(loop))
+            # NOTE: the number of simultaneous connections is limited only
+            #     by the concurrency of the runner
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0))
+            cls._sessions[loop] = session
+        return session
+
+    @classmethod
+    def _close_session(cls, loop):
+        session = cls._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            # NOTE: close() is a coroutine in recent versions of aiohttp
+            return session.close()
+
+    def _check_request_async(self, url, method, status_code, **kwargs):
+        """Asynchronously compare request status code with specified code
+
+        :param status_code: Expected status code of request
+        :param url: Uniform resource locator
+        :param method: Type of request method (GET | POST ..)
+        :param kwargs: Optional additional request parameters
+        :returns: asyncio.Future which fails with ValueError if returned
+                  http status code is not equal to expected status code
+        """
+        loop = asyncutils.asyncio.get_event_loop()
+        session = self._get_session(loop)
+        result = asyncutils.asyncio.Future(loop=loop)
+        timer = atomic.ActionTimer(self, "requests.check_request")
+        timer.__enter__()
+
+        def on_body(future, response):
+            timer.__exit__(None, None, None)
+            if future.cancelled() or result.done():
+                return
+            if future.exception():
+                result.set_exception(future.exception())
+            elif status_code != response.status:
+                error_msg = _("Expected HTTP request code is `%s` actual "
+                              "`%s`")
+                result.set_exception(
+                    ValueError(error_msg % (status_code, response.status)))
+            else:
+                result.set_result(response.status)
+
+        def on_response(future):
+            if future.cancelled() or result.done():
+                timer.__exit__(None, None, None)
+                return
+            if future.exception():
+                timer.__exit__(None, None, None)
+                result.set_exception(future.exception())
+                return
+            response = future.result()
+            # NOTE: the connection is returned to the pool after the body
+            #     is read
+            body = asyncutils.ensure_future(response.read(), loop)
+            body.add_done_callback(lambda f: on_body(f, response))
+            result.add_done_callback(lambda f: f.cancelled() and body.cancel())
+
+        request = asyncutils.ensure_future(
+            session.request(method, url, **kwargs), loop)
+        request.add_done_callback(on_response)
+        # NOTE: cancellation (i.e. timeout of the iteration) of the result
+        #     should stop the request
+        result.add_done_callback(lambda f: f.cancelled() and request.cancel())
+        return result
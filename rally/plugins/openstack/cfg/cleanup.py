@@ -19,5 +19,14 @@ OPTS = {"cleanup": [
     cfg.IntOpt("resource_deletion_timeout", default=600,
                help="A timeout in seconds for deleting resources"),
     cfg.IntOpt("cleanup_threads", default=20,
-               help="Number of cleanup threads to run")
+               help="Number of cleanup threads to run. It includes threads "
+                    "listing resources, deleting them and waiting for their "
+                    "deletion"),
+    cfg.IntOpt("cleanup_publisher_threads", default=5,
+               help="Maximum number of threads listing resources of "
+                    "different users for cleanup. They are taken from "
+                    "cleanup_threads, but no more than a half of them"),
+    cfg.IntOpt("cleanup_queue_size", default=1000,
+               help="Maximum number of listed resources waiting for "
+                    "deletion")
 ]}
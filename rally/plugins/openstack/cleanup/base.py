@@ -46,7 +46,8 @@ class NoName(object):
 def resource(service, resource, order=0, admin_required=False,
              perform_for_admin_only=False, tenant_resource=False,
              max_attempts=3, timeout=CONF.cleanup.resource_deletion_timeout,
-             interval=1, threads=CONF.cleanup.cleanup_threads):
+             interval=1, threads=CONF.cleanup.cleanup_threads,
+             bulk_is_deleted=False):
     """Decorator that overrides resource specification.
 
     Just put it on top of your resource class and specify arguments that you
@@ -66,6 +67,9 @@ def resource(service, resource, order=0, admin_required=False,
     :param interval: Resource status pooling interval
     :param threads: Amount of threads (workers) that are deleting resources
                     simultaneously
+    :param bulk_is_deleted: Check deletion of all resources of a tenant by
+                            a single bulk_is_deleted() call instead of
+                            is_deleted() per resource
     """
 
     def inner(cls):
@@ -80,6 +84,7 @@ def resource(service, resource, order=0, admin_required=False,
         cls._interval = interval
         cls._threads = threads
         cls._tenant_resource = tenant_resource
+        cls._bulk_is_deleted = bulk_is_deleted
 
         return cls
 
@@ -129,6 +134,22 @@ class ResourceManager(object):
 
         return utils.get_status(resource) in ("DELETED", "DELETE_COMPLETE")
 
+    def bulk_is_deleted(self, ids):
+        """Checks which of the resources are deleted.
+
+        Lists resources from service and considers deleted those of them
+        which are not listed or have status DELETED or DELETE_COMPLETE.
+
+        :param ids: ids of resources to check
+        :returns: set of ids of deleted resources
+        """
+        existing = set()
+        for raw_resource in self.list():
+            if utils.get_status(raw_resource) not in ("DELETED",
+                                                      "DELETE_COMPLETE"):
+                existing.add(self.__class__(resource=raw_resource).id())
+        return set(ids) - existing
+
     def delete(self):
         """Delete resource that corresponds to instance of this class."""
         self._manager().delete(self.id())
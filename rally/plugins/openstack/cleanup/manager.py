@@ -13,8 +13,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+import itertools
+import threading
 import time
 
+from oslo_config import cfg
+
 from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
@@ -24,13 +29,17 @@ from rally.common import utils as rutils
 from rally.plugins.openstack.cleanup import base
 
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+# the smallest number of threads SeekAndDestroy.exterminate() runs
+MIN_MANAGER_THREADS = 3
+
 
 class SeekAndDestroy(object):
 
     def __init__(self, manager_cls, admin, users, api_versions=None,
-                 resource_classes=None, task_id=None):
+                 resource_classes=None, task_id=None, threads=None):
         """Resource deletion class.
 
         This class contains method exterminate() that finds and deletes
@@ -43,6 +52,9 @@ class SeekAndDestroy(object):
         :param resource_classes: Resource classes to match resource names
                                  against
         :param task_id: The UUID of task to match resource names against
+        :param threads: Number of threads listing, deleting and watching
+                        deletion of resources, by default
+                        manager_cls._threads
         """
         self.manager_cls = manager_cls
         self.admin = admin
@@ -51,6 +63,13 @@ class SeekAndDestroy(object):
         self.resource_classes = resource_classes or [
             rutils.RandomNameGeneratorMixin]
         self.task_id = task_id
+        self.threads = threads
+        # NOTE: if manager_cls supports bulk_is_deleted(), deleted resources
+        #     are not polled one by one. They are put to the watch set
+        #     (tenant uuid -> resource uuid -> (resource, msg_kw, started))
+        #     which is checked by a single _watcher() thread.
+        self._watch_set = None
+        self._watch_lock = threading.Lock()
 
     def _get_cached_client(self, user):
         """Simplifies initialization and caching OpenStack clients."""
@@ -93,6 +112,10 @@ class SeekAndDestroy(object):
             if logging.is_debug():
                 LOG.exception(e)
         else:
+            if self._watch_set is not None:
+                self._watch_deletion(resource, msg_kw)
+                return
+
             started = time.time()
             failures_count = 0
             while time.time() - started < resource._timeout:
@@ -119,49 +142,131 @@ class SeekAndDestroy(object):
                           "%(service)s.%(resource)s: %(uuid)s.")
                         % msg_kw)
 
-    def _publisher(self, queue):
-        """Publisher for deletion jobs.
+    def _watch_deletion(self, resource, msg_kw):
+        """Put resource to the watch set until it is deleted."""
+        with self._watch_lock:
+            resources = self._watch_set.setdefault(resource.tenant_uuid, {})
+            resources[msg_kw["uuid"]] = (resource, msg_kw, time.time())
 
-        This method iterates over all users, lists all resources
-        (using manager_cls) and puts jobs for deletion.
+    def _check_deletions(self, failures):
+        """Check watched resources by one bulk_is_deleted() per tenant.
 
-        Every deletion job contains tuple with two values: user and resource
-        uuid that should be deleted.
+        Deleted resources and resources which deletion is timed out are
+        removed from the watch set.
 
-        In case of tenant based resource, uuids are fetched only from one user
-        per tenant.
+        :param failures: dict with numbers of failed checks per tenant
         """
-        def _publish(admin, user, manager):
+        with self._watch_lock:
+            watched = [(tenant_uuid, dict(resources))
+                       for tenant_uuid, resources in self._watch_set.items()]
+
+        for tenant_uuid, resources in watched:
+            manager = next(iter(resources.values()))[0]
             try:
-                for raw_resource in rutils.retry(3, manager.list):
-                    queue.append((admin, user, raw_resource))
+                deleted = manager.bulk_is_deleted(list(resources))
             except Exception as e:
                 LOG.warning(
-                    _("Seems like %s.%s.list(self) method is broken. "
-                      "It shouldn't raise any exceptions.")
+                    _("Seems like %s.%s.bulk_is_deleted(self, ids) method is "
+                      "broken. It shouldn't raise any exceptions.")
                     % (manager.__module__, type(manager).__name__))
                 LOG.exception(e)
+                failures[tenant_uuid] = failures.get(tenant_uuid, 0) + 1
+                deleted = set()
+
+            now = time.time()
+            with self._watch_lock:
+                for uuid, (resource, msg_kw, started) in resources.items():
+                    if uuid not in deleted:
+                        if (now - started < resource._timeout and
+                                failures.get(tenant_uuid, 0) <=
+                                resource._max_attempts):
+                            continue
+                        LOG.warning(
+                            _("Resource deletion failed, timeout occurred "
+                              "for %(service)s.%(resource)s: %(uuid)s.")
+                            % msg_kw)
+                    del self._watch_set[tenant_uuid][uuid]
+                if not self._watch_set[tenant_uuid]:
+                    del self._watch_set[tenant_uuid]
+
+    def _watcher(self, stop_event):
+        """Check the watch set until it is empty and stop_event is set."""
+        failures = {}
+        while True:
+            stopped = stop_event.is_set()
+            if self._watch_set:
+                self._check_deletions(failures)
+            if stopped and not self._watch_set:
+                return
+            if stopped:
+                rutils.interruptable_sleep(self.manager_cls._interval)
+            else:
+                stop_event.wait(self.manager_cls._interval)
+
+    def _list_resources(self, queue, user, admin_client=None):
+        """Put jobs for deletion of resources of admin or a single user.
+
+        :param queue: queue to put jobs to
+        :param user: user to list resources of or None to list resources
+                     of admin
+        :param admin_client: admin clients to init manager_cls with
+        """
+        if user is None:
+            manager = self.manager_cls(
+                admin=self._get_cached_client(self.admin))
+        else:
+            manager = self.manager_cls(
+                admin=admin_client,
+                user=self._get_cached_client(user),
+                tenant_uuid=user["tenant_id"])
+        try:
+            for raw_resource in rutils.retry(3, manager.list):
+                queue.append((self.admin, user, raw_resource))
+        except Exception as e:
+            LOG.warning(
+                _("Seems like %s.%s.list(self) method is broken. "
+                  "It shouldn't raise any exceptions.")
+                % (manager.__module__, type(manager).__name__))
+            LOG.exception(e)
+
+    def _publishers(self):
+        """Publishers for deletion jobs.
 
+        Every publisher lists resources of admin or a single user (using
+        manager_cls) and puts jobs for deletion, so resources of different
+        users can be listed concurrently.
+
+        Every deletion job contains tuple with three values: admin, user and
+        resource that should be deleted.
+
+        In case of tenant based resource, resources are listed only for one
+        user per tenant.
+        """
         if self.admin and (not self.users
                            or self.manager_cls._perform_for_admin_only):
-            manager = self.manager_cls(
-                admin=self._get_cached_client(self.admin))
-            _publish(self.admin, None, manager)
+            return [functools.partial(self._list_resources, user=None)]
+
+        publishers = []
+        visited_tenants = set()
+        admin_client = self._get_cached_client(self.admin)
+        for user in self.users:
+            if (self.manager_cls._tenant_resource
+               and user["tenant_id"] in visited_tenants):
+                continue
 
-        else:
-            visited_tenants = set()
-            admin_client = self._get_cached_client(self.admin)
-            for user in self.users:
-                if (self.manager_cls._tenant_resource
-                   and user["tenant_id"] in visited_tenants):
-                    continue
-
-                visited_tenants.add(user["tenant_id"])
-                manager = self.manager_cls(
-                    admin=admin_client,
-                    user=self._get_cached_client(user),
-                    tenant_uuid=user["tenant_id"])
-                _publish(self.admin, user, manager)
+            visited_tenants.add(user["tenant_id"])
+            publishers.append(functools.partial(
+                self._list_resources, user=user, admin_client=admin_client))
+        return publishers
+
+    def _publisher(self, queue):
+        """Publisher for deletion jobs.
+
+        This method iterates over all users, lists all resources
+        (using manager_cls) and puts jobs for deletion.
+        """
+        for publish in self._publishers():
+            publish(queue)
 
     def _consumer(self, cache, args):
         """Method that consumes single deletion job."""
@@ -182,8 +287,33 @@ class SeekAndDestroy(object):
     def exterminate(self):
         """Delete all resources for passed users, admin and resource_mgr."""
 
-        broker.run(self._publisher, self._consumer,
-                   consumers_count=self.manager_cls._threads)
+        # NOTE: threads which list, delete and watch deletion of resources
+        #     share the same budget. At least one thread lists and one thread
+        #     deletes resources, even if the budget is smaller.
+        threads = self.threads or self.manager_cls._threads
+        publishers = self._publishers()
+
+        watcher = None
+        if self.manager_cls._bulk_is_deleted:
+            threads -= 1
+            self._watch_set = {}
+            stop_event = threading.Event()
+            watcher = threading.Thread(target=self._watcher,
+                                       args=(stop_event,))
+            watcher.start()
+
+        publishers_count = max(1, min(CONF.cleanup.cleanup_publisher_threads,
+                                      len(publishers), threads // 2))
+        try:
+            broker.run_pipelined(
+                publishers, self._consumer,
+                consumers_count=max(1, threads - publishers_count),
+                publishers_count=publishers_count,
+                queue_size=CONF.cleanup.cleanup_queue_size)
+        finally:
+            if watcher:
+                stop_event.set()
+                watcher.join()
 
 
 def list_resource_names(admin_required=None):
@@ -251,7 +381,9 @@ def cleanup(names=None, admin_required=None, admin=None, users=None,
     with _service from services or _resource from resources.
 
     Then goes through all passed users and using cleaners cleans all related
-    resources.
+    resources. Resource managers with the same order are run concurrently
+    (all resource managers in this tree have distinct orders, so they are run
+    one by one, unless a plugin shares the order with another one).
 
     :param names: Use only resource managers that have names in this list.
                   There are in as _service or
@@ -279,11 +411,32 @@ def cleanup(names=None, admin_required=None, admin=None, users=None,
     if not resource_classes and issubclass(superclass,
                                            rutils.RandomNameGeneratorMixin):
         resource_classes.append(superclass)
-    for manager in find_resource_managers(names, admin_required):
+
+    def exterminate(cache, args):
+        manager, threads = args
         LOG.debug("Cleaning up %(service)s %(resource)s objects" %
                   {"service": manager._service,
                    "resource": manager._resource})
         SeekAndDestroy(manager, admin, users,
                        api_versions=api_versions,
                        resource_classes=resource_classes,
-                       task_id=task_id).exterminate()
+                       task_id=task_id,
+                       threads=threads).exterminate()
+
+    # NOTE: managers with the same order do not depend on each other, so
+    #     they are run concurrently sharing cleanup_threads between them.
+    #     SeekAndDestroy uses at least one thread to list resources, one to
+    #     delete them and one to watch the deletion, so each manager gets at
+    #     least MIN_MANAGER_THREADS to stay within the budget.
+    threads_count = CONF.cleanup.cleanup_threads
+    for order, managers in itertools.groupby(
+            find_resource_managers(names, admin_required),
+            key=lambda manager: manager._order):
+        managers = list(managers)
+        managers_count = max(1, min(len(managers),
+                                    threads_count // MIN_MANAGER_THREADS))
+        manager_threads = max(1, threads_count // managers_count)
+        jobs = [(manager, min(manager._threads, manager_threads))
+                for manager in managers]
+        broker.run(lambda queue: queue.extend(jobs), exterminate,
+                   consumers_count=managers_count)
@@ -21,6 +21,7 @@ from saharaclient.api import base as saharaclient_base
 
 from rally.common import logging
 from rally import consts
+from rally import exceptions
 from rally.plugins.openstack.cleanup import base
 from rally.plugins.openstack.services.identity import identity
 from rally.plugins.openstack.services.image import image
@@ -41,6 +42,20 @@ def get_order(start):
     return iter(range(start, start + 99))
 
 
+class BenchmarkOption(object):
+    """Value of a benchmark option which is read on each access.
+
+    It can be passed to base.resource() instead of a value which should
+    follow the config loaded after import of this module.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        return getattr(CONF.benchmark, self.name)
+
+
 class SynchronizedDeletion(object):
 
     def is_deleted(self):
@@ -149,7 +164,7 @@ _nova_order = get_order(200)
 
 
 @base.resource("nova", "servers", order=next(_nova_order),
-               tenant_resource=True)
+               tenant_resource=True, bulk_is_deleted=True)
 class NovaServer(base.ResourceManager):
     def list(self):
         """List all servers."""
@@ -515,7 +530,7 @@ class CinderVolumeTransfer(base.ResourceManager):
 
 
 @base.resource("cinder", "volumes", order=next(_cinder_order),
-               tenant_resource=True)
+               tenant_resource=True, bulk_is_deleted=True)
 class CinderVolume(base.ResourceManager):
     pass
 
@@ -580,7 +595,10 @@ class ManilaSecurityService(base.ResourceManager):
 
 # GLANCE
 
-@base.resource("glance", "images", order=500, tenant_resource=True)
+@base.resource("glance", "images", order=500, tenant_resource=True,
+               timeout=BenchmarkOption("glance_image_delete_timeout"),
+               interval=BenchmarkOption("glance_image_delete_poll_interval"),
+               bulk_is_deleted=True)
 class GlanceImage(base.ResourceManager):
 
     def _client(self):
@@ -589,15 +607,18 @@ class GlanceImage(base.ResourceManager):
     def list(self):
         return self._client().list_images(owner=self.tenant_uuid)
 
+    def is_deleted(self):
+        try:
+            resource = self._client().get_image(self.id())
+        except exceptions.GetResourceNotFound:
+            return True
+        except Exception as e:
+            return getattr(e, "code", getattr(e, "http_status", 400)) == 404
+
+        return task_utils.get_status(resource) == "DELETED"
+
     def delete(self):
-        client = self._client()
-        client.delete_image(self.raw_resource.id)
-        task_utils.wait_for_status(
-            self.raw_resource, ["deleted"],
-            check_deletion=True,
-            update_resource=self._client().get_image,
-            timeout=CONF.benchmark.glance_image_delete_timeout,
-            check_interval=CONF.benchmark.glance_image_delete_poll_interval)
+        self._client().delete_image(self.id())
 
 
 # SAHARA
@@ -22,6 +22,7 @@ import traceback
 
 import jsonschema
 from oslo_config import cfg
+from six.moves import queue as Queue
 
 from rally.common.i18n import _
 from rally.common import logging
@@ -33,6 +34,7 @@ from rally import exceptions
 from rally.plugins.openstack import scenario as os_scenario
 from rally.task import context
 from rally.task import hook
+from rally.task.processing import stats
 from rally.task import runner
 from rally.task import scenario
 from rally.task import sla
@@ -46,10 +48,83 @@ CONF = cfg.CONF
 TASK_ENGINE_OPTS = [
     cfg.IntOpt("raw_result_chunk_size", default=1000, min=1,
                help="Size of raw result chunk in iterations"),
+    cfg.IntOpt("raw_result_write_batch_size", default=10, min=1,
+               help="Maximum number of raw result chunks stored in the "
+                    "database in one transaction"),
+    cfg.IntOpt("raw_result_write_queue_size", default=10, min=1,
+               help="Maximum number of raw result chunks waiting to be "
+                    "stored in the database. Consumption of results is "
+                    "paused while the limit is reached"),
 ]
 CONF.register_opts(TASK_ENGINE_OPTS)
 
 
+class WorkloadDataWriter(object):
+    """Stores chunks of workload data in the background.
+
+    Chunks are put into a bounded queue and written by a separate thread.
+    All chunks accumulated in the queue while the previous write was in
+    progress are stored in one transaction. If the database falls behind
+    and the queue is full, adding a chunk blocks until there is a space.
+    If some chunks can't be stored, the error is raised by close().
+    """
+
+    def __init__(self, workload, batch_size, queue_size):
+        """WorkloadDataWriter constructor.
+
+        :param workload: Instance of Workload
+        :param batch_size: maximum number of chunks stored in one transaction
+        :param queue_size: maximum number of chunks waiting to be stored
+        """
+        self.workload = workload
+        self.batch_size = batch_size
+        self.queue = Queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self._write_chunks)
+
+    def start(self):
+        self.thread.start()
+
+    def add(self, chunk_order, workload_data):
+        self.queue.put((chunk_order, workload_data))
+
+    def close(self):
+        """Wait until all added chunks are stored.
+
+        :raises Exception: if some chunks were not stored, the first
+            error occurred while storing them is raised
+        """
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _write_chunks(self):
+        is_closed = False
+        while not is_closed:
+            chunks = [self.queue.get()]
+            if chunks[0] is None:
+                break
+            while len(chunks) < self.batch_size:
+                try:
+                    chunk = self.queue.get_nowait()
+                except Queue.Empty:
+                    break
+                if chunk is None:
+                    is_closed = True
+                    break
+                chunks.append(chunk)
+            try:
+                self.workload.add_workload_data_chunks(chunks)
+            except Exception as e:
+                LOG.error("Failed to store chunks %s of workload data: %s"
+                          % ([c[0] for c in chunks], e))
+                if logging.is_debug():
+                    LOG.exception(e)
+                if self.error is None:
+                    self.error = e
+
+
 class ResultConsumer(object):
     """ResultConsumer class stores results from ScenarioRunner, checks SLA.
 
@@ -79,6 +154,10 @@ class ResultConsumer(object):
         self.load_started_at = float("inf")
         self.load_finished_at = 0
         self.workload_data_count = 0
+        self.stats = stats.WorkloadStats()
+        self.data_writer = WorkloadDataWriter(
+            workload, batch_size=CONF.raw_result_write_batch_size,
+            queue_size=CONF.raw_result_write_queue_size)
 
         self.sla_checker = sla.SLAChecker(key["kw"])
         self.hook_executor = hook.HookExecutor(key["kw"], self.task)
@@ -92,6 +171,7 @@ class ResultConsumer(object):
             self.event_thread = threading.Thread(target=self._consume_events)
 
     def __enter__(self):
+        self.data_writer.start()
         self.thread.start()
         self.aborting_checker.start()
         if "hooks" in self.key["kw"]:
@@ -101,15 +181,16 @@ class ResultConsumer(object):
 
     def _consume_results(self):
         task_aborted = False
+        chunk_size = CONF.raw_result_chunk_size
         while True:
             if self.runner.result_queue:
                 results = self.runner.result_queue.popleft()
-                self.results.extend(results)
                 for r in results:
                     self.load_started_at = min(r["timestamp"],
                                                self.load_started_at)
                     self.load_finished_at = max(r["duration"] + r["timestamp"],
                                                 self.load_finished_at)
+                    self.stats.add_iteration(r)
                     success = self.sla_checker.add_iteration(r)
                     if (self.abort_on_sla_failure and
                             not success and
@@ -120,15 +201,15 @@ class ResultConsumer(object):
                             consts.TaskStatus.SOFT_ABORTING)
                         task_aborted = True
 
-                # save results chunks
-                chunk_size = CONF.raw_result_chunk_size
-                while len(self.results) >= chunk_size:
-                    results_chunk = self.results[:chunk_size]
-                    self.results = self.results[chunk_size:]
-                    results_chunk.sort(key=lambda x: x["timestamp"])
-                    self.workload.add_workload_data(self.workload_data_count,
-                                                    {"raw": results_chunk})
-                    self.workload_data_count += 1
+                    # save results chunks
+                    self.results.append(r)
+                    if len(self.results) >= chunk_size:
+                        results_chunk = self.results
+                        self.results = []
+                        results_chunk.sort(key=lambda x: x["timestamp"])
+                        self.data_writer.add(self.workload_data_count,
+                                             {"raw": results_chunk})
+                        self.workload_data_count += 1
 
             elif self.is_done.isSet():
                 break
@@ -175,14 +256,22 @@ class ResultConsumer(object):
             # NOTE(boris-42): Sort in order of starting
             #                 instead of order of ending
             self.results.sort(key=lambda x: x["timestamp"])
-            self.workload.add_workload_data(self.workload_data_count,
-                                            {"raw": self.results})
+            self.data_writer.add(self.workload_data_count,
+                                 {"raw": self.results})
+        try:
+            self.data_writer.close()
+        except Exception as e:
+            # NOTE: some results are lost, so the workload can't be
+            #     considered as successful
+            if not exc_type:
+                self.sla_checker.set_unexpected_failure(e)
         start_time = (self.load_started_at
                       if self.load_started_at != float("inf") else None)
         self.workload.set_results(load_duration=load_duration,
                                   full_duration=(self.finish - self.start),
                                   sla_results=self.sla_checker.results(),
-                                  start_time=start_time, **results)
+                                  start_time=start_time,
+                                  stats=self.stats.to_dict(), **results)
 
     @staticmethod
     def is_task_in_aborting_status(task_uuid, check_soft=True):
@@ -19,11 +19,23 @@ import math
 
 import six
 
+try:
+    import numpy
+except ImportError:
+    # NOTE: numpy is an optional requirement which speeds up processing
+    #     of big workloads (see optional-requirements.txt)
+    numpy = None
+
 from rally.common.plugin import plugin
 from rally.common import streaming_algorithms as streaming
 from rally.task.processing import utils
 
 
+def _fix_missing(values):
+    """Set `0' instead of NaN for missed atomic actions."""
+    return (0 if math.isnan(value) else value for value in values)
+
+
 @plugin.base()
 @six.add_metaclass(abc.ABCMeta)
 class Chart(plugin.Plugin):
@@ -48,6 +60,7 @@ class Chart(plugin.Plugin):
         self._workload = workload
         self.base_size = self._workload["total_iteration_count"]
         self.zipped_size = zipped_size
+        self._atomic_merger = None
 
     def add_iteration(self, iteration):
         """Add iteration data.
@@ -63,6 +76,25 @@ class Chart(plugin.Plugin):
                                                      self.zipped_size)
             self._data[name].add_point(value)
 
+    def add_columns(self, columns):
+        """Add data of all iterations at once.
+
+        This is an alternative to calling add_iteration() for each
+        iteration, which processes values of utils.IterationColumns.
+        Charts which don't map columns by _map_columns() get iterations
+        rebuilt from the columns one by one.
+        """
+        mapped = self._map_columns(columns)
+        if mapped is None:
+            return self._add_rebuilt_iterations(columns)
+        for name, values in mapped:
+            if name not in self._data:
+                self._data[name] = utils.GraphZipper(self.base_size,
+                                                     self.zipped_size)
+            add_point = self._data[name].add_point
+            for value in values:
+                add_point(value)
+
     def render(self):
         """Generate chart data ready for drawing."""
         return [(name, points.get_zipped_graph())
@@ -79,21 +111,38 @@ class Chart(plugin.Plugin):
             atomic_actions.setdefault(name, 0)
         return atomic_actions
 
+    def _get_atomic_merger(self):
+        # NOTE: the merger resolves names of atomic actions, so it is
+        #     created once instead of for each iteration
+        if self._atomic_merger is None:
+            self._atomic_merger = utils.AtomicMerger(
+                self._workload["statistics"]["atomics"])
+        return self._atomic_merger
+
     def _get_atomic_names(self):
-        atomic_merger = utils.AtomicMerger(
-            self._workload["statistics"]["atomics"])
-        return atomic_merger.get_merged_names()
+        return self._get_atomic_merger().get_merged_names()
 
     def _merge_atomic_actions(self, atomic_actions):
-        atomic_merger = utils.AtomicMerger(
-            self._workload["statistics"]["atomics"])
-        return atomic_merger.merge_atomic_actions(
+        return self._get_atomic_merger().merge_atomic_actions(
             atomic_actions)
 
     @abc.abstractmethod
     def _map_iteration_values(self, iteration):
         """Get values for processing, from given iteration."""
 
+    def _map_columns(self, columns):
+        """Get values for processing, from given iteration columns.
+
+        :param columns: utils.IterationColumns instance
+        :returns: list of (name, iterable with values of all iterations) or
+            None if the chart processes only separate iterations
+        """
+        return None
+
+    def _add_rebuilt_iterations(self, columns):
+        for iteration in columns.iterations():
+            self.add_iteration(iteration)
+
 
 class MainStackedAreaChart(Chart):
 
@@ -113,6 +162,23 @@ class MainStackedAreaChart(Chart):
                 result.append(("failed_duration", 0))
         return result
 
+    def _map_columns(self, columns):
+        result = [
+            ("duration",
+             (0 if failed else duration for duration, failed in
+              six.moves.zip(columns.duration, columns.failed))),
+            ("idle_duration",
+             (0 if failed else idle for idle, failed in
+              six.moves.zip(columns.idle_duration, columns.failed)))]
+        if self._workload["failed_iteration_count"]:
+            result.append(
+                ("failed_duration",
+                 (duration + idle if failed else 0
+                  for duration, idle, failed in six.moves.zip(
+                      columns.duration, columns.idle_duration,
+                      columns.failed))))
+        return result
+
 
 class AtomicStackedAreaChart(Chart):
 
@@ -133,6 +199,23 @@ class AtomicStackedAreaChart(Chart):
             atomics.append(("failed_duration", failed_duration))
         return atomics
 
+    def _map_columns(self, columns):
+        atomics = [(name, _fix_missing(values))
+                   for name, values in columns.atomics.items()]
+        if self._workload["failed_iteration_count"]:
+            atomics.append(("failed_duration",
+                            self._get_failed_durations(columns)))
+        return atomics
+
+    def _get_failed_durations(self, columns):
+        atomics = list(columns.atomics.values())
+        for idx, failed in enumerate(columns.failed):
+            if failed:
+                yield (columns.duration[idx] + columns.idle_duration[idx]
+                       - sum(_fix_missing(a[idx] for a in atomics)))
+            else:
+                yield 0
+
 
 class AvgChart(Chart):
     """Base class for charts with average results."""
@@ -145,6 +228,16 @@ class AvgChart(Chart):
                 self._data[name] = streaming.MeanComputation()
             self._data[name].add(value or 0)
 
+    def add_columns(self, columns):
+        mapped = self._map_columns(columns)
+        if mapped is None:
+            return self._add_rebuilt_iterations(columns)
+        for name, values in mapped:
+            if name not in self._data:
+                self._data[name] = streaming.MeanComputation()
+            for value in values:
+                self._data[name].add(value or 0)
+
     def render(self):
         return [(k, v.result()) for k, v in self._data.items()]
 
@@ -157,6 +250,10 @@ class AtomicAvgChart(AvgChart):
         atomic_actions = self._fix_atomic_actions(atomic_actions)
         return list(atomic_actions.items())
 
+    def _map_columns(self, columns):
+        return [(name, _fix_missing(values))
+                for name, values in columns.atomics.items()]
+
 
 class LoadProfileChart(Chart):
     """Chart for parallel durations."""
@@ -182,27 +279,51 @@ class LoadProfileChart(Chart):
                            for x in six.moves.range(int(scale))
                            if (self.step * x) < self._duration]
         self._time_axis.append(self._duration)
+        # NOTE: parts of time points which are covered by iterations
+        #     partially are summed in _running, while time points covered
+        #     by iterations entirely are counted with the difference array
+        #     _covered and added on render
         self._running = [0] * len(self._time_axis)
+        self._covered = [0] * (len(self._time_axis) + 1)
         # NOTE(andreykurilin): There is a "start_time" field in workload
         #   object, but due to transformations in database layer, the
         #   microseconds can be not accurate enough.
-        if self._workload["data"]:
-            self._tstamp_start = self._workload["data"][0]["timestamp"]
+        data = self._workload["data"]
+        if isinstance(data, list) and data:
+            self._tstamp_start = data[0]["timestamp"]
         else:
+            # NOTE: the data can be loaded lazily, in this case the start
+            #     is taken from the columns passed to add_columns()
             self._tstamp_start = self._workload["start_time"]
 
     def _map_iteration_values(self, iteration):
         return iteration["timestamp"], iteration["duration"]
 
     def add_iteration(self, iteration):
-        timestamp, duration = self._map_iteration_values(iteration)
+        self._add_load(*self._map_iteration_values(iteration))
+
+    def add_columns(self, columns):
+        if not len(columns):
+            return
+        self._tstamp_start = min(columns.timestamp)
+        if numpy is not None:
+            self._add_load_columns(
+                numpy.frombuffer(columns.timestamp, dtype=float),
+                numpy.frombuffer(columns.duration, dtype=float))
+            return
+        for timestamp, duration in six.moves.zip(columns.timestamp,
+                                                 columns.duration):
+            self._add_load(timestamp, duration)
+
+    def _add_load(self, timestamp, duration):
         ts_start = timestamp - self._tstamp_start
         started_idx = bisect.bisect(self._time_axis, ts_start)
         ended_idx = bisect.bisect(self._time_axis, ts_start + duration)
         if self._time_axis[ended_idx - 1] == ts_start + duration:
             ended_idx -= 1
-        for idx in range(started_idx + 1, ended_idx):
-            self._running[idx] += 1
+        if started_idx + 1 < ended_idx:
+            self._covered[started_idx + 1] += 1
+            self._covered[ended_idx] -= 1
         if started_idx == ended_idx:
             self._running[ended_idx] += duration / self.step
         else:
@@ -212,8 +333,50 @@ class LoadProfileChart(Chart):
                 ts_start + duration
                 - self._time_axis[ended_idx - 1]) / self.step
 
+    def _add_load_columns(self, timestamps, durations):
+        """Vectorized version of _add_load() for numpy arrays."""
+        time_axis = numpy.array(self._time_axis)
+        ts_start = timestamps - self._tstamp_start
+        ts_end = ts_start + durations
+        started_idx = numpy.searchsorted(time_axis, ts_start, side="right")
+        ended_idx = numpy.searchsorted(time_axis, ts_end, side="right")
+        ended_idx -= time_axis[ended_idx - 1] == ts_end
+
+        size = len(self._covered)
+        covered = started_idx + 1 < ended_idx
+        covered_count = (
+            numpy.bincount(started_idx[covered] + 1, minlength=size)
+            - numpy.bincount(ended_idx[covered], minlength=size))
+
+        size = len(self._running)
+        same = started_idx == ended_idx
+        other = ~same
+        running = (
+            numpy.bincount(ended_idx[same],
+                           weights=durations[same] / self.step,
+                           minlength=size)
+            + numpy.bincount(started_idx[other],
+                             weights=(time_axis[started_idx[other]]
+                                      - ts_start[other]) / self.step,
+                             minlength=size)
+            + numpy.bincount(ended_idx[other],
+                             weights=(ts_end[other]
+                                      - time_axis[ended_idx[other] - 1])
+                             / self.step,
+                             minlength=size))
+
+        self._covered = [x + int(y) for x, y in zip(self._covered,
+                                                    covered_count)]
+        self._running = [x + y for x, y in zip(self._running,
+                                               running.tolist())]
+
     def render(self):
-        return [(self._name, list(zip(self._time_axis, self._running)))]
+        running = []
+        covered = 0
+        for value, covered_diff in zip(self._running, self._covered):
+            covered += covered_diff
+            running.append(value + covered)
+        return [(self._name, list(zip(self._time_axis, running)))]
 
 
 class HistogramChart(Chart):
@@ -247,13 +410,28 @@ class HistogramChart(Chart):
 
     def add_iteration(self, iteration):
         for name, value in self._map_iteration_values(iteration):
-            if name not in self._data:
-                raise KeyError("Unexpected histogram name: %s" % name)
-            for i, view in enumerate(self._data[name]["views"]):
-                for bin_i, bin_v in enumerate(view["x"]):
-                    if (value or 0) <= bin_v:
-                        self._data[name]["views"][i]["y"][bin_i] += 1
-                        break
+            self._add_values(name, [value])
+
+    def add_columns(self, columns):
+        mapped = self._map_columns(columns)
+        if mapped is None:
+            return self._add_rebuilt_iterations(columns)
+        for name, values in mapped:
+            self._add_values(name, values)
+
+    def _add_values(self, name, values):
+        if name not in self._data:
+            raise KeyError("Unexpected histogram name: %s" % name)
+        views = self._data[name]["views"]
+        for value in values:
+            value = value or 0
+            for view in views:
+                # NOTE: the value falls into the first bin whose right
+                #     border is not less than the value, values greater
+                #     than all borders are not counted
+                bin_i = bisect.bisect_left(view["x"], value)
+                if bin_i < len(view["y"]):
+                    view["y"][bin_i] += 1
 
     def render(self):
         data = []
@@ -283,13 +461,18 @@ class MainHistogramChart(HistogramChart):
     def _map_iteration_values(self, iteration):
         return [("task", 0 if iteration["error"] else iteration["duration"])]
 
+    def _map_columns(self, columns):
+        return [("task", (0 if failed else duration
+                          for duration, failed in six.moves.zip(
+                              columns.duration, columns.failed)))]
+
 
 class AtomicHistogramChart(HistogramChart):
 
     def __init__(self, workload_info):
         super(AtomicHistogramChart, self).__init__(workload_info)
         atomics = self._workload["statistics"]["atomics"]
-        atomic_merger = utils.AtomicMerger(atomics)
+        atomic_merger = self._get_atomic_merger()
         for i, name in enumerate(atomics):
             value = atomics[name]
             self._data[atomic_merger.get_merged_name(name)] = {
@@ -303,6 +486,10 @@ class AtomicHistogramChart(HistogramChart):
         atomic_actions = self._fix_atomic_actions(atomic_actions)
         return list(atomic_actions.items())
 
+    def _map_columns(self, columns):
+        return [(name, _fix_missing(values))
+                for name, values in columns.atomics.items()]
+
 
 @six.add_metaclass(abc.ABCMeta)
 class Table(Chart):
@@ -379,13 +566,12 @@ class MainStatsTable(Table):
 
     def __init__(self, *args, **kwargs):
         super(MainStatsTable, self).__init__(*args, **kwargs)
-        iters_num = self._workload["total_iteration_count"]
         for name in (self._get_atomic_names() + ["total"]):
             self._data[name] = [
                 [streaming.MinComputation(), None],
-                [streaming.PercentileComputation(0.5, iters_num), None],
-                [streaming.PercentileComputation(0.9, iters_num), None],
-                [streaming.PercentileComputation(0.95, iters_num), None],
+                [streaming.PercentileComputation(0.5), None],
+                [streaming.PercentileComputation(0.9), None],
+                [streaming.PercentileComputation(0.95), None],
                 [streaming.MaxComputation(), None],
                 [streaming.MeanComputation(), None],
                 [streaming.MeanComputation(),
@@ -409,6 +595,23 @@ class MainStatsTable(Table):
                 for idx, dummy in enumerate(self._data[name][:-2]):
                     self._data[name][idx][0].add(value)
 
+    def add_columns(self, columns):
+        rows = list(columns.atomics.items()) + [("total", columns.duration)]
+        for name, values in rows:
+            row = self._data[name]
+            for value, failed in six.moves.zip(values, columns.failed):
+                if math.isnan(value):
+                    # NOTE: the action was not called the expected number
+                    #     of times in this iteration
+                    continue
+                row[-1][0].add()
+                if failed:
+                    row[-2][0].add(0)
+                else:
+                    row[-2][0].add(1)
+                    for ins, dummy in row[:-2]:
+                        ins.add(value)
+
     def to_dict(self):
         stats = {"total": None, "atomics": []}
 
@@ -602,12 +805,11 @@ class OutputStatsTable(OutputTable):
     def add_iteration(self, iteration):
         for name, value in self._map_iteration_values(iteration):
             if name not in self._data:
-                iters_num = self._workload["total_iteration_count"]
                 self._data[name] = [
                     [streaming.MinComputation(), None],
-                    [streaming.PercentileComputation(0.5, iters_num), None],
-                    [streaming.PercentileComputation(0.9, iters_num), None],
-                    [streaming.PercentileComputation(0.95, iters_num), None],
+                    [streaming.PercentileComputation(0.5), None],
+                    [streaming.PercentileComputation(0.9), None],
+                    [streaming.PercentileComputation(0.95), None],
                     [streaming.MaxComputation(), None],
                     [streaming.MeanComputation(), None],
                     [streaming.IncrementComputation(),
@@ -18,16 +18,31 @@ import datetime as dt
 import hashlib
 import itertools
 import json
+import multiprocessing
 
+from oslo_config import cfg
 import six
 
+from rally.common import db
 from rally.common import objects
 from rally.common.plugin import plugin
 from rally.common import version
 from rally.task.processing import charts
+from rally.task.processing import utils
 from rally.ui import utils as ui_utils
 
 
+REPORT_OPTS = [
+    cfg.IntOpt("report_workers", default=1, min=0,
+               help="Number of processes used to process workloads of HTML "
+                    "task report. 0 means the number of CPUs. Each process "
+                    "reads raw data of its workload from the database on its "
+                    "own and keeps the processed workload in memory, so "
+                    "memory usage grows with the number of processes"),
+]
+CONF = cfg.CONF
+
+
 def _process_hooks(hooks):
     """Prepare hooks data for report."""
     hooks_ctx = []
@@ -91,12 +106,14 @@ def _process_workload(workload, workload_cfg, pos):
     atomic_pie = charts.AtomicAvgChart(workload)
     atomic_area = charts.AtomicStackedAreaChart(workload)
     atomic_hist = charts.AtomicHistogramChart(workload)
+    columns = utils.IterationColumns(workload)
 
     errors = []
     output_errors = []
     additive_output_charts = []
     complete_output = []
     for idx, itr in enumerate(workload["data"], 1):
+        columns.add_iteration(itr)
         if itr["error"]:
             typ, msg, trace = itr["error"]
             errors.append({"iteration": idx,
@@ -124,9 +141,9 @@ def _process_workload(workload, workload_cfg, pos):
             complete_charts.append(complete_chart)
         complete_output.append(complete_charts)
 
-        for chart in (main_area, main_hist, main_stat, load_profile,
-                      atomic_pie, atomic_area, atomic_hist):
-            chart.add_iteration(itr)
+    for chart in (main_area, main_hist, main_stat, load_profile,
+                  atomic_pie, atomic_area, atomic_hist):
+        chart.add_columns(columns)
 
     cls, method = workload["name"].split(".")
     additive_output = [chart.render() for chart in additive_output_charts]
@@ -165,8 +182,9 @@ def _process_workload(workload, workload_cfg, pos):
     }
 
 
-def _process_workloads(workloads):
-    p_workloads = []
+def _prepare_workloads(workloads):
+    """Get report source and workloads to process in the report order."""
+    prepared = []
     source_dict = collections.defaultdict(list)
     position = collections.defaultdict(lambda: -1)
 
@@ -175,15 +193,66 @@ def _process_workloads(workloads):
         position[name] += 1
         workload_cfg = objects.Workload.format_workload_config(workload)
         source_dict[name].append(workload_cfg)
-        p_workloads.append(_process_workload(workload, workload_cfg,
-                                             position[name]))
+        prepared.append((workload, workload_cfg, position[name]))
 
     source = json.dumps(source_dict, indent=2, sort_keys=True)
-    return source, sorted(p_workloads, key=lambda r: (r["cls"], r["met"],
-                                                      int(r["pos"])))
+    return source, sorted(
+        prepared, key=lambda w: tuple(w[0]["name"].split(".")) + (w[2],))
+
+
+def _process_prepared_workload(args):
+    return _process_workload(*args)
+
+
+def _init_worker():
+    # NOTE: lazily loaded workload data is read from the database by the
+    #     worker itself, so it should not use connections of the parent
+    db.engine_reset_after_fork()
 
 
-def plot(tasks_results, include_libs=False):
+def _iter_processed_workloads(prepared, workers=1):
+    """Process workloads, yielding the results in the order of input.
+
+    Workloads are independent of each other, so they are processed by a pool
+    of processes if more than one worker is requested. Lazily loaded data of
+    a workload is passed to the pool as is, so it is streamed from the
+    database by the process which handles the workload.
+
+    :param prepared: list of (workload, workload_cfg, position) tuples
+    :param workers: number of processes to use. 0 means the number of CPUs
+    """
+    if workers == 0:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(prepared))
+    if workers < 2:
+        for args in prepared:
+            yield _process_prepared_workload(args)
+        return
+
+    # NOTE: at most `workers` workloads are processed ahead of the one which
+    #     is yielded, so only their results are kept in memory
+    pending = collections.deque()
+    pool = multiprocessing.Pool(workers, _init_worker)
+    try:
+        for args in prepared:
+            pending.append(pool.apply_async(_process_prepared_workload,
+                                            (args,)))
+            if len(pending) > workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _process_workloads(workloads, workers=1):
+    source, prepared = _prepare_workloads(workloads)
+    return source, list(_iter_processed_workloads(prepared, workers))
+
+
+def _extract_workloads(tasks_results):
     tasks = []
     subtasks = []
     workloads = []
@@ -193,15 +262,58 @@ def plot(tasks_results, include_libs=False):
         for subtask in tasks[-1]["subtasks"]:
             workloads.extend(subtask.pop("workloads"))
         subtasks.extend(tasks[-1].pop("subtasks"))
+    return workloads
+
+
+def plot(tasks_results, include_libs=False, workers=1):
+    workloads = _extract_workloads(tasks_results)
 
     template = ui_utils.get_template("task/report.html")
-    source, data = _process_workloads(workloads)
+    source, data = _process_workloads(workloads, workers)
     return template.render(version=version.version_string(),
                            source=json.dumps(source),
                            data=json.dumps(data),
                            include_libs=include_libs)
 
 
+# NOTE: the placeholder is replaced with processed workloads in the
+#     rendered report, so they can be written one by one
+REPORT_DATA_PLACEHOLDER = "__rally_report_data__"
+
+
+def write_plot(tasks_results, stream, include_libs=False, workers=1):
+    """Write HTML report to a file-like object.
+
+    It produces the same report as plot(), but workloads are processed and
+    written one by one, so only one processed workload is kept in memory
+    at once instead of the whole report.
+
+    :param tasks_results: list of detailed tasks
+    :param stream: file-like object to write the report to
+    :param include_libs: whether to embed JS/CSS libraries into the report
+    :param workers: number of processes to process workloads with.
+        0 means the number of CPUs
+    """
+    workloads = _extract_workloads(tasks_results)
+
+    template = ui_utils.get_template("task/report.html")
+    source, prepared = _prepare_workloads(workloads)
+    html = template.render(version=version.version_string(),
+                           source=json.dumps(source),
+                           data=REPORT_DATA_PLACEHOLDER,
+                           include_libs=include_libs)
+    head, tail = html.split(REPORT_DATA_PLACEHOLDER, 1)
+
+    stream.write(head)
+    stream.write("[")
+    for i, data in enumerate(_iter_processed_workloads(prepared, workers)):
+        if i:
+            stream.write(", ")
+        stream.write(json.dumps(data))
+    stream.write("]")
+    stream.write(tail)
+
+
 def trends(tasks):
     trends = Trends()
     for task in tasks:
@@ -0,0 +1,160 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import copy
+
+from rally.common import streaming_algorithms as streaming
+from rally.task import atomic
+from rally.task.processing import utils
+
+
+class _StatsRow(object):
+    """Mergeable values of a single row of MainStatsTable."""
+
+    def __init__(self):
+        self.min = streaming.MinComputation()
+        self.max = streaming.MaxComputation()
+        self.avg = streaming.MeanComputation()
+        self.success = streaming.MeanComputation()
+        self.count = streaming.IncrementComputation()
+        self.durations = streaming.QuantileSketch()
+
+    def add(self, value, success):
+        self.count.add()
+        if success:
+            self.success.add(1)
+            self.min.add(value)
+            self.max.add(value)
+            self.avg.add(value)
+            self.durations.add(value)
+        else:
+            self.success.add(0)
+
+    def merge(self, other):
+        for name in ("min", "max", "avg", "success", "count"):
+            getattr(self, name).merge(getattr(other, name))
+        self.durations.merge(other.durations)
+
+    def to_dict(self, name):
+        row = {"name": name, "count": self.count.result()}
+        if self.min.result() is None:
+            # NOTE: there are no successful iterations
+            row.update((key, "n/a") for key in ("min", "median", "90%ile",
+                                                "95%ile", "max", "avg",
+                                                "success"))
+            return row
+        row.update({"min": round(self.min.result(), 3),
+                    "median": round(self.durations.quantile(0.5), 3),
+                    "90%ile": round(self.durations.quantile(0.9), 3),
+                    "95%ile": round(self.durations.quantile(0.95), 3),
+                    "max": round(self.max.result(), 3),
+                    "avg": round(self.avg.result(), 3),
+                    "success": "%.1f%%" % (self.success.result() * 100)})
+        return row
+
+
+class WorkloadStats(object):
+    """Mergeable statistics of workload iterations.
+
+    The statistics are updated by each iteration as soon as it is produced,
+    so they can be stored along with the workload without loading all its
+    iterations back from the database. Statistics collected separately
+    (for example, from different chunks of results) can be merged.
+
+    The result is the same as computed by MainStatsTable: statistics of
+    an atomic action take into account only iterations where the action
+    was called the maximum number of times.
+    """
+
+    def __init__(self):
+        self.total_iteration_count = 0
+        self.failed_iteration_count = 0
+        self.min_duration = streaming.MinComputation()
+        self.max_duration = streaming.MaxComputation()
+        self.total = _StatsRow()
+        # atomic name -> {"count": int, "min_duration": MinComputation,
+        #                 "max_duration": MaxComputation, "row": _StatsRow}
+        self.atomics = collections.OrderedDict()
+
+    def _new_atomic(self, count):
+        return {"count": count,
+                "min_duration": streaming.MinComputation(),
+                "max_duration": streaming.MaxComputation(),
+                "row": _StatsRow()}
+
+    def add_iteration(self, iteration):
+        """Process a single iteration result.
+
+        :param iteration: dict with iteration result
+        """
+        success = not iteration.get("error")
+        self.total_iteration_count += 1
+        if not success:
+            self.failed_iteration_count += 1
+        duration = iteration.get("duration", 0)
+        self.min_duration.add(duration)
+        self.max_duration.add(duration)
+        self.total.add(duration, success)
+
+        merged = atomic.merge_atomic(iteration.get("atomic_actions", []))
+        for name, value in merged.items():
+            stats = self.atomics.get(name)
+            if stats is None or value["count"] > stats["count"]:
+                # NOTE: the action was called more times than in the
+                #     previous iterations, so only the iterations with the
+                #     new number of calls should be taken into account
+                stats = self._new_atomic(value["count"])
+                self.atomics[name] = stats
+            elif value["count"] < stats["count"]:
+                continue
+            stats["min_duration"].add(value["duration"])
+            stats["max_duration"].add(value["duration"])
+            stats["row"].add(value["duration"], success)
+
+    def merge(self, other):
+        """Merge statistics collected by another instance.
+
+        :param other: WorkloadStats instance
+        """
+        self.total_iteration_count += other.total_iteration_count
+        self.failed_iteration_count += other.failed_iteration_count
+        self.min_duration.merge(other.min_duration)
+        self.max_duration.merge(other.max_duration)
+        self.total.merge(other.total)
+        for name, other_stats in other.atomics.items():
+            stats = self.atomics.get(name)
+            if stats is None or other_stats["count"] > stats["count"]:
+                self.atomics[name] = copy.deepcopy(other_stats)
+            elif other_stats["count"] == stats["count"]:
+                for key in ("min_duration", "max_duration", "row"):
+                    stats[key].merge(other_stats[key])
+
+    def to_dict(self):
+        """Return the statistics in the format of Workload DB model."""
+        atomics = collections.OrderedDict()
+        for name, stats in self.atomics.items():
+            atomics[name] = {"min_duration": stats["min_duration"].result(),
+                             "max_duration": stats["max_duration"].result(),
+                             "count": stats["count"]}
+        merger = utils.AtomicMerger(atomics)
+        durations = {
+            "total": self.total.to_dict("total"),
+            "atomics": [stats["row"].to_dict(merger.get_merged_name(name))
+                        for name, stats in self.atomics.items()]}
+        return {"total_iteration_count": self.total_iteration_count,
+                "failed_iteration_count": self.failed_iteration_count,
+                "min_duration": self.min_duration.result() or 0,
+                "max_duration": self.max_duration.result() or 0,
+                "statistics": {"durations": durations, "atomics": atomics}}
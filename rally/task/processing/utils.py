@@ -13,7 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import array
 import collections
+import math
 
 
 class GraphZipper(object):
@@ -84,24 +86,111 @@ class AtomicMerger(object):
     def __init__(self, atomic):
         self._atomic = atomic
         self._merge_name = lambda x, y: "%s (x%d)" % (x, y) if y > 1 else x
+        # NOTE: expected number of calls and merged name of each action are
+        #     resolved once, so actions of an iteration are merged in a
+        #     single pass
+        self._index = collections.OrderedDict()
+        for name, value in atomic.items():
+            count = value.get("count", 1)
+            self._index[name] = (count, self._merge_name(name, count))
 
     def get_merged_names(self):
-        return [self._merge_name(key, value.get("count", 1))
-                for key, value in self._atomic.items()]
+        return [merged_name for count, merged_name in self._index.values()]
 
     def get_merged_name(self, name):
-        return self._merge_name(name, self._atomic[name].get("count", 1))
+        return self._index[name][1]
 
     def merge_atomic_actions(self, atomic_actions):
+        durations = {}
+        counts = {}
+        for action in atomic_actions:
+            name = action["name"]
+            if name in self._index:
+                durations[name] = durations.get(name, 0) + (
+                    action["finished_at"] - action["started_at"])
+                counts[name] = counts.get(name, 0) + 1
+
         new_atomic_actions = collections.OrderedDict()
-        for name in self._atomic.keys():
-            count = 0
-            duration = 0
-            for action in atomic_actions:
-                if action["name"] == name:
-                    duration += action["finished_at"] - action["started_at"]
-                    count += 1
-            if count == self._atomic[name].get("count", 1):
-                new_name = self._merge_name(name, count)
-                new_atomic_actions[new_name] = duration
+        for name, (count, merged_name) in self._index.items():
+            if counts.get(name, 0) == count:
+                new_atomic_actions[merged_name] = durations.get(name, 0)
         return new_atomic_actions
+
+
+class IterationColumns(object):
+    """Column-oriented representation of workload iterations.
+
+    Each value is stored in a separate flat array, so charts and tables can
+    process all iterations with simple passes over the arrays instead of
+    walking a list of dicts and merging atomic actions of each iteration
+    again and again.
+
+    Atomic actions of each iteration are merged once by AtomicMerger. If
+    an action was not called the expected number of times in an iteration,
+    its duration in this iteration is NaN.
+    """
+
+    def __init__(self, workload):
+        """Init columns.
+
+        :param workload: dict, detailed info about the Workload
+        """
+        self._atomic_merger = AtomicMerger(workload["statistics"]["atomics"])
+
+        self.count = 0
+        self.timestamp = array.array("d")
+        self.duration = array.array("d")
+        self.idle_duration = array.array("d")
+        self.failed = array.array("b")
+        self.atomics = collections.OrderedDict(
+            (name, array.array("d"))
+            for name in self._atomic_merger.get_merged_names())
+
+    def __len__(self):
+        return self.count
+
+    def add_iteration(self, iteration):
+        """Append values of a single iteration.
+
+        :param iteration: dict with iteration result
+        """
+        self.count += 1
+        self.timestamp.append(iteration["timestamp"])
+        self.duration.append(iteration["duration"])
+        self.idle_duration.append(iteration.get("idle_duration", 0))
+        self.failed.append(1 if iteration["error"] else 0)
+
+        merged = self._atomic_merger.merge_atomic_actions(
+            iteration["atomic_actions"])
+        for name, values in self.atomics.items():
+            values.append(merged.get(name, float("nan")))
+
+    def iterations(self):
+        """Rebuild iterations from the columns.
+
+        Only values stored in the columns are restored: an error of failed
+        iteration is replaced by a stub and each atomic action is restored
+        as the expected number of calls, whose merged duration is the same.
+
+        :returns: generator of dicts with iteration results
+        """
+        index = [(name, count, self.atomics[merged_name])
+                 for name, (count, merged_name)
+                 in self._atomic_merger._index.items()]
+        for idx in range(self.count):
+            atomic_actions = []
+            for name, count, durations in index:
+                if math.isnan(durations[idx]):
+                    continue
+                atomic_actions.append({"name": name, "started_at": 0,
+                                       "finished_at": durations[idx],
+                                       "children": []})
+                atomic_actions.extend({"name": name, "started_at": 0,
+                                       "finished_at": 0, "children": []}
+                                      for i in range(count - 1))
+            yield {"timestamp": self.timestamp[idx],
+                   "duration": self.duration[idx],
+                   "idle_duration": self.idle_duration[idx],
+                   "error": ["", "", ""] if self.failed[idx] else [],
+                   "output": {"additive": [], "complete": []},
+                   "atomic_actions": atomic_actions}
@@ -17,14 +17,18 @@ import abc
 import collections
 import copy
 import multiprocessing
+import os
+import threading
 import time
 
 import six
+from six.moves import queue as Queue
 
 from rally.common import logging
 from rally.common.plugin import plugin
 from rally.common import utils as rutils
 from rally.common import validation
+from rally import exceptions
 from rally.task.processing import charts
 from rally.task import scenario
 from rally.task import types
@@ -88,12 +92,318 @@ def _run_scenario_once(cls, method_name, context_obj, scenario_kwargs,
                 "atomic_actions": scenario_inst.atomic_actions()}
 
 
+def add_start_lag(result, lag):
+    """Add the lag between the scheduled and the actual start to the result.
+
+    The lag is shown by "Start lag" chart of the iteration output. Growing
+    lag means that the load generator can't keep the requested schedule
+    (for example, all concurrency slots are busy), so the measured
+    durations don't include the time the request would have waited.
+
+    :param result: result of the iteration
+    :param lag: lag in seconds
+    """
+    result["output"]["additive"].append(
+        {"title": "Start lag",
+         "description": "Lag between the scheduled and the actual start "
+                        "of the iteration",
+         "chart_plugin": "StackedArea",
+         "data": [["start lag", max(lag, 0.0)]],
+         "label": "Seconds"})
+
+
 def _worker_thread(queue, cls, method_name, context_obj, scenario_kwargs,
                    event_queue):
     queue.put(_run_scenario_once(cls, method_name, context_obj,
                                  scenario_kwargs, event_queue))
 
 
+class _IterationHandle(object):
+    """Represents a single iteration executed by a long-lived thread.
+
+    It mimics the part of threading.Thread interface which is used by
+    rally.common.utils.timeout_thread, so the iteration (but not the thread
+    itself) can be watched for timeout. The thread is terminated only while
+    the iteration is running, so the timeout can't hit the code executed
+    after the iteration (for example, the next iteration).
+    """
+
+    def __init__(self, thread):
+        self.ident = thread.ident
+        # NOTE: list.pop() is atomic, so the one who pops the token (either
+        #     finish() or terminate()) decides the fate of the iteration.
+        #     Locks are not used on purpose: the timeout exception can be
+        #     raised in any place of the thread and leave a lock acquired.
+        self._token = [True]
+        self._terminated = False
+
+    def _take_token(self):
+        try:
+            return self._token.pop()
+        except IndexError:
+            return False
+
+    def finish(self):
+        """Mark the iteration as finished.
+
+        If the thread was terminated, but has not run into the timeout
+        exception yet, the exception is cancelled.
+        """
+        if not self._take_token():
+            # NOTE: wait for terminate() which has taken the token to
+            #     request the exception, so there is something to cancel
+            while not self._terminated:
+                time.sleep(0)
+            rutils.cancel_thread_termination(self.ident)
+
+    def terminate(self):
+        """Raise the timeout exception in the thread if it is still running.
+
+        The exception can be raised at most once per iteration.
+        """
+        if self._take_token():
+            rutils.terminate_thread(self.ident)
+            self._terminated = True
+
+    def isAlive(self):
+        return bool(self._token)
+
+
+class WorkerThreadPool(object):
+    """Pool of long-lived threads which execute scenario iterations.
+
+    Instead of spawning a new thread per iteration, iterations are handed
+    over to a bounded set of threads through a queue. Threads are started
+    lazily, so the pool never has more threads than concurrently running
+    iterations.
+
+        pool = WorkerThreadPool(concurrency, queue, cls, method_name,
+                                context, args, event_queue, timeout)
+        for iteration in iteration_gen:
+            pool.wait_for_slot()
+            pool.submit(iteration)
+        pool.join()
+    """
+
+    def __init__(self, size, queue, cls, method_name, context, args,
+                 event_queue, timeout=0):
+        """Initialize the pool.
+
+        :param size: maximum number of concurrently running iterations
+        :param queue: queue object to append results
+        :param cls: scenario class
+        :param method_name: scenario method name
+        :param context: scenario context object
+        :param args: scenario args
+        :param event_queue: queue object to append events
+        :param timeout: operation's timeout, 0 means no timeout
+        """
+        self._size = size
+        self._queue = queue
+        self._cls = cls
+        self._method_name = method_name
+        self._context = context
+        self._args = args
+        self._event_queue = event_queue
+        self._timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._tasks = Queue.Queue()
+        self._threads = []
+        self._busy = 0
+        self._lock = threading.Lock()
+
+        if timeout:
+            self._timeout_queue = Queue.Queue()
+            self._timeout_thread = threading.Thread(
+                target=rutils.timeout_thread, args=(self._timeout_queue,))
+            self._timeout_thread.start()
+
+    def wait_for_slot(self):
+        """Block until there is a free slot for one more iteration."""
+        self._slots.acquire()
+
+    def submit(self, iteration, scheduled_at=None):
+        """Hand the iteration over to one of the threads.
+
+        A slot should be acquired by wait_for_slot() before.
+
+        :param iteration: iteration number (numeration starts from 0)
+        :param scheduled_at: time (in seconds since the epoch) the iteration
+            was scheduled to start at. If it is set, the lag between the
+            scheduled and the actual start is added to the iteration output.
+        """
+        with self._lock:
+            self._busy += 1
+            if self._busy > len(self._threads):
+                thread = threading.Thread(target=self._thread_loop)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        self._tasks.put((iteration, scheduled_at))
+
+    def release_slot(self):
+        """Return a slot which was acquired but not used by submit()."""
+        self._slots.release()
+
+    def join(self):
+        """Wait for all submitted iterations and stop the threads."""
+        for i in range(len(self._threads)):
+            self._tasks.put((None, None))
+        for thread in self._threads:
+            thread.join()
+        del self._threads[:]
+
+        if self._timeout:
+            self._timeout_queue.put((None, None,))
+            self._timeout_thread.join()
+
+    def _thread_loop(self):
+        while True:
+            iteration = None
+            try:
+                iteration, scheduled_at = self._tasks.get()
+                if iteration is None:
+                    return
+                self._run_iteration(iteration, scheduled_at)
+            except Exception as e:
+                LOG.error("Iteration %s failed unexpectedly: %s"
+                          % (iteration and iteration + 1, e))
+                if logging.is_debug():
+                    LOG.exception(e)
+            finally:
+                if iteration is not None:
+                    with self._lock:
+                        self._busy -= 1
+                    self._slots.release()
+
+    def _run_iteration(self, iteration, scheduled_at=None):
+        scenario_context = _get_scenario_context(iteration, self._context)
+        handle = _IterationHandle(threading.current_thread())
+        started_at = time.time()
+        if self._timeout:
+            self._timeout_queue.put((handle, started_at + self._timeout))
+        result = None
+        try:
+            try:
+                result = _run_scenario_once(self._cls, self._method_name,
+                                            scenario_context, self._args,
+                                            self._event_queue)
+            finally:
+                handle.finish()
+        except exceptions.ThreadTimeoutException as e:
+            # NOTE: the timeout came right after the scenario had returned,
+            #     but before the iteration was marked as finished. It can't
+            #     come twice, so the thread survives to serve the next
+            #     iterations.
+            handle.finish()
+            if result is None:
+                result = format_result_on_timeout(e, self._timeout)
+                result["timestamp"] = started_at
+        if scheduled_at is not None:
+            add_start_lag(result, started_at - scheduled_at)
+        self._queue.put(result)
+
+
+class BatchedQueue(object):
+    """Queue which transfers items from worker processes in batches.
+
+    Items put into the queue are accumulated in the memory of the worker
+    process and sent through the underlying multiprocessing.Queue (channel)
+    as a single message when the batch is full or when flush_interval is
+    passed, whichever comes first.
+
+    Several BatchedQueue objects can share one channel. Each message is
+    tagged, so the reader can block on the only channel and dispatch items
+    by the tag of the queue they were put in.
+    """
+
+    EXIT = "__exit__"
+
+    def __init__(self, channel, tag, batch_size=100, flush_interval=0.1):
+        """Initialize the queue.
+
+        :param channel: multiprocessing.Queue to transfer batches through
+        :param tag: name of the queue which is sent with each batch
+        :param batch_size: maximum number of items in one batch
+        :param flush_interval: maximum time (in seconds) the item can wait
+            in the batch before being sent
+        """
+        self.channel = channel
+        self.tag = tag
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pid = None
+        # NOTE: the parent process only reads the channel, so the lock is
+        #     never held while workers are forked
+        self._init_lock = threading.Lock()
+
+    def _init_local_state(self):
+        # NOTE: the queue is created in the parent process and inherited
+        #     by workers, so the batch, lock and flusher thread should be
+        #     owned by the process which puts items. Several threads of
+        #     the worker can put the first items at once.
+        with self._init_lock:
+            if self._pid == os.getpid():
+                return
+            self._batch = []
+            self._lock = threading.Lock()
+            self._stop_flusher = threading.Event()
+            self._flusher = threading.Thread(target=self._flusher_loop)
+            self._flusher.daemon = True
+            self._flusher.start()
+            self._pid = os.getpid()
+
+    def _flusher_loop(self):
+        while not self._stop_flusher.wait(self.flush_interval):
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            if self._batch:
+                self.channel.put((self.tag, self._batch))
+                self._batch = []
+
+    def put(self, item):
+        if self._pid != os.getpid():
+            self._init_local_state()
+        with self._lock:
+            self._batch.append(item)
+            if len(self._batch) < self.batch_size:
+                return
+        self._flush()
+
+    def flush(self):
+        """Send all accumulated items and stop the flusher thread."""
+        if self._pid == os.getpid():
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flush()
+
+    def close(self):
+        self.channel.close()
+
+
+def _run_worker_process(worker_process, *args, **kwargs):
+    """Run worker_process and notify the parent when it is done.
+
+    All BatchedQueue objects passed to the worker are flushed and the exit
+    message is sent through their channels, so the parent process doesn't
+    need to poll workers for liveness.
+    """
+    try:
+        worker_process(*args, **kwargs)
+    finally:
+        queues = [arg for arg in args if isinstance(arg, BatchedQueue)]
+        channels = []
+        for queue in queues:
+            queue.flush()
+            if queue.channel not in channels:
+                channels.append(queue.channel)
+        for channel in channels:
+            channel.put((BatchedQueue.EXIT, os.getpid()))
+
+
 def _log_worker_info(**info):
     """Log worker parameters for debugging.
 
@@ -126,6 +436,10 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin):
         "additionalProperties": True
     }
 
+    # how often (in seconds) to check liveness of worker processes which
+    # neither send data nor exit
+    WORKER_CHECK_INTERVAL = 1
+
     def __init__(self, task, config, batch_size=0):
         """Runner constructor.
 
@@ -189,21 +503,77 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin):
         for i in range(processes_to_start):
             kwrgs = {"processes_to_start": processes_to_start,
                      "processes_counter": i}
-            process = multiprocessing.Process(target=worker_process,
-                                              args=next(worker_args_gen),
+            args = (worker_process,) + tuple(next(worker_args_gen))
+            process = multiprocessing.Process(target=_run_worker_process,
+                                              args=args,
                                               kwargs={"info": kwrgs})
             process.start()
             process_pool.append(process)
 
         return process_pool
 
+    @staticmethod
+    def _create_queues():
+        """Create queues to transfer results and events from workers.
+
+        :returns: a tuple of BatchedQueue objects for results and events,
+            which share one channel
+        """
+        channel = multiprocessing.Queue()
+        return (BatchedQueue(channel, "result"),
+                BatchedQueue(channel, "event"))
+
     def _join_processes(self, process_pool, result_queue, event_queue):
         """Join the processes in the pool and send their results to the queue.
 
         :param process_pool: pool of processes to join
-        :param result_queue: multiprocessing.Queue that receives the results
-        :param event_queue: multiprocessing.Queue that receives the events
+        :param result_queue: BatchedQueue (or multiprocessing.Queue) that
+            receives the results
+        :param event_queue: BatchedQueue (or multiprocessing.Queue) that
+            receives the events
         """
+        if not (isinstance(result_queue, BatchedQueue) and
+                isinstance(event_queue, BatchedQueue) and
+                result_queue.channel is event_queue.channel):
+            return self._poll_processes(process_pool, result_queue,
+                                        event_queue)
+
+        channel = result_queue.channel
+        handlers = {result_queue.tag: self._send_result,
+                    event_queue.tag: lambda e: self.send_event(**e)}
+
+        def handle(message):
+            tag, data = message
+            if tag == BatchedQueue.EXIT:
+                process = processes.pop(data, None)
+                if process:
+                    process.join()
+            else:
+                for item in data:
+                    handlers[tag](item)
+
+        processes = dict((p.pid, p) for p in process_pool)
+        while processes:
+            try:
+                handle(channel.get(timeout=self.WORKER_CHECK_INTERVAL))
+            except Queue.Empty:
+                # NOTE: the worker can be killed before it sends the exit
+                #     message, so look after workers which are not alive.
+                for pid, process in list(processes.items()):
+                    if not process.is_alive():
+                        processes.pop(pid).join()
+
+        while True:
+            try:
+                handle(channel.get_nowait())
+            except Queue.Empty:
+                break
+
+        process_pool.clear()
+        self._flush_results()
+        channel.close()
+
+    def _poll_processes(self, process_pool, result_queue, event_queue):
         while process_pool:
             while process_pool and not process_pool[0].is_alive():
                 process_pool.popleft().join()
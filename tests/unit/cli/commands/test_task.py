@@ -16,6 +16,7 @@
 import json
 import os.path
 import sys
+import tempfile
 
 import ddt
 import mock
@@ -422,7 +423,7 @@ class TaskCommandsTestCase(test.TestCase):
         self.task.detailed(self.fake_api, test_uuid,
                            iterations_data=iterations_data)
         self.fake_api.task.get.assert_called_once_with(
-            task_id=test_uuid, detailed=True)
+            task_id=test_uuid, detailed=True, lazy_data=True)
 
     @mock.patch("rally.cli.commands.task.sys.stdout")
     @mock.patch("rally.cli.commands.task.logging")
@@ -486,7 +487,7 @@ class TaskCommandsTestCase(test.TestCase):
         self.fake_api.task.get.return_value = None
         self.task.detailed(self.fake_api, test_uuid)
         self.fake_api.task.get.assert_called_once_with(
-            task_id=test_uuid, detailed=True)
+            task_id=test_uuid, detailed=True, lazy_data=True)
 
     def _make_task(self, status=None, data=None):
         return {
@@ -534,7 +535,7 @@ class TaskCommandsTestCase(test.TestCase):
         self.assertEqual({"sort_keys": False, "indent": 4},
                          mock_json_dumps.call_args[1])
         self.fake_api.task.get.assert_called_once_with(
-            task_id=task_id, detailed=True)
+            task_id=task_id, detailed=True, lazy_data=True)
 
     @mock.patch("rally.cli.commands.task.sys.stdout")
     def test_results_no_data(self, mock_stdout):
@@ -545,7 +546,7 @@ class TaskCommandsTestCase(test.TestCase):
         self.assertEqual(1, self.task.results(self.fake_api, task_id))
 
         self.fake_api.task.get.assert_called_once_with(
-            task_id=task_id, detailed=True)
+            task_id=task_id, detailed=True, lazy_data=True)
 
         expected_out = ("Task status is %s. Results "
                         "available when it is one of %s.") % (
@@ -637,7 +638,8 @@ class TaskCommandsTestCase(test.TestCase):
                 side_effect=mock.mock_open(), create=True)
     @mock.patch("rally.cli.commands.task.plot")
     @mock.patch("rally.cli.commands.task.webbrowser")
-    def test_old_report_one_uuid(self, mock_webbrowser,
+    @mock.patch("rally.cli.commands.task.CONF")
+    def test_old_report_one_uuid(self, mock_conf, mock_webbrowser,
                                  mock_plot, mock_open, mock_realpath):
         task_id = "eb290c30-38d8-4c8f-bbcc-fc8f74b004ae"
         task_obj = self._make_task()
@@ -652,11 +654,12 @@ class TaskCommandsTestCase(test.TestCase):
         self.task._old_report(self.fake_api, tasks=task_id,
                               out="/tmp/%s.html" % task_id)
         mock_open.assert_called_once_with("/tmp/%s.html" % task_id, "w+")
-        mock_plot.plot.assert_called_once_with([task_obj], include_libs=False)
-
-        mock_open.side_effect().write.assert_called_once_with("html_report")
+        mock_plot.write_plot.assert_called_once_with(
+            [task_obj], mock_open.side_effect(), include_libs=False,
+            workers=mock_conf.report_workers)
+        self.assertFalse(mock_plot.plot.called)
         self.fake_api.task.get.assert_called_once_with(
-            task_id=task_id, detailed=True)
+            task_id=task_id, detailed=True, lazy_data=True)
 
         # JUnit
         reset_mocks()
@@ -672,14 +675,30 @@ class TaskCommandsTestCase(test.TestCase):
                               open_it=True, out_format="html")
         mock_webbrowser.open_new_tab.assert_called_once_with(
             "file://realpath_output.html")
-        mock_plot.plot.assert_called_once_with([task_obj], include_libs=False)
+        mock_plot.write_plot.assert_called_once_with(
+            [task_obj], mock_open.side_effect(), include_libs=False,
+            workers=mock_conf.report_workers)
 
         # HTML with embedded JS/CSS
         reset_mocks()
         self.task._old_report(self.fake_api, task_id, open_it=False,
                               out="output.html", out_format="html_static")
         self.assertFalse(mock_webbrowser.open_new_tab.called)
-        mock_plot.plot.assert_called_once_with([task_obj], include_libs=True)
+        mock_plot.write_plot.assert_called_once_with(
+            [task_obj], mock_open.side_effect(), include_libs=True,
+            workers=mock_conf.report_workers)
+
+        # HTML to stdout
+        reset_mocks()
+        mock_plot.plot.return_value = "html_report"
+        with mock.patch("rally.cli.commands.task.print",
+                        create=True) as mock_print:
+            self.task._old_report(self.fake_api, task_id, out_format="html")
+        mock_plot.plot.assert_called_once_with(
+            [task_obj], include_libs=False,
+            workers=mock_conf.report_workers)
+        mock_print.assert_called_once_with("html_report")
+        self.assertFalse(mock_open.called)
 
     @mock.patch("rally.cli.commands.task.os.path.realpath",
                 side_effect=lambda p: "realpath_%s" % p)
@@ -687,7 +706,8 @@ class TaskCommandsTestCase(test.TestCase):
                 side_effect=mock.mock_open(), create=True)
     @mock.patch("rally.cli.commands.task.plot")
     @mock.patch("rally.cli.commands.task.webbrowser")
-    def test_old_report_bunch_uuids(self, mock_webbrowser,
+    @mock.patch("rally.cli.commands.task.CONF")
+    def test_old_report_bunch_uuids(self, mock_conf, mock_webbrowser,
                                     mock_plot, mock_open, mock_realpath):
         tasks = ["eb290c30-38d8-4c8f-bbcc-fc8f74b004ae",
                  "eb290c30-38d8-4c8f-bbcc-fc8f74b004af"]
@@ -704,12 +724,12 @@ class TaskCommandsTestCase(test.TestCase):
         self.task._old_report(self.fake_api, tasks=tasks,
                               out="/tmp/1_test.html")
         mock_open.assert_called_once_with("/tmp/1_test.html", "w+")
-        mock_plot.plot.assert_called_once_with([task_obj, task_obj],
-                                               include_libs=False)
-
-        mock_open.side_effect().write.assert_called_once_with("html_report")
-        expected_get_calls = [mock.call(task_id=task, detailed=True)
-                              for task in tasks]
+        mock_plot.write_plot.assert_called_once_with(
+            [task_obj, task_obj], mock_open.side_effect(), include_libs=False,
+            workers=mock_conf.report_workers)
+        expected_get_calls = [
+            mock.call(task_id=task, detailed=True, lazy_data=True)
+            for task in tasks]
         self.fake_api.task.get.assert_has_calls(
             expected_get_calls, any_order=True)
 
@@ -718,8 +738,9 @@ class TaskCommandsTestCase(test.TestCase):
                 side_effect=lambda p: "realpath_%s" % p)
     @mock.patch("rally.cli.commands.task.open", create=True)
     @mock.patch("rally.cli.commands.task.plot")
-    def test_old_report_one_file(self, mock_plot, mock_open, mock_realpath,
-                                 mock_path_exists):
+    @mock.patch("rally.cli.commands.task.CONF")
+    def test_old_report_one_file(self, mock_conf, mock_plot, mock_open,
+                                 mock_realpath, mock_path_exists):
 
         task_file = "/tmp/some_file.json"
         task_obj = self._make_task()
@@ -736,8 +757,9 @@ class TaskCommandsTestCase(test.TestCase):
             self.real_api, task_file)
         expected_open_calls = [mock.call("/tmp/1_test.html", "w+")]
         mock_open.assert_has_calls(expected_open_calls, any_order=True)
-        mock_plot.plot.assert_called_once_with([task_obj], include_libs=False)
-        mock_open.side_effect().write.assert_called_once_with("html_report")
+        mock_plot.write_plot.assert_called_once_with(
+            [task_obj], mock_open.side_effect(), include_libs=False,
+            workers=mock_conf.report_workers)
 
     @mock.patch("rally.cli.commands.task.os.path.exists", return_value=False)
     @mock.patch("rally.cli.commands.task.tutils.open", create=True)
@@ -909,7 +931,7 @@ class TaskCommandsTestCase(test.TestCase):
         result = self.task.sla_check(self.fake_api, task_id="fake_task_id")
         self.assertEqual(1, result)
         self.fake_api.task.get.assert_called_with(
-            task_id="fake_task_id", detailed=True)
+            task_id="fake_task_id", detailed=True, lazy_data=True)
 
         task_obj["subtasks"][0]["workloads"][0]["sla_results"]["sla"][0][
             "success"] = True
@@ -918,6 +940,21 @@ class TaskCommandsTestCase(test.TestCase):
                                      tojson=True)
         self.assertEqual(0, result)
 
+    @mock.patch("rally.cli.commands.task.cliutils.print_list")
+    def test_sla_check_remote(self, mock_print_list):
+        self.fake_api.endpoint_url = "http://example.com"
+        task_obj = self._make_task()
+        task_obj["subtasks"][0]["workloads"][0]["sla_results"]["sla"] = [
+            {"benchmark": "KeystoneBasic.create_user",
+             "criterion": "max_seconds_per_iteration",
+             "pos": 0, "success": True, "detail": "Max foo, actually bar"}]
+        self.fake_api.task.get.return_value = task_obj
+        self.assertEqual(
+            0, self.task.sla_check(self.fake_api, task_id="fake_task_id"))
+        # NOTE: lazily loaded data can not be returned by the remote Rally
+        self.fake_api.task.get.assert_called_once_with(
+            task_id="fake_task_id", detailed=True, lazy_data=False)
+
     @mock.patch("rally.cli.commands.task.os.path.isfile", return_value=True)
     @mock.patch("rally.cli.commands.task.open",
                 side_effect=mock.mock_open(read_data="{\"some\": \"json\"}"),
@@ -1066,11 +1103,22 @@ class TaskCommandsTestCase(test.TestCase):
         }
         self.task.detailed(self.fake_api, test_uuid)
         self.fake_api.task.get.assert_called_once_with(
-            task_id=test_uuid, detailed=True)
+            task_id=test_uuid, detailed=True, lazy_data=True)
         mock_stdout.write.assert_has_calls([
             mock.call(error_traceback or "No traceback available.")
         ], any_order=False)
 
+    @ddt.data({"endpoint_url": None, "lazy_data": True},
+              {"endpoint_url": "http://example.com", "lazy_data": False})
+    @ddt.unpack
+    def test__get_task_with_data(self, endpoint_url, lazy_data):
+        self.fake_api.endpoint_url = endpoint_url
+        self.assertEqual(
+            self.fake_api.task.get.return_value,
+            self.task._get_task_with_data(self.fake_api, "task_uuid"))
+        self.fake_api.task.get.assert_called_once_with(
+            task_id="task_uuid", detailed=True, lazy_data=lazy_data)
+
     @mock.patch("rally.cli.commands.task.open", create=True)
     @mock.patch("rally.cli.commands.task.yaml.safe_load")
     @mock.patch("rally.cli.commands.task.jsonschema.validate",
@@ -1136,10 +1184,93 @@ class TaskCommandsTestCase(test.TestCase):
                           self.task._load_task_results_file,
                           api=self.real_api, task_id=task_id)
 
+    def _write_results_file(self, results):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            json.dump(results, f, indent=4)
+        return path
+
+    def _get_old_results(self):
+        iterations = [{"timestamp": 10 + i, "duration": 1 + i,
+                       "idle_duration": 0, "error": [] if i else ["e"],
+                       "atomic_actions": {"foo": 1.0 + i}}
+                      for i in range(3)]
+        return [{"result": iterations,
+                 "key": {"name": "Foo.bar", "pos": 0,
+                         "kw": {"args": {}, "runner": {"type": "r"},
+                                "hooks": [], "sla": {}, "context": {}}},
+                 "sla": [{"success": True}],
+                 "hooks": [],
+                 "full_duration": 5, "load_duration": 3,
+                 "created_at": "2017-07-01T07:03:01"},
+                {"key": {"name": "Foo.baz", "pos": 1,
+                         "kw": {"args": {}, "runner": {"type": "r"},
+                                "hooks": [], "sla": {}, "context": {}}},
+                 "sla": [],
+                 "hooks": [],
+                 "full_duration": 5, "load_duration": 3,
+                 "result": iterations[:1],
+                 "created_at": "2017-07-01T07:03:01"}]
+
+    def test__load_task_results_file_lazy(self):
+        path = self._write_results_file(self._get_old_results())
+        expected = self.task._load_task_results_file(self.real_api, path)
+
+        ret = self.task._load_task_results_file(self.real_api, path,
+                                                lazy=True)
+
+        subtasks = []
+        for subtask in ret["subtasks"]:
+            workload = subtask["workloads"][0]
+            workload["data"] = list(workload["data"])
+            subtasks.append(subtask)
+        self.assertEqual(2, len(subtasks))
+        for subtask, expected_subtask in zip(subtasks, expected["subtasks"]):
+            workload = subtask["workloads"][0]
+            expected_workload = expected_subtask["workloads"][0]
+            for key in workload:
+                self.assertEqual(expected_workload[key], workload[key])
+
+    def test__load_task_results_file_lazy_yaml(self):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            # NOTE: JSON objects are valid YAML flow mappings
+            for result in self._get_old_results():
+                f.write("- %s\n" % json.dumps(result))
+
+        ret = self.task._load_task_results_file(self.real_api, path,
+                                                lazy=True)
+
+        self.assertEqual(2, len(ret["subtasks"]))
+
+    @ddt.data({"result": [{"timestamp": 1}]},
+              {"result": [], "key": "foo"},
+              "[{\"result\": []")
+    def test__load_task_results_file_lazy_invalid(self, result):
+        results = self._get_old_results()
+        if isinstance(result, dict):
+            results[1].update(result)
+            path = self._write_results_file(results)
+        else:
+            path = self._write_results_file([])
+            with open(path, "w") as f:
+                f.write(result)
+
+        ret = self.task._load_task_results_file(self.real_api, path,
+                                                lazy=True)
+
+        subtasks = iter(ret["subtasks"])
+        if isinstance(result, dict):
+            next(subtasks)
+        self.assertRaises(task.FailedToLoadResults, next, subtasks)
+
     @mock.patch("rally.cli.commands.task.os.path")
     def test_import_results(self, mock_os_path):
         mock_os_path.exists.return_value = True
         mock_os_path.expanduser = lambda path: path
+        self.fake_api.endpoint_url = None
         self.task._load_task_results_file = mock.MagicMock(
             return_value=["results"]
         )
@@ -1149,7 +1280,7 @@ class TaskCommandsTestCase(test.TestCase):
                                  "task_file", tags=["tag"])
 
         self.task._load_task_results_file.assert_called_once_with(
-            self.fake_api, "task_file"
+            self.fake_api, "task_file", lazy=True
         )
         self.fake_api.task.import_results.assert_called_once_with(
             deployment="deployment_uuid", task_results=["results"],
@@ -15,15 +15,20 @@
 
 """Tests for db.api layer."""
 
+import collections
 import copy
 import datetime as dt
+import json
 
 import mock
 from six import moves
 
 from rally.common import db
+from rally.common.db.sqlalchemy import api as db_api
+from rally.common.db.sqlalchemy import models
 from rally import consts
 from rally import exceptions
+from rally.task.processing import stats
 from tests.unit import test
 
 NOW = dt.datetime.now()
@@ -36,6 +41,15 @@ class ConnectionTestCase(test.DBTestCase):
         self.assertEqual(drev["revision"], rev)
         self.assertEqual(drev["revision"], drev["current_head"])
 
+    @mock.patch("rally.common.db.sqlalchemy.api._INHERITED_FACADE")
+    @mock.patch("rally.common.db.sqlalchemy.api._FACADE")
+    def test_engine_reset_after_fork(self, mock__facade,
+                                     mock__inherited_facade):
+        db.engine_reset_after_fork()
+        self.assertIs(mock__facade, db_api._INHERITED_FACADE)
+        self.assertIsNone(db_api._FACADE)
+        self.assertFalse(mock__facade.mock_calls)
+
 
 class TasksTestCase(test.DBTestCase):
     def setUp(self):
@@ -148,6 +162,23 @@ class TasksTestCase(test.DBTestCase):
         self.assertEqual(task_init, get_uuids(INIT))
         self.assertEqual(sorted(task_finished), get_uuids(FINISHED))
 
+    def test_task_list_with_tags(self):
+        task1 = self._create_task({"tags": ["foo", "bar"]})["uuid"]
+        task2 = self._create_task({"tags": ["bar"]})["uuid"]
+        task3 = self._create_task()["uuid"]
+
+        tasks = dict((t["uuid"], t["tags"]) for t in db.task_list())
+        self.assertEqual({task1: ["bar", "foo"], task2: ["bar"], task3: []},
+                         tasks)
+
+        tasks = dict((t["uuid"], t["tags"]) for t in db.task_list(
+            tags=["bar"]))
+        self.assertEqual({task1: ["bar", "foo"], task2: ["bar"]}, tasks)
+
+        tasks = dict((t["uuid"], t["tags"]) for t in db.task_list(
+            tags=["foo"]))
+        self.assertEqual({task1: ["bar", "foo"]}, tasks)
+
     def test_task_delete(self):
         task1, task2 = self._create_task()["uuid"], self._create_task()["uuid"]
         db.task_delete(task1)
@@ -222,7 +253,8 @@ class TasksTestCase(test.DBTestCase):
                                 sla_results=sla_results,
                                 load_duration=w_load_duration,
                                 full_duration=w_full_duration,
-                                start_time=w_start_time)
+                                start_time=w_start_time,
+                                stats=stats.WorkloadStats().to_dict())
 
         task1_full = db.task_get(task1["uuid"], detailed=True)
         self.assertEqual(validation_result, task1_full["validation_result"])
@@ -298,6 +330,10 @@ class TasksTestCase(test.DBTestCase):
         load_duration = 13
         full_duration = 42
         start_time = 33.33
+        workload_stats = stats.WorkloadStats()
+        detailed_task = db.task_get(task_id, detailed=True)
+        for iteration in detailed_task["subtasks"][0]["workloads"][0]["data"]:
+            workload_stats.add_iteration(iteration)
 
         db.workload_set_results(workload_uuid=workload["uuid"],
                                 subtask_uuid=workload["subtask_uuid"],
@@ -305,7 +341,8 @@ class TasksTestCase(test.DBTestCase):
                                 load_duration=load_duration,
                                 full_duration=full_duration,
                                 start_time=start_time,
-                                sla_results=sla_results)
+                                sla_results=sla_results,
+                                stats=workload_stats.to_dict())
 
         detailed_task = db.task_get(task_id, detailed=True)
         self.assertEqual(len(detailed_task["subtasks"]), 1)
@@ -436,6 +473,10 @@ class WorkloadTestCase(test.DBTestCase):
         full_duration = 42
         start_time = 33.33
 
+        workload_stats = stats.WorkloadStats()
+        for iteration in raw_data["raw"]:
+            workload_stats.add_iteration(iteration)
+
         db.workload_data_create(self.task_uuid, workload["uuid"], 0, raw_data)
         db.workload_set_results(workload_uuid=workload["uuid"],
                                 subtask_uuid=self.subtask_uuid,
@@ -443,7 +484,8 @@ class WorkloadTestCase(test.DBTestCase):
                                 load_duration=load_duration,
                                 full_duration=full_duration,
                                 start_time=start_time,
-                                sla_results=sla_results)
+                                sla_results=sla_results,
+                                stats=workload_stats.to_dict())
         workload = db.workload_get(workload["uuid"])
 
         self.assertEqual(13, workload["load_duration"])
@@ -481,7 +523,8 @@ class WorkloadTestCase(test.DBTestCase):
                                 load_duration=load_duration,
                                 full_duration=full_duration,
                                 start_time=start_time,
-                                sla_results=sla_results)
+                                sla_results=sla_results,
+                                stats=stats.WorkloadStats().to_dict())
         workload = db.workload_get(workload["uuid"])
         self.assertEqual(0, workload["min_duration"])
         self.assertEqual(0, workload["max_duration"])
@@ -526,7 +569,12 @@ class WorkloadDataTestCase(test.DBTestCase):
                          workload_data["started_at"])
         self.assertEqual(dt.datetime.fromtimestamp(4),
                          workload_data["finished_at"])
-        self.assertEqual(data, workload_data["chunk_data"])
+        self.assertEqual("zlib", workload_data["chunk_data"]["codec"])
+        self.assertEqual(data["raw"],
+                         db_api.decode_chunk(workload_data["chunk_data"]))
+        self.assertEqual(len(json.dumps(data["raw"])),
+                         workload_data["chunk_size"])
+        self.assertGreater(workload_data["compressed_chunk_size"], 0)
         self.assertEqual(self.task_uuid, workload_data["task_uuid"])
         self.assertEqual(self.workload_uuid, workload_data["workload_uuid"])
 
@@ -542,10 +590,190 @@ class WorkloadDataTestCase(test.DBTestCase):
                          workload_data["started_at"])
         self.assertEqual(dt.datetime.fromtimestamp(10),
                          workload_data["finished_at"])
-        self.assertEqual(data, workload_data["chunk_data"])
+        self.assertEqual([], db_api.decode_chunk(workload_data["chunk_data"]))
         self.assertEqual(self.task_uuid, workload_data["task_uuid"])
         self.assertEqual(self.workload_uuid, workload_data["workload_uuid"])
 
+    def test_workload_data_create_many(self):
+        db.workload_data_create_many(
+            self.task_uuid, self.workload_uuid,
+            [(0, {"raw": [{"duration": 1, "timestamp": 1},
+                          {"error": "e", "duration": 1, "timestamp": 2}]}),
+             (1, {"raw": [{"duration": 1, "timestamp": 3}]})])
+        db.workload_data_create_many(self.task_uuid, self.workload_uuid, [])
+
+        chunks = (db_api.Connection().model_query(models.WorkloadData).
+                  order_by(models.WorkloadData.chunk_order).all())
+        self.assertEqual([0, 1], [c.chunk_order for c in chunks])
+        self.assertEqual([2, 1], [c.iteration_count for c in chunks])
+        self.assertEqual([1, 0], [c.failed_iteration_count for c in chunks])
+        self.assertEqual(2, len(set(c.uuid for c in chunks)))
+        self.assertEqual([1, 2, 3], [
+            r["timestamp"] for r in db_api.Connection()
+            ._task_workload_data_get_all(self.workload_uuid)])
+
+    def test_workload_data_compression(self):
+        raw = [{"duration": 1, "timestamp": i, "error": [],
+                "atomic_actions": [{"name": "foo", "started_at": i,
+                                    "finished_at": i + 1, "children": []}]}
+               for i in range(100)]
+        workload_data = db.workload_data_create(self.task_uuid,
+                                                self.workload_uuid, 0,
+                                                {"raw": raw})
+        self.assertLess(workload_data["compressed_chunk_size"] * 5,
+                        workload_data["chunk_size"])
+
+    def test_uncompressed_workload_data(self):
+        # NOTE: chunks stored before the compression was introduced
+        raw = [{"duration": 1, "timestamp": 2}, {"duration": 1,
+                                                 "timestamp": 1}]
+        models.WorkloadData(
+            task_uuid=self.task_uuid, workload_uuid=self.workload_uuid,
+            chunk_order=0, iteration_count=2, failed_iteration_count=0,
+            chunk_size=0, compressed_chunk_size=0,
+            started_at=dt.datetime.fromtimestamp(1),
+            chunk_data={"raw": raw}).save()
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 1,
+                                {"raw": [{"duration": 1, "timestamp": 3}]})
+
+        results = db_api.Connection()._task_workload_data_get_all(
+            self.workload_uuid)
+        self.assertEqual([1, 2, 3], [r["timestamp"] for r in results])
+
+    def test_workload_data_get_iter(self):
+        for chunk_order, timestamps in ((1, [5, 4]), (0, [2, 1, 3])):
+            db.workload_data_create(
+                self.task_uuid, self.workload_uuid, chunk_order,
+                {"raw": [{"duration": 1, "timestamp": t}
+                         for t in timestamps]})
+
+        data = db.workload_data_get_iter(self.workload_uuid)
+        self.assertEqual({"duration": 1, "timestamp": 1}, next(data))
+        self.assertEqual([2, 3, 4, 5], [r["timestamp"] for r in data])
+        self.assertEqual([], list(db.workload_data_get_iter("unknown")))
+
+    def test_workload_data_get_iter_merges_chunks(self):
+        chunks = [[(1, "a"), (4, "a"), (6, "a")],
+                  [(2, "b"), (4, "b"), (7, "b")],
+                  [(10, "c"), (3, "c")],
+                  [(8, "d"), (9, "d")]]
+        for chunk_order, chunk in enumerate(chunks):
+            db.workload_data_create(
+                self.task_uuid, self.workload_uuid, chunk_order,
+                {"raw": [{"duration": 0.5, "timestamp": t, "chunk": c}
+                         for t, c in chunk]})
+
+        expected = sorted([{"duration": 0.5, "timestamp": t, "chunk": c}
+                           for chunk in chunks for t, c in chunk],
+                          key=lambda x: x["timestamp"])
+        self.assertEqual(
+            expected, list(db.workload_data_get_iter(self.workload_uuid)))
+
+    @mock.patch("rally.common.db.sqlalchemy.api.decode_chunk",
+                side_effect=db_api.decode_chunk)
+    def test_workload_data_get_iter_loads_chunks_lazily(self,
+                                                        mock_decode_chunk):
+        for chunk_order in range(3):
+            db.workload_data_create(
+                self.task_uuid, self.workload_uuid, chunk_order,
+                {"raw": [{"duration": 1, "timestamp": 100 * chunk_order + i}
+                         for i in range(5)]})
+
+        data = db.workload_data_get_iter(self.workload_uuid)
+        for i in range(5):
+            self.assertEqual(i, next(data)["timestamp"])
+        self.assertEqual(1, mock_decode_chunk.call_count)
+        self.assertEqual(100, next(data)["timestamp"])
+        self.assertEqual(2, mock_decode_chunk.call_count)
+        self.assertEqual(9, len(list(data)))
+        self.assertEqual(3, mock_decode_chunk.call_count)
+
+    def test_workload_data_get_iter_with_chunks_saved_in_other_timezone(
+            self):
+        for chunk_order in range(3):
+            db.workload_data_create(
+                self.task_uuid, self.workload_uuid, chunk_order,
+                {"raw": [{"duration": 1, "timestamp": 10 * chunk_order + i}
+                         for i in (5, 0, 12)]})
+        session = db_api.get_session()
+        with session.begin():
+            for chunk in db_api.Connection().model_query(
+                    models.WorkloadData, session=session):
+                self.assertEqual(chunk.chunk_order * 10,
+                                 chunk.started_at_timestamp)
+                chunk.started_at += dt.timedelta(hours=3)
+
+        self.assertEqual(
+            [0, 5, 10, 12, 15, 20, 22, 25, 32],
+            [r["timestamp"]
+             for r in db.workload_data_get_iter(self.workload_uuid)])
+
+    @mock.patch("rally.common.db.sqlalchemy.api.decode_chunk",
+                side_effect=db_api.decode_chunk)
+    def test_workload_data_get_iter_with_chunks_saved_in_local_time(
+            self, mock_decode_chunk):
+        # NOTE: chunks saved before started_at_timestamp was introduced,
+        #     the local time was shifted back by DST after the first chunk
+        for chunk_order, timestamps in enumerate(
+                ([3600, 3700, 7300], [3650, 7200], [20000, 20001])):
+            db.workload_data_create(
+                self.task_uuid, self.workload_uuid, chunk_order,
+                {"raw": [{"duration": 1, "timestamp": t}
+                         for t in timestamps]})
+        session = db_api.get_session()
+        with session.begin():
+            for chunk in db_api.Connection().model_query(
+                    models.WorkloadData, session=session):
+                chunk.started_at_timestamp = None
+                if chunk.chunk_order:
+                    chunk.started_at -= dt.timedelta(hours=1)
+
+        data = db.workload_data_get_iter(self.workload_uuid)
+        self.assertEqual([3600, 3650, 3700, 7200, 7300],
+                         [next(data)["timestamp"] for i in range(5)])
+        self.assertEqual(2, mock_decode_chunk.call_count)
+        self.assertEqual([20000, 20001], [r["timestamp"] for r in data])
+        self.assertEqual(3, mock_decode_chunk.call_count)
+
+    def test_task_get_detailed_without_data(self):
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 0,
+                                {"raw": [{"duration": 1, "timestamp": 1}]})
+
+        task = db.task_get(self.task_uuid, detailed=True)
+        workload = task["subtasks"][0]["workloads"][0]
+        self.assertEqual([{"duration": 1, "timestamp": 1}], workload["data"])
+
+        task = db.task_get(self.task_uuid, detailed=True, load_data=False)
+        workload = task["subtasks"][0]["workloads"][0]
+        self.assertEqual(self.workload_uuid, workload["uuid"])
+        self.assertNotIn("data", workload)
+
+
+class ChunkCodecTestCase(test.TestCase):
+
+    def test_encode_and_decode_chunk(self):
+        raw = [collections.OrderedDict([("z", 1), ("a", [{"b": u"\u2603"}])])]
+
+        chunk_data, chunk_size, compressed_chunk_size = (
+            db_api.encode_chunk(raw))
+
+        self.assertEqual("zlib", chunk_data["codec"])
+        self.assertEqual(len(json.dumps(raw)), chunk_size)
+        self.assertEqual(len(json.dumps(chunk_data)), compressed_chunk_size)
+        decoded = db_api.decode_chunk(json.loads(json.dumps(chunk_data)))
+        self.assertEqual(raw, decoded)
+        self.assertEqual(["z", "a"], list(decoded[0]))
+
+    def test_encode_chunk_without_codec(self):
+        raw = [{"a": 1}]
+        self.assertEqual(({"raw": raw}, 10, 19),
+                         db_api.encode_chunk(raw, codec=None))
+        self.assertEqual(raw, db_api.decode_chunk({"raw": raw}))
+
+    def test_decode_chunk_with_unknown_codec(self):
+        self.assertRaises(exceptions.RallyException, db_api.decode_chunk,
+                          {"codec": "foo", "data": ""})
+
 
 class DeploymentTestCase(test.DBTestCase):
     def test_deployment_create(self):
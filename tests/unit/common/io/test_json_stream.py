@@ -0,0 +1,101 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import ddt
+import six
+
+from rally.common.io import json_stream
+from tests.unit import test
+
+
+@ddt.ddt
+class JSONStreamReaderTestCase(test.TestCase):
+
+    def _get_reader(self, document, buffer_size=3):
+        return json_stream.JSONStreamReader(six.StringIO(document),
+                                            buffer_size=buffer_size)
+
+    @ddt.data(1, 3, 1024)
+    def test_read_value(self, buffer_size):
+        values = [12345, -1.5e10, "a string with \"quotes\"", True, None,
+                  {"foo": [1, 2, {"bar": "baz"}]}, [], {}]
+        reader = self._get_reader(
+            " \n ".join(json.dumps(v) for v in values), buffer_size)
+
+        self.assertEqual(values, [reader.read_value() for v in values])
+        reader.check_end()
+
+    @ddt.data(1, 3, 1024)
+    def test_iter_array(self, buffer_size):
+        reader = self._get_reader(" [1, 22 ,{\"a\": [333]}, \"4\"\n] ",
+                                  buffer_size)
+
+        self.assertEqual([1, 22, {"a": [333]}, "4"],
+                         list(reader.iter_array()))
+        reader.check_end()
+
+    def test_iter_array_empty(self):
+        reader = self._get_reader("[ ]")
+        self.assertEqual([], list(reader.iter_array()))
+
+    @ddt.data(1, 3, 1024)
+    def test_iter_nested(self, buffer_size):
+        document = json.dumps([{"name": "foo", "items": [1, 2, 3]},
+                               {"items": [], "name": "bar"}, {}])
+        reader = self._get_reader(document, buffer_size)
+
+        result = []
+        for i in reader.iter_array(decode=False):
+            obj = {}
+            for key in reader.iter_object():
+                if key == "items":
+                    obj[key] = [item * 2 for item in reader.iter_array()]
+                else:
+                    obj[key] = reader.read_value()
+            result.append((i, obj))
+
+        self.assertEqual([(0, {"name": "foo", "items": [2, 4, 6]}),
+                          (1, {"name": "bar", "items": []}),
+                          (2, {})], result)
+        reader.check_end()
+
+    @ddt.data(("[1, 2", "Expecting ',' or ']': char 5"),
+              ("[1 2]", "Expecting ',' or ']': char 3"),
+              ("[1, foo]", "Expecting value: char 4"),
+              ("1", "Expecting '[': char 0"),
+              ("{\"a\": 1,}", "Expecting property name: char 8"),
+              ("{\"a\" 1}", "Expecting ':': char 5"),
+              ("{\"a\": 1 \"b\": 2}", "Expecting ',' or '}': char 8"))
+    @ddt.unpack
+    def test_malformed_document(self, document, message):
+        reader = self._get_reader(document)
+
+        def read():
+            if reader.peek() == "{":
+                for key in reader.iter_object():
+                    reader.read_value()
+            else:
+                list(reader.iter_array())
+
+        e = self.assertRaises(ValueError, read)
+        self.assertEqual(message, str(e))
+
+    def test_check_end(self):
+        reader = self._get_reader("[] []")
+        list(reader.iter_array())
+
+        e = self.assertRaises(ValueError, reader.check_end)
+        self.assertEqual("Extra data: char 3", str(e))
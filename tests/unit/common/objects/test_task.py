@@ -64,7 +64,7 @@ class TaskTestCase(test.TestCase):
         mock_task_get.return_value = self.task
         task = objects.Task.get(self.task["uuid"])
         mock_task_get.assert_called_once_with(self.task["uuid"],
-                                              detailed=False)
+                                              detailed=False, load_data=True)
         self.assertEqual(task["uuid"], self.task["uuid"])
 
     @mock.patch("rally.common.objects.task.db.task_get_status")
@@ -196,9 +196,24 @@ class TaskTestCase(test.TestCase):
             "created_at": dt.datetime.now(),
             "updated_at": dt.datetime.now()}]}
         task_detailed = objects.Task.get("task_id", detailed=True)
-        mock_task_get.assert_called_once_with("task_id", detailed=True)
+        mock_task_get.assert_called_once_with("task_id", detailed=True,
+                                              load_data=True)
         self.assertEqual(mock_task_get.return_value, task_detailed.task)
 
+    @mock.patch("rally.common.db.api.task_get")
+    def test_get_detailed_with_lazy_data(self, mock_task_get):
+        mock_task_get.return_value = {
+            "subtasks": [{"workloads": [{"uuid": "w1"}, {"uuid": "w2"}]},
+                         {"workloads": [{"uuid": "w3"}]}]}
+        task = objects.Task.get("task_id", detailed=True, lazy_data=True)
+        mock_task_get.assert_called_once_with("task_id", detailed=True,
+                                              load_data=False)
+        workloads = [w for s in task["subtasks"] for w in s["workloads"]]
+        self.assertEqual(["w1", "w2", "w3"],
+                         [w["data"].workload_uuid for w in workloads])
+        for workload in workloads:
+            self.assertIsInstance(workload["data"], objects.WorkloadData)
+
     @mock.patch("rally.common.objects.task.db.task_update")
     def test_set_failed(self, mock_task_update):
         mock_task_update.return_value = self.task
@@ -328,6 +343,22 @@ class SubtaskTestCase(test.TestCase):
         self.assertIs(workload, mock_workload.return_value)
 
 
+class WorkloadDataTestCase(test.TestCase):
+
+    @mock.patch("rally.common.objects.task.db.workload_data_get_iter")
+    def test___iter__(self, mock_workload_data_get_iter):
+        mock_workload_data_get_iter.side_effect = lambda uuid: iter(
+            [{"uuid": uuid, "idx": 1}, {"uuid": uuid, "idx": 2}])
+        data = objects.WorkloadData("uuid")
+
+        self.assertFalse(mock_workload_data_get_iter.called)
+        for i in range(2):
+            self.assertEqual([{"uuid": "uuid", "idx": 1},
+                              {"uuid": "uuid", "idx": 2}], list(data))
+        self.assertEqual([mock.call("uuid"), mock.call("uuid")],
+                         mock_workload_data_get_iter.call_args_list)
+
+
 class WorkloadTestCase(test.TestCase):
 
     def setUp(self):
@@ -374,6 +405,22 @@ class WorkloadTestCase(test.TestCase):
             self.workload["task_uuid"], self.workload["uuid"],
             0, {"data": "foo"})
 
+    @mock.patch("rally.common.objects.task.db.workload_data_create_many")
+    @mock.patch("rally.common.objects.task.db.workload_create")
+    def test_add_workload_data_chunks(self, mock_workload_create,
+                                      mock_workload_data_create_many):
+        mock_workload_create.return_value = self.workload
+        workload = objects.Workload("uuid1", "uuid2", name="w",
+                                    description="descr", position=0,
+                                    runner={"type": "foo"}, context=None,
+                                    sla=None, args=None, hooks=[])
+
+        workload.add_workload_data_chunks([(0, {"raw": []}),
+                                           (1, {"raw": []})])
+        mock_workload_data_create_many.assert_called_once_with(
+            self.workload["task_uuid"], self.workload["uuid"],
+            [(0, {"raw": []}), (1, {"raw": []})])
+
     @mock.patch("rally.common.objects.task.db.workload_set_results")
     @mock.patch("rally.common.objects.task.db.workload_create")
     def test_set_results(self, mock_workload_create,
@@ -390,6 +437,7 @@ class WorkloadTestCase(test.TestCase):
         full_duration = 99
         start_time = 1231231277.22
         sla_results = []
+        stats = {"total_iteration_count": 0}
         hooks = []
         workload = objects.Workload("uuid1", "uuid2", name=name,
                                     description=description, position=position,
@@ -398,13 +446,14 @@ class WorkloadTestCase(test.TestCase):
 
         workload.set_results(load_duration=load_duration,
                              full_duration=full_duration,
-                             start_time=start_time, sla_results=sla_results)
+                             start_time=start_time, sla_results=sla_results,
+                             stats=stats)
         mock_workload_set_results.assert_called_once_with(
             workload_uuid=self.workload["uuid"],
             subtask_uuid=self.workload["subtask_uuid"],
             task_uuid=self.workload["task_uuid"],
             load_duration=load_duration, full_duration=full_duration,
-            start_time=start_time, sla_results=sla_results,
+            start_time=start_time, sla_results=sla_results, stats=stats,
             hooks_results=None)
 
     def test_format_workload_config(self):
@@ -0,0 +1,60 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import testtools
+
+from rally.common import asyncutils
+from tests.unit import test
+
+
+class AsyncUtilsTestCase(test.TestCase):
+
+    @testtools.skipIf(asyncutils.asyncio is None, "asyncio is not available")
+    def test_ensure_future(self):
+        loop = asyncutils.asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        future = asyncutils.ensure_future(
+            asyncutils.asyncio.sleep(0, result="foo"), loop)
+        self.assertEqual("foo", loop.run_until_complete(future))
+
+    @mock.patch("rally.common.asyncutils._finalizers", new_callable=dict)
+    @mock.patch("rally.common.asyncutils.ensure_future")
+    @mock.patch("rally.common.asyncutils.LOG")
+    def test_close_loop(self, mock_log, mock_ensure_future,
+                        mock__finalizers):
+        loop = mock.Mock()
+        other_loop = mock.Mock()
+        calls = []
+        asyncutils.add_finalizer(loop, lambda: calls.append("sync"))
+        asyncutils.add_finalizer(loop, lambda: calls.append("async") or "c")
+        asyncutils.add_finalizer(loop, mock.Mock(side_effect=ValueError))
+        asyncutils.add_finalizer(other_loop, lambda: calls.append("other"))
+
+        asyncutils.close_loop(loop)
+
+        self.assertEqual(["sync", "async"], calls)
+        mock_ensure_future.assert_called_once_with("c", loop)
+        loop.run_until_complete.assert_called_once_with(
+            mock_ensure_future.return_value)
+        self.assertEqual(1, mock_log.warning.call_count)
+        loop.close.assert_called_once_with()
+        self.assertEqual([other_loop], list(mock__finalizers))
+        self.assertFalse(other_loop.close.called)
+
+        # finalizers are called only once
+        asyncutils.close_loop(loop)
+        self.assertEqual(["sync", "async"], calls)
+        self.assertEqual(2, loop.close.call_count)
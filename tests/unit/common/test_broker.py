@@ -14,6 +14,7 @@
 #    under the License.
 
 import collections
+import threading
 
 import mock
 
@@ -84,3 +85,75 @@ class BrokerTestCase(test.TestCase):
         consumer_count = 2
         broker.run(publish, consume, consumer_count)
         self.assertEqual(set([1, 2, 3]), consumed)
+
+    def test__pipelined_consumer(self):
+        queue = broker._PipelineQueue()
+        for item in (1, 2, broker._STOP, 3):
+            queue.put(item)
+        mock_consume = mock.MagicMock()
+        broker._pipelined_consumer(mock_consume, queue)
+        self.assertEqual([mock.call({}, 1), mock.call({}, 2)],
+                         mock_consume.mock_calls)
+        self.assertEqual(3, queue.get_nowait())
+
+    def test__pipelined_consumer_fails(self):
+        queue = broker._PipelineQueue()
+        for item in (1, 2, broker._STOP):
+            queue.put(item)
+        mock_consume = mock.MagicMock(side_effect=Exception())
+        broker._pipelined_consumer(mock_consume, queue)
+        self.assertEqual(2, mock_consume.call_count)
+        self.assertTrue(queue.empty())
+
+    def test__pipelined_publisher(self):
+        publishers = collections.deque([mock.Mock(), mock.Mock(
+            side_effect=Exception()), mock.Mock()])
+        mock_publishers = list(publishers)
+        queue = broker._PipelineQueue()
+        broker._pipelined_publisher(publishers, queue)
+        for mock_publish in mock_publishers:
+            mock_publish.assert_called_once_with(queue)
+        self.assertFalse(publishers)
+
+    def test_run_pipelined(self):
+
+        def make_publisher(values):
+            def publish(queue):
+                for value in values:
+                    queue.append(value)
+            return publish
+
+        consumed = []
+
+        def consume(cache, item):
+            consumed.append(item)
+
+        publishers = [make_publisher(range(i * 10, i * 10 + 10))
+                      for i in range(5)]
+        broker.run_pipelined(publishers, consume, consumers_count=3,
+                             publishers_count=2, queue_size=2)
+        self.assertEqual(list(range(50)), sorted(consumed))
+
+    def test_run_pipelined_consumes_while_publishing(self):
+        consumed = threading.Event()
+
+        def publish(queue):
+            queue.append(1)
+            # NOTE: fails if the value is not consumed until the publisher
+            #     is finished
+            self.assertTrue(consumed.wait(10))
+            queue.append(2)
+
+        def consume(cache, item):
+            if item == 1:
+                consumed.set()
+
+        mock_consume = mock.Mock(side_effect=consume)
+        broker.run_pipelined([publish], mock_consume, queue_size=1)
+        self.assertEqual([mock.call({}, 1), mock.call({}, 2)],
+                         mock_consume.mock_calls)
+
+    def test_run_pipelined_without_publishers(self):
+        mock_consume = mock.Mock()
+        broker.run_pipelined([], mock_consume, consumers_count=2)
+        self.assertFalse(mock_consume.called)
@@ -22,6 +22,16 @@ from rally.common import streaming_algorithms as algo
 from tests.unit import test
 
 
+def get_exact_percentile(values, percent):
+    values = sorted(values)
+    k = (len(values) - 1) * percent
+    f = int(math.floor(k))
+    c = int(math.ceil(k))
+    if f == c:
+        return values[f]
+    return values[f] * (c - k) + values[c] * (k - f)
+
+
 class MeanComputationTestCase(test.TestCase):
 
     def test_empty_stream(self):
@@ -221,11 +231,6 @@ class PercentileComputationTestCase(test.TestCase):
         {"stream": "mixed50", "percent": 0.50, "expected": 51.89},
         {"stream": "mixed50", "percent": 0.90, "expected":
             82.81300000000002},
-        {"stream": "mixed5000", "percent": 0.25, "expected":
-            35.54600000000001},
-        {"stream": "mixed5000", "percent": 0.50, "expected": 48.351},
-        {"stream": "mixed5000", "percent": 0.90, "expected":
-            66.05880000000437},
         {"stream": "range5000", "percent": 0.25, "expected": 1249.75},
         {"stream": "range5000", "percent": 0.50, "expected": 2499.5},
         {"stream": "range5000", "percent": 0.90, "expected": 4499.1})
@@ -236,6 +241,14 @@ class PercentileComputationTestCase(test.TestCase):
         [comp.add(i) for i in getattr(self, stream)]
         self.assertEqual(expected, comp.result())
 
+    @ddt.data(0.25, 0.50, 0.90)
+    def test_add_and_result_of_long_stream(self, percent):
+        comp = algo.PercentileComputation(percent=percent)
+        for value in self.mixed5000:
+            comp.add(value)
+        expected = get_exact_percentile(self.mixed5000, percent)
+        self.assertLessEqual(abs(expected - comp.result()), expected * 0.01)
+
     def test_add_raises(self):
         comp = algo.PercentileComputation(0.50, 100)
         self.assertRaises(TypeError, comp.add)
@@ -245,6 +258,92 @@ class PercentileComputationTestCase(test.TestCase):
         comp = algo.PercentileComputation(0.50, 100)
         self.assertIsNone(comp.result())
 
+    def test_merge(self):
+        single_comp = algo.PercentileComputation(0.9)
+        comps = [algo.PercentileComputation(0.9) for _ in range(10)]
+        for idx, value in enumerate(self.mixed5000):
+            single_comp.add(value)
+            comps[idx % 10].add(value)
+
+        merged_comp = comps[0]
+        for comp in comps[1:]:
+            merged_comp.merge(comp)
+
+        self.assertEqual(single_comp.result(), merged_comp.result())
+
+
+@ddt.ddt
+class QuantileSketchTestCase(test.TestCase):
+
+    def test_init_raises(self):
+        self.assertRaises(ValueError, algo.QuantileSketch, 0)
+        self.assertRaises(ValueError, algo.QuantileSketch, 1)
+
+    def test_quantile_empty(self):
+        self.assertIsNone(algo.QuantileSketch().quantile(0.5))
+
+    def test_add_raises(self):
+        sketch = algo.QuantileSketch()
+        self.assertRaises(TypeError, sketch.add, "foo")
+        self.assertRaises(TypeError, sketch.add, None)
+
+    @ddt.data(0.01, 0.25, 0.5, 0.9, 0.95, 0.999)
+    def test_quantile_exact(self, percent):
+        values = [(i * 7919) % 1000 / 10.0 for i in range(1000)]
+        sketch = algo.QuantileSketch()
+        for value in values:
+            sketch.add(value)
+
+        self.assertEqual(1000, len(sketch))
+        self.assertEqual(get_exact_percentile(values, percent),
+                         sketch.quantile(percent))
+
+    @ddt.data(0.01, 0.05, 0.001)
+    def test_quantile_relative_error(self, relative_accuracy):
+        values = [math.exp((i * 7919) % 10007 / 1000.0) - 1
+                  for i in range(20000)]
+        values += [-v for v in values[:100]]
+        sketch = algo.QuantileSketch(relative_accuracy, exact_size=100)
+        for value in values:
+            sketch.add(value)
+
+        self.assertIsNone(sketch._values)
+        for percent in (0.001, 0.01, 0.25, 0.5, 0.9, 0.95, 0.999):
+            expected = get_exact_percentile(values, percent)
+            self.assertLessEqual(
+                abs(sketch.quantile(percent) - expected),
+                abs(expected) * relative_accuracy + 1e-9)
+        self.assertEqual(min(values), sketch.quantile(0.0))
+        self.assertEqual(max(values), sketch.quantile(1.0))
+
+    @ddt.data({"exact_size": 10000, "chunks": 4},
+              {"exact_size": 300, "chunks": 2},
+              {"exact_size": 300, "chunks": 10},
+              {"exact_size": 10, "chunks": 7})
+    @ddt.unpack
+    def test_merge(self, exact_size, chunks):
+        values = [((i * 7919) % 1000 - 100) / 10.0 for i in range(1000)]
+        single_sketch = algo.QuantileSketch(exact_size=exact_size)
+        sketches = [algo.QuantileSketch(exact_size=exact_size)
+                    for _ in range(chunks)]
+        for idx, value in enumerate(values):
+            single_sketch.add(value)
+            sketches[idx % chunks].add(value)
+
+        merged_sketch = algo.QuantileSketch(exact_size=exact_size)
+        for sketch in sketches:
+            merged_sketch.merge(sketch)
+        merged_sketch.merge(algo.QuantileSketch(exact_size=exact_size))
+
+        self.assertEqual(len(values), len(merged_sketch))
+        for percent in (0.01, 0.5, 0.9, 0.95, 0.99):
+            self.assertAlmostEqual(single_sketch.quantile(percent),
+                                   merged_sketch.quantile(percent))
+
+    def test_merge_raises(self):
+        self.assertRaises(ValueError, algo.QuantileSketch(0.01).merge,
+                          algo.QuantileSketch(0.02))
+
 
 class IncrementComputationTestCase(test.TestCase):
 
@@ -14,6 +14,7 @@
 
 from __future__ import print_function
 import collections
+import random
 import string
 import sys
 import threading
@@ -219,6 +220,40 @@ class RAMIntTestCase(test.TestCase):
         self.assertEqual(0, int(ri))
 
 
+class LRUCacheTestCase(test.TestCase):
+
+    def test_get_and_set(self):
+        cache = utils.LRUCache(4)
+        self.assertIsNone(cache.get("foo"))
+        self.assertEqual("default", cache.get("foo", "default"))
+        cache["foo"] = 1
+        cache["foo"] = 2
+        self.assertEqual(2, cache.get("foo"))
+        self.assertEqual(["foo"], list(cache))
+        self.assertEqual(1, len(cache))
+
+    def test_least_recently_used_items_are_dropped(self):
+        cache = utils.LRUCache(4)
+        for key in ("a", "b", "c", "d"):
+            cache[key] = key.upper()
+        self.assertEqual(set("abcd"), set(cache))
+
+        # "a" is used recently, so it is kept instead of "b"
+        self.assertEqual("A", cache.get("a"))
+        self.assertEqual(set("acd"), set(cache))
+        cache["e"] = "E"
+        cache["f"] = "F"
+        self.assertEqual(set("aef"), set(cache))
+        self.assertEqual("A", cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+        for i in range(100):
+            cache[i] = i
+            self.assertLessEqual(len(cache), 4)
+        # the most recently set items are kept
+        self.assertLessEqual(set([97, 98, 99]), set(cache))
+
+
 @ddt.ddt
 class RandomNameTestCase(test.TestCase):
 
@@ -231,10 +266,16 @@ class RandomNameTestCase(test.TestCase):
         {"fmt": "XXXX-test-XXX-test",
          "expected": "fake-test-bla-test"})
     @ddt.unpack
-    @mock.patch("random.choice")
-    def test_generate_random_name(self, mock_choice, task_id="faketask",
+    @mock.patch("rally.common.utils._task_id_parts", new_callable=dict)
+    @mock.patch("rally.common.utils._thread_local",
+                new_callable=threading.local)
+    @mock.patch("random.Random")
+    def test_generate_random_name(self, mock_random, mock__thread_local,
+                                  mock__task_id_parts, task_id="faketask",
                                   expected="s_rally_faketask_blargles",
                                   fmt="s_rally_XXXXXXXX_XXXXXXXX"):
+        mock_choice = mock_random.return_value.choice
+
         class FakeNameGenerator(utils.RandomNameGeneratorMixin):
             RESOURCE_NAME_FORMAT = fmt
             task = {"uuid": task_id}
@@ -248,6 +289,8 @@ class RandomNameTestCase(test.TestCase):
             RESOURCE_NAME_FORMAT = fmt
             verification = {"uuid": task_id}
 
+        mock__task_id_parts.clear()
+
         generator = FakeNameGenerator()
 
         mock_choice.side_effect = iter("blarglesdweebled")
@@ -366,6 +409,61 @@ class RandomNameTestCase(test.TestCase):
         for cls in classes:
             cls.name_matches_object.assert_called_once_with(name)
 
+    @mock.patch("rally.common.utils._name_matchers", new_callable=dict)
+    def test_name_matches_object_combined(self, mock__name_matchers):
+        class One(utils.RandomNameGeneratorMixin):
+            RESOURCE_NAME_FORMAT = "one_XXXX_XXXX"
+
+        class Two(utils.RandomNameGeneratorMixin):
+            RESOURCE_NAME_FORMAT = "two_XXXX_XXXX"
+
+        class Custom(utils.RandomNameGeneratorMixin):
+            name_matches_object = mock.Mock(return_value=False)
+
+        classes = (One, Two, One(), Custom)
+        self.assertTrue(utils.name_matches_object("one_abcd_abcd", *classes))
+        self.assertTrue(utils.name_matches_object("two_abcd_abcd", *classes))
+        self.assertTrue(utils.name_matches_object(
+            "two_abcd_abcd-1", *classes, exact=False))
+        self.assertFalse(utils.name_matches_object("two_abcd_abcd-1",
+                                                   *classes))
+        self.assertTrue(utils.name_matches_object(
+            "one_abcd_1234", *classes, task_id="ab-cd-ef"))
+        self.assertFalse(utils.name_matches_object(
+            "one_abef_1234", *classes, task_id="ab-cd-ef"))
+
+        self.assertEqual(
+            [mock.call("two_abcd_abcd-1"),
+             mock.call("one_abef_1234", task_id="ab-cd-ef")],
+            Custom.name_matches_object.call_args_list)
+        keys = ((One.RESOURCE_NAME_FORMAT,
+                 One.RESOURCE_NAME_ALLOWED_CHARACTERS),
+                (Two.RESOURCE_NAME_FORMAT,
+                 Two.RESOURCE_NAME_ALLOWED_CHARACTERS))
+        self.assertEqual({(keys, None, True), (keys, None, False),
+                          (keys, "ab-cd-ef", True)},
+                         set(mock__name_matchers))
+
+    @mock.patch("rally.common.utils._name_matchers", new_callable=dict)
+    @mock.patch("rally.common.utils.RandomNameGeneratorMixin."
+                "_generate_task_id_part", return_value="abcd")
+    def test_name_matches_object_cached(
+            self, mock_random_name_generator_mixin__generate_task_id_part,
+            mock__name_matchers):
+        class FakeNameGenerator(utils.RandomNameGeneratorMixin):
+            RESOURCE_NAME_FORMAT = "rally_XXXX_XXXX"
+
+        for i in range(3):
+            self.assertTrue(FakeNameGenerator.name_matches_object(
+                "rally_abcd_1234", task_id="ab!cd"))
+            self.assertTrue(utils.name_matches_object(
+                "rally_abcd_1234", FakeNameGenerator, task_id="ab!cd"))
+
+        # NOTE: the same matcher is used for a single class in both cases
+        mock_generate = mock_random_name_generator_mixin__generate_task_id_part
+        mock_generate.assert_called_once_with("ab!cd", 4)
+        self.assertEqual(1, len(mock__name_matchers))
+
     def test_cls_name_matches_object_identity(self):
         generator = utils.RandomNameGeneratorMixin()
         generator.task = {"uuid": "faketask"}
@@ -401,6 +499,46 @@ class RandomNameTestCase(test.TestCase):
         task_id_parts = set([n.split("_")[0] for n in names])
         self.assertEqual(len(task_id_parts), 1)
 
+    def test_task_id_part_does_not_reseed_global_random(self):
+        class FakeNameGenerator(utils.RandomNameGeneratorMixin):
+            RESOURCE_NAME_FORMAT = "XXXXXXXX_XXXXXXXX"
+
+        generator = FakeNameGenerator()
+        generator.task = {"uuid": "other bogus! task! id!"}
+        state = random.getstate()
+
+        names = set(generator.generate_random_name() for i in range(10))
+
+        self.assertEqual(state, random.getstate())
+        self.assertEqual(10, len(names))
+        self.assertEqual(1, len(set(n.split("_")[0] for n in names)))
+
+    def test__get_random(self):
+        rng = utils._get_random()
+        self.assertIsInstance(rng, random.Random)
+        self.assertIs(rng, utils._get_random())
+
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(utils._get_random()))
+        thread.start()
+        thread.join()
+        self.assertIsInstance(other[0], random.Random)
+        self.assertIsNot(rng, other[0])
+
+    @mock.patch("rally.common.utils._thread_local",
+                new_callable=threading.local)
+    @mock.patch("rally.common.utils.os.getpid", return_value=1)
+    def test__get_random_in_forked_process(self, mock_getpid,
+                                           mock__thread_local):
+        rng = utils._get_random()
+        self.assertIs(rng, utils._get_random())
+
+        mock_getpid.return_value = 2
+        forked_rng = utils._get_random()
+        self.assertIsNot(rng, forked_rng)
+        self.assertIs(forked_rng, utils._get_random())
+
     def test_make_name_matcher(self):
         matcher = utils.make_name_matcher("foo", "bar")
         self.assertTrue(matcher.name_matches_object("foo", task_id="task"))
@@ -460,6 +598,31 @@ class MergeTestCase(test.TestCase):
         self.assertEqual(out, expected_output)
 
 
+@ddt.ddt
+class IterateChunksTestCase(test.TestCase):
+    @ddt.data({"items": [], "expected": []},
+              {"items": [1, 2], "expected": [[1, 2]]},
+              {"items": [1, 2, 3], "expected": [[1, 2, 3]]},
+              {"items": [1, 2, 3, 4, 5, 6, 7],
+               "expected": [[1, 2, 3], [4, 5, 6], [7]]})
+    @ddt.unpack
+    def test_iterate_chunks(self, items, expected):
+        self.assertEqual(expected, list(utils.iterate_chunks(items, 3)))
+
+    def test_iterate_chunks_lazily(self):
+        consumed = []
+
+        def generate():
+            for i in range(10):
+                consumed.append(i)
+                yield i
+
+        chunks = utils.iterate_chunks(generate(), 4)
+        self.assertEqual([0, 1, 2, 3], next(chunks))
+        self.assertEqual([0, 1, 2, 3], consumed)
+        self.assertEqual([[4, 5, 6, 7], [8, 9]], list(chunks))
+
+
 class TimeoutThreadTestCase(test.TestCase):
     def test_timeout_thread(self):
         """Create and kill thread by timeout.
@@ -52,7 +52,8 @@ class HTMLExporterTestCase(test.TestCase):
         reporters.HTMLExporter.validate(None)
 
     @mock.patch("%s.plot.plot" % PATH, return_value="html")
-    def test_generate(self, mock_plot):
+    @mock.patch("%s.CONF" % PATH)
+    def test_generate(self, mock_conf, mock_plot):
         tasks_results = get_tasks_results()
         tasks_results.extend(get_tasks_results())
         reporter = reporters.HTMLExporter(tasks_results, None)
@@ -91,14 +92,27 @@ class HTMLExporterTestCase(test.TestCase):
                           "full_duration": 29.969523191452026,
                           "data": {"raw": []},
                           "position": 1, "sla": {}}]}]}],
-            include_libs=False)
-
+            include_libs=False, workers=mock_conf.report_workers)
+
+    @mock.patch("%s.open" % PATH, side_effect=mock.mock_open(), create=True)
+    @mock.patch("%s.plot.write_plot" % PATH)
+    @mock.patch("%s.plot.plot" % PATH)
+    @mock.patch("%s.CONF" % PATH)
+    def test_generate_to_file(self, mock_conf, mock_plot, mock_write_plot,
+                              mock_open):
+        tasks_results = get_tasks_results()
         reporter = reporters.HTMLExporter(tasks_results,
                                           output_destination="path")
-        self.assertEqual({"files": {"path": "html"},
-                          "open": "file://" + os.path.abspath("path")},
+
+        self.assertEqual({"open": "file://" + os.path.abspath("path")},
                          reporter.generate())
 
+        self.assertFalse(mock_plot.called)
+        mock_open.assert_called_once_with("path", "w+")
+        mock_write_plot.assert_called_once_with(
+            tasks_results, mock_open.side_effect(), include_libs=False,
+            workers=mock_conf.report_workers)
+
 
 class JUnitXMLExporterTestCase(test.TestCase):
 
@@ -0,0 +1,231 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+import os
+import random
+import tempfile
+
+import ddt
+import mock
+
+from rally import exceptions
+from rally.plugins.common.runners import arrival
+from rally.task import runner
+from tests.unit import fakes
+from tests.unit import test
+
+
+RUNNERS = "rally.plugins.common.runners."
+
+
+@ddt.ddt
+class ArrivalScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ArrivalScenarioRunnerTestCase, self).setUp()
+        self.task = mock.MagicMock()
+        self.context = fakes.FakeContext({"task": {"uuid": "uuid"}}).context
+        self.args = {"a": 1}
+
+    @ddt.data(({"arrivals": {"rate": 10}, "times": 10}, True),
+              ({"arrivals": {"rate": 10, "poisson": True, "seed": 42},
+                "duration": 10, "max_concurrency": 5}, True),
+              ({"arrivals": {"profile": [{"duration": 10, "rate": 1},
+                                         {"duration": 5, "rate": 1,
+                                          "end_rate": 20}]}}, True),
+              ({"arrivals": {"profile": [{"duration": 10, "rate": 1},
+                                         {"rate": 5}]}, "times": 100}, True),
+              ({"arrivals": {"trace": "/tmp/trace", "time_scale": 2}}, True),
+              ({"arrivals": {"rate": 10}}, False),
+              ({"arrivals": {"rate": 0}, "times": 10}, False),
+              ({"arrivals": {}, "times": 10}, False),
+              ({"arrivals": {"rate": 10, "trace": "/tmp/trace"},
+                "times": 10}, False),
+              ({"arrivals": {"trace": "/tmp/trace", "poisson": True}}, False),
+              ({"arrivals": {"rate": 10, "time_scale": 2}, "times": 1}, False),
+              ({"arrivals": {"profile": [{"rate": 1},
+                                         {"duration": 10, "rate": 1}]},
+                "times": 10}, False),
+              ({"arrivals": {"profile": [{"rate": 1}]}}, False),
+              ({"arrivals": {"profile": [{"rate": 0}]}, "times": 10}, False),
+              ({"arrivals": {"profile": [{"rate": 1, "end_rate": 2}]},
+                "times": 10}, False),
+              ({"arrivals": {"rate": 10}, "times": 10, "foo": "bar"}, False))
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        config["type"] = "arrival"
+        results = runner.ScenarioRunner.validate(
+            "arrival", None, None, config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertGreater(len(results), 0)
+
+    @ddt.data(({"rate": 2}, [0, 0.5, 1.0, 1.5, 2.0, 2.5]),
+              ([{"duration": 1, "rate": 2}, {"duration": 1, "rate": 4}],
+               [0, 0.5, 1.0, 1.25, 1.5, 1.75]),
+              ([{"duration": 2, "rate": 0}, {"duration": 2, "rate": 0,
+                                             "end_rate": 2},
+                {"rate": 1}],
+               [2.0, 2 + 2 ** 0.5, 4.0, 5.0, 6.0, 7.0]),
+              ([{"duration": 1, "rate": 3}], [0, 1.0 / 3, 2.0 / 3]))
+    @ddt.unpack
+    def test__profile_offsets(self, profile, expected):
+        if isinstance(profile, dict):
+            profile = [profile]
+        offsets = list(itertools.islice(
+            arrival._profile_offsets(profile, False, random.Random()), 6))
+
+        self.assertEqual(len(expected), len(offsets))
+        for expected_offset, offset in zip(expected, offsets):
+            self.assertAlmostEqual(expected_offset, offset)
+
+    def test__profile_offsets_poisson(self):
+        profile = [{"duration": 1000, "rate": 10}]
+        offsets = list(arrival._profile_offsets(profile, True,
+                                                random.Random(42)))
+
+        self.assertEqual(offsets, sorted(offsets))
+        self.assertLess(offsets[-1], 1000)
+        self.assertTrue(9500 < len(offsets) < 10500, len(offsets))
+        gaps = [b - a for a, b in zip(offsets, offsets[1:])]
+        # the gaps of Poisson arrivals are exponentially distributed
+        self.assertAlmostEqual(0.1, sum(gaps) / len(gaps), places=2)
+        self.assertGreater(max(gaps), 0.5)
+        self.assertEqual(offsets, list(arrival._profile_offsets(
+            profile, True, random.Random(42))))
+
+    def test__load_trace(self):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            f.write("# recorded requests\n"
+                    "1500000010.5 GET /foo\n"
+                    "\n"
+                    "1500000010.0,POST,/bar\n"
+                    "1500000012.0\n")
+
+        self.assertEqual([0, 0.5, 2.0], arrival._load_trace(path))
+        self.assertEqual([0, 0.25, 1.0], arrival._load_trace(path, 2))
+
+    @mock.patch(RUNNERS + "arrival.time")
+    @mock.patch(RUNNERS + "arrival.runner")
+    def test__worker_process(self, mock_runner, mock_time):
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        mock_time.time.side_effect = [100, 100, 100, 101, 101]
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        mock_queue = mock.MagicMock()
+        mock_event_queue = mock.MagicMock()
+        info = {"processes_to_start": 2, "processes_counter": 1}
+
+        arrival._worker_process(
+            mock_queue, [{"rate": 2}], False, 42, None, 99.5, 5, None, 3, 1,
+            self.context, "Dummy", "dummy", (), mock_event_queue, mock_event,
+            info)
+
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            3, mock_queue, "Dummy", "dummy", self.context, (),
+            mock_event_queue, 1)
+        # the second process starts the odd iterations of the schedule
+        self.assertEqual([mock.call(1, 100.0), mock.call(3, 101.0)],
+                         mock_pool.submit.call_args_list)
+        mock_time.sleep.assert_called_once_with(arrival.ABORT_CHECK_INTERVAL)
+        mock_pool.join.assert_called_once_with()
+
+    @mock.patch(RUNNERS + "arrival.runner")
+    def test__worker_process_with_trace_and_duration(self, mock_runner):
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        info = {"processes_to_start": 1, "processes_counter": 0}
+
+        arrival._worker_process(
+            mock.MagicMock(), None, False, None, [0, 0.01, 0.02, 10],
+            0, None, 5, 3, 0, self.context, "Dummy", "dummy", (),
+            mock.MagicMock(), mock.MagicMock(is_set=lambda: False), info)
+
+        self.assertEqual([mock.call(0, 0), mock.call(1, 0.01),
+                          mock.call(2, 0.02)],
+                         mock_pool.submit.call_args_list)
+
+    def test__run_scenario(self):
+        config = {"type": "arrival", "arrivals": {"rate": 50}, "times": 5,
+                  "max_concurrency": 2}
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                                 self.args)
+
+        results = [r for batch in runner_obj.result_queue for r in batch]
+        self.assertEqual(5, len(results))
+        for result in results:
+            self.assertEqual([], result["error"])
+            self.assertEqual(["Start lag"],
+                             [o["title"]
+                              for o in result["output"]["additive"]])
+
+    def test__run_scenario_aborted(self):
+        config = {"type": "arrival", "arrivals": {"rate": 1}, "times": 5}
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, config)
+
+        runner_obj.abort()
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                                 self.args)
+        self.assertEqual(0, len(runner_obj.result_queue))
+
+    def test__run_scenario_with_wrong_trace(self):
+        config = {"type": "arrival",
+                  "arrivals": {"trace": "/non/existing/trace"}}
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, config)
+
+        self.assertRaises(exceptions.RallyException, runner_obj._run_scenario,
+                          fakes.FakeScenario, "do_it", self.context, self.args)
+
+    @ddt.data({"config": {"max_concurrency": 20, "max_cpu_count": 1},
+               "real_cpu": 2, "processes_to_start": 1},
+              {"config": {"max_concurrency": 15}, "real_cpu": 2,
+               "processes_to_start": 2},
+              {"config": {"max_concurrency": 2}, "real_cpu": 4,
+               "processes_to_start": 2},
+              {"config": {}, "real_cpu": 4, "processes_to_start": 4})
+    @ddt.unpack
+    @mock.patch(RUNNERS + "arrival.ArrivalScenarioRunner._join_processes")
+    @mock.patch(RUNNERS + "arrival.ArrivalScenarioRunner"
+                "._create_process_pool")
+    @mock.patch(RUNNERS + "arrival.ArrivalScenarioRunner._create_queues",
+                return_value=("result_queue", "event_queue"))
+    @mock.patch(RUNNERS + "arrival.multiprocessing.cpu_count")
+    def test_that_cpu_count_is_adjusted_properly(
+            self, mock_cpu_count, mock__create_queues,
+            mock__create_process_pool, mock__join_processes, config,
+            real_cpu, processes_to_start):
+        mock_cpu_count.return_value = real_cpu
+        config.update({"type": "arrival", "times": 10,
+                       "arrivals": {"rate": 1, "poisson": True}})
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                                 self.args)
+
+        processes, worker_process, args_gen = (
+            mock__create_process_pool.call_args[0])
+        self.assertEqual(processes_to_start, processes)
+        self.assertEqual(arrival._worker_process, worker_process)
+        workers_args = [next(args_gen) for i in range(processes)]
+        self.assertEqual(
+            config.get("max_concurrency", arrival.DEFAULT_MAX_CONCURRENCY),
+            sum(args[8] for args in workers_args))
+        # all workers should generate the same schedule
+        self.assertEqual(1, len(set(args[3] for args in workers_args)))
+        mock__join_processes.assert_called_once_with(
+            mock__create_process_pool.return_value, "result_queue",
+            "event_queue")
@@ -0,0 +1,190 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import ddt
+import mock
+
+from rally import exceptions
+from rally.plugins.common.runners import asynchronous
+from rally.task import runner
+from tests.unit import test
+
+
+RUNNERS = "rally.plugins.common.runners."
+
+
+class FakeAsyncScenario(object):
+
+    def __init__(self, context=None):
+        self.context = context
+        self._output = {"additive": [], "complete": []}
+
+    def idle_duration(self):
+        return 0
+
+    def atomic_actions(self):
+        return []
+
+    def run(self, delay=0):
+        return asynchronous.asyncio.sleep(delay)
+
+    def fail(self):
+        future = asynchronous.asyncio.Future()
+        future.set_exception(ValueError("Oops"))
+        return future
+
+    def fail_to_start(self):
+        raise TypeError("Oops")
+
+
+@ddt.ddt
+class AsyncioScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(AsyncioScenarioRunnerTestCase, self).setUp()
+        self.task = mock.MagicMock()
+        self.context = {"task": {"uuid": "uuid"}}
+
+    @ddt.data(({"type": "asyncio", "times": 10, "concurrency": 2}, True),
+              ({"type": "asyncio", "duration": 1.5, "rps": 20}, True),
+              ({"type": "asyncio", "times": 10, "rps": 0.5,
+                "timeout": 3}, True),
+              ({"type": "asyncio", "times": 10, "duration": 1}, False),
+              ({"type": "asyncio", "concurrency": 2}, False),
+              ({"type": "asyncio", "times": 10, "rps": 0}, False),
+              ({"type": "asyncio", "times": 0}, False),
+              ({"type": "asyncio", "times": 1, "foo": "bar"}, False))
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = runner.ScenarioRunner.validate(
+            "asyncio", None, None, config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertGreater(len(results), 0)
+
+    def test__run_scenario_without_asyncio(self):
+        runner_obj = asynchronous.AsyncioScenarioRunner(
+            self.task, {"type": "asyncio", "times": 1})
+        with mock.patch.object(asynchronous, "asyncio", new=None):
+            self.assertRaises(exceptions.RallyException,
+                              runner_obj._run_scenario, FakeAsyncScenario,
+                              "run", self.context, {})
+
+    @ddt.data(({"times": 5}, 1),
+              ({"times": 5, "rps": 2}, float("inf")),
+              ({"duration": 5, "rps": 2, "concurrency": 3}, 3))
+    @ddt.unpack
+    @mock.patch(RUNNERS + "asynchronous.asyncio")
+    def test__run_scenario(self, config, concurrency, mock_asyncio):
+        config["type"] = "asyncio"
+        runner_obj = asynchronous.AsyncioScenarioRunner(self.task, config)
+
+        @mock.patch.object(runner_obj, "_join_processes")
+        @mock.patch.object(runner_obj, "_create_process_pool")
+        @mock.patch.object(runner_obj, "_create_queues",
+                           return_value=("result_queue", "event_queue"))
+        def _run(mock__create_queues, mock__create_process_pool,
+                 mock__join_processes):
+            runner_obj._run_scenario(FakeAsyncScenario, "run", self.context,
+                                     {"a": 1})
+
+            self.assertEqual(1, mock__create_process_pool.call_count)
+            processes, worker_process, args_gen = (
+                mock__create_process_pool.call_args[0])
+            self.assertEqual(1, processes)
+            self.assertEqual(asynchronous._worker_process, worker_process)
+            self.assertEqual(
+                ("result_queue", config.get("times"), config.get("duration"),
+                 concurrency, config.get("rps"), 0, self.context,
+                 FakeAsyncScenario, "run", {"a": 1}, "event_queue",
+                 runner_obj.aborted),
+                next(args_gen))
+            mock__join_processes.assert_called_once_with(
+                mock__create_process_pool.return_value, "result_queue",
+                "event_queue")
+
+        _run()
+
+
+class WorkerProcessTestCase(test.TestCase):
+
+    def setUp(self):
+        super(WorkerProcessTestCase, self).setUp()
+        if asynchronous.asyncio is None:
+            self.skipTest("asyncio is not available")
+        self.context = {"task": {"uuid": "uuid"}}
+        self.results = []
+        self.events = []
+        self.result_queue = mock.Mock(put=self.results.append)
+        self.event_queue = mock.Mock(put=self.events.append)
+        self.aborted = threading.Event()
+
+    def _run(self, method_name="run", args=None, times=None, duration=None,
+             concurrency=1, rps=None, timeout=0):
+        asynchronous._worker_process(
+            self.result_queue, times, duration, concurrency, rps, timeout,
+            self.context, FakeAsyncScenario, method_name, args or {},
+            self.event_queue, self.aborted, {})
+
+    def test_times(self):
+        self._run(times=5, concurrency=2)
+
+        self.assertEqual(5, len(self.results))
+        self.assertEqual([{"type": "iteration", "value": i}
+                          for i in range(1, 6)], self.events)
+        for result in self.results:
+            self.assertEqual([], result["error"])
+            self.assertEqual([], result["atomic_actions"])
+
+    def test_concurrency(self):
+        self._run(times=4, concurrency=4, args={"delay": 0.2})
+
+        self.assertEqual(4, len(self.results))
+        # all iterations should be started at once
+        timestamps = [r["timestamp"] for r in self.results]
+        self.assertLess(max(timestamps) - min(timestamps), 0.1)
+
+    def test_rps(self):
+        self._run(times=3, rps=10)
+
+        self.assertEqual(3, len(self.results))
+        timestamps = sorted(r["timestamp"] for r in self.results)
+        self.assertGreaterEqual(timestamps[-1] - timestamps[0], 0.15)
+
+    def test_duration(self):
+        self._run(duration=0.3, rps=20, concurrency=100)
+
+        self.assertTrue(3 <= len(self.results) <= 8, len(self.results))
+
+    def test_timeout(self):
+        self._run(times=2, args={"delay": 10}, timeout=0.05)
+
+        self.assertEqual(2, len(self.results))
+        for result in self.results:
+            self.assertEqual("ThreadTimeoutException", result["error"][0])
+
+    def test_errors(self):
+        self._run(method_name="fail", times=2)
+        self._run(method_name="fail_to_start", times=2)
+
+        self.assertEqual(["ValueError", "ValueError", "TypeError",
+                          "TypeError"],
+                         [r["error"][0] for r in self.results])
+
+    def test_aborted(self):
+        self.aborted.set()
+        self._run(duration=10)
+
+        self.assertEqual([], self.results)
@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 import ddt
 import mock
 
@@ -44,6 +46,10 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
               ({"times": 4, "concurrency": 5,
                 "timeout": 2, "type": "constant",
                 "max_cpu_count": 2}, False),
+              ({"times": 4, "concurrency": 2, "type": "constant",
+                "worker_mode": "thread_pool"}, True),
+              ({"times": 4, "concurrency": 2, "type": "constant",
+                "worker_mode": "foo"}, False),
               ({"foo": "bar"}, False))
     @ddt.unpack
     def test_validate(self, config, valid):
@@ -54,15 +60,6 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
         else:
             self.assertGreater(len(results), 0)
 
-    @mock.patch(RUNNERS + "constant.runner")
-    def test__run_scenario_once_with_unpack_args(self, mock_runner):
-        result = constant._run_scenario_once_with_unpack_args(
-            ("FOO", ("BAR", "QUUZ")))
-
-        self.assertEqual(mock_runner._run_scenario_once.return_value, result)
-        mock_runner._run_scenario_once.assert_called_once_with(
-            "FOO", ("BAR", "QUUZ"))
-
     @mock.patch(RUNNERS + "constant.time")
     @mock.patch(RUNNERS + "constant.threading.Thread")
     @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
@@ -108,6 +105,31 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
             )
             self.assertIn(call, mock_thread.mock_calls)
 
+    @mock.patch(RUNNERS + "constant.runner")
+    def test__worker_process_with_pool(self, mock_runner):
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        mock_queue = mock.MagicMock()
+        mock_event_queue = mock.MagicMock()
+        times = 4
+        context = {"users": [{"tenant_id": "t1", "credential": "c1",
+                              "id": "uuid1"}]}
+        info = {"processes_to_start": 1, "processes_counter": 1}
+
+        constant._worker_process_with_pool(
+            mock_queue, iter(range(10)), 1, 2, times, context, "Dummy",
+            "dummy", (), mock_event_queue, mock_event, info)
+
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            2, mock_queue, "Dummy", "dummy", context, (), mock_event_queue,
+            1)
+        self.assertEqual(times + 1, mock_pool.wait_for_slot.call_count)
+        self.assertEqual([mock.call(i) for i in range(times)],
+                         mock_pool.submit.call_args_list)
+        mock_pool.release_slot.assert_called_once_with()
+        mock_pool.join.assert_called_once_with()
+
     @mock.patch(RUNNERS_BASE + "_run_scenario_once")
     def test__worker_thread(self, mock__run_scenario_once):
         mock_queue = mock.MagicMock()
@@ -134,6 +156,17 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
             for result in result_batch:
                 self.assertIsNotNone(result)
 
+    def test__run_scenario_with_thread_pool(self):
+        self.config["worker_mode"] = "thread_pool"
+        runner_obj = constant.ConstantScenarioRunner(self.task, self.config)
+
+        runner_obj._run_scenario(
+            fakes.FakeScenario, "do_it", self.context, self.args)
+        self.assertEqual(len(runner_obj.result_queue), self.config["times"])
+        for result_batch in runner_obj.result_queue:
+            for result in result_batch:
+                self.assertIsNotNone(result)
+
     def test__run_scenario_exception(self):
         runner_obj = constant.ConstantScenarioRunner(self.task, self.config)
 
@@ -153,7 +186,8 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
                                  self.args)
         self.assertEqual(len(runner_obj.result_queue), 0)
 
-    @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
+    @mock.patch(RUNNERS + "constant.ConstantScenarioRunner._create_queues",
+                return_value=("result_queue", "event_queue"))
     @mock.patch(RUNNERS + "constant.multiprocessing.cpu_count")
     @mock.patch(RUNNERS + "constant.ConstantScenarioRunner._log_debug_info")
     @mock.patch(RUNNERS +
@@ -164,7 +198,7 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
             mock__join_processes,
             mock__create_process_pool,
             mock__log_debug_info,
-            mock_cpu_count, mock_queue):
+            mock_cpu_count, mock__create_queues):
 
         samples = [
             {
@@ -221,7 +255,6 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
             mock_cpu_count.reset_mock()
             mock__create_process_pool.reset_mock()
             mock__join_processes.reset_mock()
-            mock_queue.reset_mock()
 
             mock_cpu_count.return_value = sample["real_cpu"]
 
@@ -247,7 +280,7 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
             self.assertIn(constant._worker_process, args)
             mock__join_processes.assert_called_once_with(
                 mock__create_process_pool.return_value,
-                mock_queue.return_value, mock_queue.return_value)
+                "result_queue", "event_queue")
 
     def test_abort(self):
         runner_obj = constant.ConstantScenarioRunner(self.task, self.config)
@@ -266,9 +299,14 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.context = fakes.FakeContext({"task": {"uuid": "uuid"}}).context
         self.context["iteration"] = 14
         self.args = {"a": 1}
+        self.task = mock.MagicMock()
 
     @ddt.data(({"duration": 0, "concurrency": 2,
                 "timeout": 2, "type": "constant_for_duration"}, True),
+              ({"duration": 1, "concurrency": 2, "max_cpu_count": 1,
+                "type": "constant_for_duration"}, True),
+              ({"duration": 1, "max_cpu_count": 0,
+                "type": "constant_for_duration"}, False),
               ({"foo": "bar"}, False))
     @ddt.unpack
     def test_validate(self, config, valid):
@@ -281,7 +319,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "do_it",
                                  self.context, self.args)
@@ -294,7 +332,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_exception(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "something_went_wrong",
                                  self.context, self.args)
@@ -308,7 +346,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_timeout(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "raise_timeout",
                                  self.context, self.args)
@@ -320,9 +358,95 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
                 self.assertIsNotNone(result)
         self.assertIn("error", runner_obj.result_queue[0][0])
 
+    def test_run_scenario_constantly_for_duration_deadline(self):
+        self.config["duration"] = 0.2
+        runner_obj = constant.ConstantForDurationScenarioRunner(
+            self.task, self.config)
+
+        start = time.time()
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 self.context, self.args)
+        self.assertLess(time.time() - start, 5)
+        results = [r for batch in runner_obj.result_queue for r in batch]
+        self.assertGreater(len(results), 1)
+        for result in results:
+            self.assertEqual([], result["error"])
+
+    @mock.patch(RUNNERS + "constant.time")
+    @mock.patch(RUNNERS + "constant.runner")
+    def test__worker_process_for_duration(self, mock_runner, mock_time):
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        mock_time.time.side_effect = [10, 11, 12, 20]
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        mock_queue = mock.MagicMock()
+        mock_event_queue = mock.MagicMock()
+        context = {"users": [{"tenant_id": "t1", "credential": "c1",
+                              "id": "uuid1"}]}
+        info = {"processes_to_start": 1, "processes_counter": 1}
+
+        constant._worker_process_for_duration(
+            mock_queue, iter(range(10)), 1, 2, 15, context, "Dummy",
+            "dummy", (), mock_event_queue, mock_event, info)
+
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            2, mock_queue, "Dummy", "dummy", context, (), mock_event_queue,
+            1)
+        # the first iteration doesn't check the deadline
+        self.assertEqual([mock.call(i) for i in range(4)],
+                         mock_pool.submit.call_args_list)
+        self.assertEqual(5, mock_pool.wait_for_slot.call_count)
+        mock_pool.release_slot.assert_called_once_with()
+        mock_pool.join.assert_called_once_with()
+
+    @ddt.data({"config": {"concurrency": 20, "max_cpu_count": 1},
+               "real_cpu": 2, "processes_to_start": 1,
+               "concurrency_per_worker": 20, "concurrency_overhead": 0},
+              {"config": {"concurrency": 15, "max_cpu_count": 3},
+               "real_cpu": 2, "processes_to_start": 2,
+               "concurrency_per_worker": 7, "concurrency_overhead": 1},
+              {"config": {"concurrency": 1},
+               "real_cpu": 4, "processes_to_start": 1,
+               "concurrency_per_worker": 1, "concurrency_overhead": 0})
+    @ddt.unpack
+    @mock.patch(RUNNERS + "constant.ConstantForDurationScenarioRunner"
+                "._join_processes")
+    @mock.patch(RUNNERS + "constant.ConstantForDurationScenarioRunner"
+                "._create_process_pool")
+    @mock.patch(RUNNERS + "constant.ConstantForDurationScenarioRunner"
+                "._create_queues",
+                return_value=("result_queue", "event_queue"))
+    @mock.patch(RUNNERS + "constant.multiprocessing.cpu_count")
+    def test_that_cpu_count_is_adjusted_properly(
+            self, mock_cpu_count, mock__create_queues,
+            mock__create_process_pool, mock__join_processes, config,
+            real_cpu, processes_to_start, concurrency_per_worker,
+            concurrency_overhead):
+        mock_cpu_count.return_value = real_cpu
+        config.update({"type": "constant_for_duration", "duration": 10})
+        runner_obj = constant.ConstantForDurationScenarioRunner(self.task,
+                                                                config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", self.context,
+                                 self.args)
+
+        processes, worker_process, args_gen = (
+            mock__create_process_pool.call_args[0])
+        self.assertEqual(processes_to_start, processes)
+        self.assertEqual(constant._worker_process_for_duration,
+                         worker_process)
+        concurrencies = [next(args_gen)[3] for i in range(processes)]
+        self.assertEqual(config["concurrency"], sum(concurrencies))
+        self.assertEqual(
+            [concurrency_per_worker + 1] * concurrency_overhead,
+            concurrencies[:concurrency_overhead])
+        mock__join_processes.assert_called_once_with(
+            mock__create_process_pool.return_value, "result_queue",
+            "event_queue")
+
     def test__run_scenario_constantly_aborted(self):
-        runner_obj = constant.ConstantForDurationScenarioRunner(None,
-                                                                self.config)
+        runner_obj = constant.ConstantForDurationScenarioRunner(
+            self.task, self.config)
 
         runner_obj.abort()
         runner_obj._run_scenario(fakes.FakeScenario, "do_it",
@@ -330,8 +454,8 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.assertEqual(len(runner_obj.result_queue), 0)
 
     def test_abort(self):
-        runner_obj = constant.ConstantForDurationScenarioRunner(None,
-                                                                self.config)
+        runner_obj = constant.ConstantForDurationScenarioRunner(
+            self.task, self.config)
         self.assertFalse(runner_obj.aborted.is_set())
         runner_obj.abort()
         self.assertTrue(runner_obj.aborted.is_set())
@@ -211,6 +211,43 @@ class RPSScenarioRunnerTestCase(test.TestCase):
             )
             self.assertIn(call, mock_thread.mock_calls)
 
+    @mock.patch(RUNNERS + "rps.time")
+    @mock.patch(RUNNERS + "rps.runner")
+    def test__worker_process_with_pool(self, mock_runner, mock_time):
+        mock_time.time.return_value = 0
+        mock_pool = mock_runner.WorkerThreadPool.return_value
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        mock_queue = mock.MagicMock()
+        mock_event_queue = mock.MagicMock()
+        times = 4
+        context = {"users": [{"tenant_id": "t1", "credential": "c1",
+                              "id": "uuid1"}]}
+        info = {"processes_to_start": 1, "processes_counter": 1}
+        mock_runs_per_second = mock.MagicMock(return_value=10.0)
+
+        def wait(delay):
+            mock_time.time.return_value += delay
+
+        mock_event.wait.side_effect = wait
+
+        rps._worker_process_with_pool(
+            mock_queue, iter(range(10)), 1, times, 3, context, "Dummy",
+            "dummy", (), mock_event_queue, mock_event,
+            mock_runs_per_second, 10, 1, info)
+
+        mock_runner.WorkerThreadPool.assert_called_once_with(
+            3, mock_queue, "Dummy", "dummy", context, (), mock_event_queue,
+            1)
+        self.assertEqual(times, mock_pool.wait_for_slot.call_count)
+        self.assertEqual([mock.call(i) for i in range(times)],
+                         mock_pool.submit.call_args_list)
+        # iterations are started at 0.0, 0.1, 0.2 and 0.3 seconds
+        self.assertEqual(times - 1, mock_event.wait.call_count)
+        self.assertAlmostEqual(0.3, mock_time.time.return_value)
+        self.assertFalse(mock_pool.release_slot.called)
+        mock_pool.join.assert_called_once_with()
+
     @mock.patch(RUNNERS + "rps.runner._run_scenario_once")
     def test__worker_thread(self, mock__run_scenario_once):
         mock_queue = mock.MagicMock()
@@ -282,6 +319,21 @@ class RPSScenarioRunnerTestCase(test.TestCase):
             for result in result_batch:
                 self.assertIsNotNone(result)
 
+    @mock.patch(RUNNERS + "rps.time.sleep")
+    def test__run_scenario_with_thread_pool(self, mock_sleep):
+        config = {"times": 20, "rps": 1000, "timeout": 5,
+                  "max_concurrency": 15, "worker_mode": "thread_pool"}
+        runner_obj = rps.RPSScenarioRunner(self.task, config)
+
+        runner_obj._run_scenario(
+            fakes.FakeScenario, "do_it",
+            fakes.FakeContext({"task": {"uuid": "uuid"}}).context, {})
+
+        self.assertEqual(config["times"], len(runner_obj.result_queue))
+        for result_batch in runner_obj.result_queue:
+            for result in result_batch:
+                self.assertIsNotNone(result)
+
     @mock.patch(RUNNERS + "rps.time.sleep")
     def test__run_scenario_exception(self, mock_sleep):
         config = {"times": 4, "rps": 10}
@@ -308,7 +360,8 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         for result in runner_obj.result_queue:
             self.assertIsNotNone(result)
 
-    @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
+    @mock.patch(RUNNERS + "rps.RPSScenarioRunner._create_queues",
+                return_value=("result_queue", "event_queue"))
     @mock.patch(RUNNERS + "rps.multiprocessing.cpu_count")
     @mock.patch(RUNNERS + "rps.RPSScenarioRunner._log_debug_info")
     @mock.patch(RUNNERS +
@@ -316,7 +369,7 @@ class RPSScenarioRunnerTestCase(test.TestCase):
     @mock.patch(RUNNERS + "rps.RPSScenarioRunner._join_processes")
     def test_that_cpu_count_is_adjusted_properly(
             self, mock__join_processes, mock__create_process_pool,
-            mock__log_debug_info, mock_cpu_count, mock_queue):
+            mock__log_debug_info, mock_cpu_count, mock__create_queues):
 
         samples = [
             {
@@ -385,7 +438,6 @@ class RPSScenarioRunnerTestCase(test.TestCase):
             mock_cpu_count.reset_mock()
             mock__create_process_pool.reset_mock()
             mock__join_processes.reset_mock()
-            mock_queue.reset_mock()
 
             mock_cpu_count.return_value = sample["real_cpu"]
 
@@ -411,7 +463,7 @@ class RPSScenarioRunnerTestCase(test.TestCase):
             self.assertIn(rps._worker_process, args)
             mock__join_processes.assert_called_once_with(
                 mock__create_process_pool.return_value,
-                mock_queue.return_value, mock_queue.return_value)
+                "result_queue", "event_queue")
 
     def test_abort(self):
         config = {"times": 4, "rps": 10}
@@ -39,3 +39,28 @@ class RequestScenarioTestCase(test.TestCase):
         mock_choice.assert_called_once_with([{"url": "sample_url"}])
         mock__check_request.assert_called_once_with(
             status_code=200, url="sample_url")
+
+    @mock.patch("%s.requests.utils.AsyncRequestScenario._check_request_async"
+                % SCN)
+    def test_check_request_async(self, mock__check_request_async):
+        Requests = http_requests.HttpRequestsCheckRequestAsync(
+            test.get_test_context())
+        result = Requests.run("sample_url", "GET", 200, data="foo")
+        self.assertEqual(mock__check_request_async.return_value, result)
+        mock__check_request_async.assert_called_once_with(
+            "sample_url", "GET", 200, data="foo")
+
+    @mock.patch("%s.requests.utils.AsyncRequestScenario._check_request_async"
+                % SCN)
+    @mock.patch("%s.requests.http_requests.random.choice" % SCN)
+    def test_check_random_request_async(self, mock_choice,
+                                        mock__check_request_async):
+        mock_choice.return_value = {"url": "sample_url"}
+        Requests = http_requests.HttpRequestsCheckRandomRequestAsync(
+            test.get_test_context())
+        result = Requests.run(status_code=200,
+                              requests=[{"url": "sample_url"}])
+        self.assertEqual(mock__check_request_async.return_value, result)
+        mock_choice.assert_called_once_with([{"url": "sample_url"}])
+        mock__check_request_async.assert_called_once_with(
+            status_code=200, url="sample_url")
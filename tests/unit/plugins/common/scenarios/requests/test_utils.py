@@ -12,7 +12,10 @@
 
 
 import mock
+import testtools
 
+from rally.common import asyncutils
+from rally import exceptions
 from rally.plugins.common.scenarios.requests import utils
 from tests.unit import test
 
@@ -36,3 +39,84 @@ class RequestsTestCase(test.TestCase):
 
         self.assertRaises(ValueError, scenario._check_request,
                           status_code=201, url="sample", method="GET")
+
+
+class AsyncRequestsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(AsyncRequestsTestCase, self).setUp()
+        self.addCleanup(utils.AsyncRequestScenario._sessions.clear)
+
+    def test__get_session_without_aiohttp(self):
+        with mock.patch.object(utils, "aiohttp", new=None):
+            self.assertRaises(exceptions.RallyException,
+                              utils.AsyncRequestScenario._get_session, "loop")
+
+    @mock.patch("rally.common.asyncutils.add_finalizer")
+    @mock.patch("rally.plugins.common.scenarios.requests.utils.aiohttp")
+    def test__get_session(self, mock_aiohttp, mock_add_finalizer):
+        mock_aiohttp.ClientSession.return_value.closed = False
+        session = utils.AsyncRequestScenario._get_session("loop")
+        self.assertEqual(mock_aiohttp.ClientSession.return_value, session)
+        mock_aiohttp.ClientSession.assert_called_once_with(
+            connector=mock_aiohttp.TCPConnector.return_value)
+        mock_aiohttp.TCPConnector.assert_called_once_with(limit=0)
+
+        self.assertEqual(session,
+                         utils.AsyncRequestScenario._get_session("loop"))
+        self.assertEqual(1, mock_aiohttp.ClientSession.call_count)
+
+        # the session is closed and forgotten with the loop
+        mock_add_finalizer.assert_called_once_with("loop", mock.ANY)
+        finalizer = mock_add_finalizer.call_args[0][1]
+        self.assertEqual(session.close.return_value, finalizer())
+        session.close.assert_called_once_with()
+        self.assertEqual({}, utils.AsyncRequestScenario._sessions)
+        self.assertIsNone(finalizer())
+
+    def _check_request_async(self, status_code, expected_status_code):
+        loop = asyncutils.asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        asyncutils.asyncio.set_event_loop(loop)
+        self.addCleanup(asyncutils.asyncio.set_event_loop, None)
+
+        def make_future(result):
+            future = asyncutils.asyncio.Future(loop=loop)
+            future.set_result(result)
+            return future
+
+        patcher = mock.patch(
+            "rally.plugins.common.scenarios.requests.utils.aiohttp")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        response = mock.Mock(status=status_code)
+        response.read.return_value = make_future(b"body")
+        session = mock.Mock(closed=False)
+        session.request.return_value = make_future(response)
+        utils.AsyncRequestScenario._sessions[loop] = session
+
+        scenario = utils.AsyncRequestScenario(test.get_test_context())
+        future = scenario._check_request_async(
+            url="sample", method="GET", status_code=expected_status_code,
+            data="foo")
+        loop.run_until_complete(asyncutils.asyncio.wait([future],
+                                                        loop=loop))
+
+        session.request.assert_called_once_with("GET", "sample", data="foo")
+        response.read.assert_called_once_with()
+        self._test_atomic_action_timer(scenario.atomic_actions(),
+                                       "requests.check_request")
+        return future
+
+    @testtools.skipIf(asyncutils.asyncio is None,
+                      "asyncio is not available")
+    def test__check_request_async(self):
+        future = self._check_request_async(200, 200)
+        self.assertEqual(200, future.result())
+
+    @testtools.skipIf(asyncutils.asyncio is None,
+                      "asyncio is not available")
+    def test__check_request_async_wrong_status(self):
+        future = self._check_request_async(200, 201)
+        self.assertIsInstance(future.exception(), ValueError)
@@ -105,6 +105,21 @@ class ResourceManagerTestCase(test.TestCase):
         self.assertFalse(manager.is_deleted())
         self.assertTrue(manager.is_deleted())
 
+    @mock.patch("%s.ResourceManager.list" % BASE)
+    def test_bulk_is_deleted(self, mock_resource_manager_list):
+        mock_resource_manager_list.return_value = [
+            mock.Mock(id="active", status="ACTIVE"),
+            mock.Mock(id="deleting", status="deleting"),
+            mock.Mock(id="deleted", status="deleted"),
+            mock.Mock(id="other", status="ACTIVE")]
+
+        manager = base.ResourceManager(resource=mock.MagicMock())
+        self.assertEqual(
+            {"deleted", "gone"},
+            manager.bulk_is_deleted(["active", "deleting", "deleted",
+                                     "gone"]))
+        mock_resource_manager_list.assert_called_once_with()
+
     @mock.patch("%s.ResourceManager._manager" % BASE)
     def test_delete(self, mock_resource_manager__manager):
         res = mock.MagicMock(id="test_id")
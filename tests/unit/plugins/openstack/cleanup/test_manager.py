@@ -13,6 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+import time
+
+import ddt
 import mock
 
 from rally.common import utils
@@ -24,6 +28,7 @@ from tests.unit import test
 BASE = "rally.plugins.openstack.cleanup.manager"
 
 
+@ddt.ddt
 class SeekAndDestroyTestCase(test.TestCase):
 
     def setUp(self):
@@ -80,6 +85,92 @@ class SeekAndDestroyTestCase(test.TestCase):
 
         self.assertEqual(1, mock_log.warning.call_count)
 
+    @mock.patch("%s.LOG" % BASE)
+    def test__delete_single_resource_watched(self, mock_log):
+        mock_resource = mock.MagicMock(_max_attempts=3, _timeout=10,
+                                       _interval=0.01, tenant_uuid="t1")
+        mock_resource.id.return_value = "r1"
+        destroyer = manager.SeekAndDestroy(None, None, None)
+        destroyer._watch_set = {}
+
+        destroyer._delete_single_resource(mock_resource)
+
+        mock_resource.delete.assert_called_once_with()
+        self.assertFalse(mock_resource.is_deleted.called)
+        self.assertEqual(["t1"], list(destroyer._watch_set))
+        self.assertEqual(["r1"], list(destroyer._watch_set["t1"]))
+        self.assertEqual(mock_resource, destroyer._watch_set["t1"]["r1"][0])
+
+    def _watched(self, destroyer, tenant_uuid, uuid, started=None, **kw):
+        resource = mock.Mock(tenant_uuid=tenant_uuid, **kw)
+        msg_kw = {"uuid": uuid, "name": "", "service": "s", "resource": "r"}
+        destroyer._watch_set.setdefault(tenant_uuid, {})[uuid] = (
+            resource, msg_kw, started or time.time())
+        return resource
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__check_deletions(self, mock_log):
+        destroyer = manager.SeekAndDestroy(None, None, None)
+        destroyer._watch_set = {}
+        res_t1 = self._watched(destroyer, "t1", "r1", _timeout=10,
+                               _max_attempts=3)
+        self._watched(destroyer, "t1", "r2", _timeout=10, _max_attempts=3)
+        self._watched(destroyer, "t1", "r3", started=time.time() - 20,
+                      _timeout=10, _max_attempts=3)
+        res_t1.bulk_is_deleted.return_value = {"r1"}
+        res_t2 = self._watched(destroyer, "t2", "r4", _timeout=10,
+                               _max_attempts=3)
+        res_t2.bulk_is_deleted.return_value = {"r4"}
+        # NOTE: the check of t1 could be done by any of its resources
+        for resource, msg_kw, started in destroyer._watch_set["t1"].values():
+            resource.bulk_is_deleted = res_t1.bulk_is_deleted
+
+        destroyer._check_deletions({})
+
+        res_t1.bulk_is_deleted.assert_called_once_with(mock.ANY)
+        self.assertEqual(
+            {"r1", "r2", "r3"},
+            set(res_t1.bulk_is_deleted.call_args[0][0]))
+        res_t2.bulk_is_deleted.assert_called_once_with(["r4"])
+        self.assertEqual({"t1": ["r2"]},
+                         dict((k, list(v))
+                              for k, v in destroyer._watch_set.items()))
+        self.assertEqual(1, mock_log.warning.call_count)
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__check_deletions_fails(self, mock_log):
+        destroyer = manager.SeekAndDestroy(None, None, None)
+        destroyer._watch_set = {}
+        resource = self._watched(destroyer, "t1", "r1", _timeout=10,
+                                 _max_attempts=1)
+        resource.bulk_is_deleted.side_effect = Exception
+        failures = {}
+
+        destroyer._check_deletions(failures)
+        self.assertEqual({"t1": 1}, failures)
+        self.assertEqual(["r1"], list(destroyer._watch_set["t1"]))
+
+        destroyer._check_deletions(failures)
+        self.assertEqual({"t1": 2}, failures)
+        self.assertEqual({}, destroyer._watch_set)
+        self.assertEqual(3, mock_log.warning.call_count)
+        self.assertEqual(2, mock_log.exception.call_count)
+
+    def test__watcher(self):
+        destroyer = manager.SeekAndDestroy(
+            mock.Mock(_interval=0.001), None, None)
+        destroyer._watch_set = {}
+        resource = self._watched(destroyer, "t1", "r1", _timeout=10,
+                                 _max_attempts=3)
+        resource.bulk_is_deleted.side_effect = [set(), set(), {"r1"}]
+        stop_event = threading.Event()
+        stop_event.set()
+
+        destroyer._watcher(stop_event)
+
+        self.assertEqual(3, resource.bulk_is_deleted.call_count)
+        self.assertEqual({}, destroyer._watch_set)
+
     @mock.patch("%s.LOG" % BASE)
     def test__delete_single_resource_excpetion_in_is_deleted(self, mock_log):
         mock_resource = mock.MagicMock(_max_attempts=3, _timeout=10,
@@ -283,19 +374,128 @@ class SeekAndDestroyTestCase(test.TestCase):
         mock__delete_single_resource.assert_called_once_with(
             mock_mgr.return_value)
 
-    @mock.patch("%s.broker.run" % BASE)
-    def test_exterminate(self, mock_broker_run):
-        manager_cls = mock.MagicMock(_threads=5)
+    @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
+    def test__publishers(self, mock__get_cached_client):
+        mock_mgr = self._manager([[1, 2], [3], [4, 5]],
+                                 _perform_for_admin_only=False,
+                                 _tenant_resource=True)
+        admin = mock.MagicMock()
+        users = [{"tenant_id": 1, "id": 1},
+                 {"tenant_id": 1, "id": 2},
+                 {"tenant_id": 2, "id": 3}]
+        publishers = manager.SeekAndDestroy(
+            mock_mgr, admin, users)._publishers()
+
+        self.assertEqual(2, len(publishers))
+        mock__get_cached_client.assert_called_once_with(admin)
+        self.assertFalse(mock_mgr.called)
+
+        queue = []
+        publishers[1](queue)
+        mock_client = mock__get_cached_client.return_value
+        mock_mgr.assert_called_once_with(admin=mock_client, user=mock_client,
+                                         tenant_uuid=users[2]["tenant_id"])
+        self.assertEqual([(admin, users[2], 1), (admin, users[2], 2)], queue)
+
+    @ddt.data({"threads": 10, "publishers": 5, "consumers_count": 7,
+               "publishers_count": 3},
+              {"threads": 10, "publishers": 2, "consumers_count": 8,
+               "publishers_count": 2},
+              {"threads": 4, "publishers": 5, "consumers_count": 2,
+               "publishers_count": 2},
+              {"threads": 10, "publishers": 5, "bulk_is_deleted": True,
+               "consumers_count": 6, "publishers_count": 3},
+              {"threads": 2, "publishers": 5, "bulk_is_deleted": True,
+               "consumers_count": 1, "publishers_count": 1})
+    @ddt.unpack
+    @mock.patch("%s.threading.Thread" % BASE)
+    @mock.patch("%s.CONF" % BASE)
+    @mock.patch("%s.broker.run_pipelined" % BASE)
+    def test_exterminate(self, mock_broker_run_pipelined, mock_conf,
+                         mock_thread, threads, publishers, consumers_count,
+                         publishers_count, bulk_is_deleted=False):
+        mock_conf.cleanup.cleanup_publisher_threads = 3
+        mock_conf.cleanup.cleanup_queue_size = 100
+        manager_cls = mock.MagicMock(_threads=threads,
+                                     _bulk_is_deleted=bulk_is_deleted)
         cleaner = manager.SeekAndDestroy(manager_cls, None, None)
-        cleaner._publisher = mock.Mock()
+        cleaner._publishers = mock.Mock(return_value=["p"] * publishers)
         cleaner._consumer = mock.Mock()
         cleaner.exterminate()
 
-        mock_broker_run.assert_called_once_with(cleaner._publisher,
-                                                cleaner._consumer,
-                                                consumers_count=5)
+        mock_broker_run_pipelined.assert_called_once_with(
+            ["p"] * publishers, cleaner._consumer,
+            consumers_count=consumers_count,
+            publishers_count=publishers_count, queue_size=100)
+        self.assertEqual(bulk_is_deleted, mock_thread.called)
+
+    @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
+    @mock.patch("%s.SeekAndDestroy._consumer" % BASE)
+    def test_exterminate_lists_resources_of_all_users(
+            self, mock__consumer, mock__get_cached_client):
+
+        def make_manager(admin, user, tenant_uuid):
+            mgr = mock.Mock()
+            mgr.list.return_value = [tenant_uuid * 10, tenant_uuid * 10 + 1]
+            return mgr
+
+        manager_cls = mock.Mock(side_effect=make_manager,
+                                _perform_for_admin_only=False,
+                                _tenant_resource=False, _threads=2,
+                                _bulk_is_deleted=False)
+        users = [{"tenant_id": i, "id": i} for i in range(3)]
+        manager.SeekAndDestroy(manager_cls, None, users).exterminate()
+
+        consumed = sorted((args[1][2], args[1][1]) for args, kwargs
+                          in mock__consumer.call_args_list)
+        self.assertEqual([(0, users[0]), (1, users[0]),
+                          (10, users[1]), (11, users[1]),
+                          (20, users[2]), (21, users[2])], consumed)
+
+    @mock.patch("%s.LOG" % BASE)
+    @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
+    def test_exterminate_with_bulk_is_deleted(self, mock__get_cached_client,
+                                              mock_log):
+        lock = threading.Lock()
+        existing = {}
+
+        @base.resource("fake", "resources", tenant_resource=True,
+                       timeout=10, interval=0.001, threads=3,
+                       bulk_is_deleted=True)
+        class FakeResource(base.ResourceManager):
+            def id(self):
+                return self.raw_resource
 
+            def name(self):
+                return base.NoName(self._resource)
 
+            def list(self):
+                with lock:
+                    return list(existing.get(self.tenant_uuid, []))
+
+            def delete(self):
+                with lock:
+                    existing[self.tenant_uuid].remove(self.id())
+
+            def is_deleted(self):
+                raise AssertionError("is_deleted() should not be called")
+
+        for tenant in ("t1", "t2"):
+            existing[tenant] = ["%s-%s" % (tenant, i) for i in range(5)]
+        users = [{"tenant_id": tenant, "id": tenant}
+                 for tenant in sorted(existing)]
+
+        with mock.patch.object(FakeResource, "bulk_is_deleted",
+                               side_effect=FakeResource.bulk_is_deleted,
+                               autospec=True) as mock_bulk_is_deleted:
+            manager.SeekAndDestroy(FakeResource, None, users).exterminate()
+
+        self.assertEqual({"t1": [], "t2": []}, existing)
+        self.assertTrue(mock_bulk_is_deleted.called)
+        self.assertFalse(mock_log.warning.called)
+
+
+@ddt.ddt
 class ResourceManagerTestCase(test.TestCase):
 
     def _get_res_mock(self, **kw):
@@ -364,7 +564,8 @@ class ResourceManagerTestCase(test.TestCase):
     @mock.patch("rally.common.plugin.discover.itersubclasses")
     @mock.patch("%s.SeekAndDestroy" % BASE)
     @mock.patch("%s.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _threads=20),
+                              mock.MagicMock(_order=2, _threads=20)])
     def test_cleanup(self, mock_find_resource_managers, mock_seek_and_destroy,
                      mock_itersubclasses):
         class A(utils.RandomNameGeneratorMixin):
@@ -385,18 +586,19 @@ class ResourceManagerTestCase(test.TestCase):
         mock_seek_and_destroy.assert_has_calls([
             mock.call(mock_find_resource_managers.return_value[0], "admin",
                       ["user"], api_versions=None,
-                      resource_classes=[A], task_id="task_id"),
+                      resource_classes=[A], task_id="task_id", threads=20),
             mock.call().exterminate(),
             mock.call(mock_find_resource_managers.return_value[1], "admin",
                       ["user"], api_versions=None,
-                      resource_classes=[A], task_id="task_id"),
+                      resource_classes=[A], task_id="task_id", threads=20),
             mock.call().exterminate()
         ])
 
     @mock.patch("rally.common.plugin.discover.itersubclasses")
     @mock.patch("%s.SeekAndDestroy" % BASE)
     @mock.patch("%s.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _threads=20),
+                              mock.MagicMock(_order=2, _threads=20)])
     def test_cleanup_with_api_versions(self,
                                        mock_find_resource_managers,
                                        mock_seek_and_destroy,
@@ -421,10 +623,72 @@ class ResourceManagerTestCase(test.TestCase):
         mock_seek_and_destroy.assert_has_calls([
             mock.call(mock_find_resource_managers.return_value[0], "admin",
                       ["user"], api_versions=api_versions,
-                      resource_classes=[A], task_id="task_id"),
+                      resource_classes=[A], task_id="task_id", threads=20),
             mock.call().exterminate(),
             mock.call(mock_find_resource_managers.return_value[1], "admin",
                       ["user"], api_versions=api_versions,
-                      resource_classes=[A], task_id="task_id"),
+                      resource_classes=[A], task_id="task_id", threads=20),
             mock.call().exterminate()
         ])
+
+    @mock.patch("%s.CONF" % BASE)
+    @mock.patch("%s.SeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_managers_with_same_order(self,
+                                              mock_find_resource_managers,
+                                              mock_seek_and_destroy,
+                                              mock_conf):
+        mock_conf.cleanup.cleanup_threads = 10
+        managers = [mock.MagicMock(_order=1, _threads=20),
+                    mock.MagicMock(_order=1, _threads=2),
+                    mock.MagicMock(_order=1, _threads=20),
+                    mock.MagicMock(_order=2, _threads=20)]
+        mock_find_resource_managers.return_value = managers
+        running = []
+        first_group_running = threading.Event()
+
+        def exterminate(manager):
+            running.append(manager)
+            if len(running) == 3:
+                first_group_running.set()
+            # NOTE: exceptions are swallowed by the broker, so the result
+            #     of waiting for other managers of the group is checked later
+            if manager._order == 1:
+                running.append(first_group_running.wait(10))
+
+        mock_seek_and_destroy.side_effect = lambda manager, *args, **kw: (
+            mock.Mock(exterminate=lambda: exterminate(manager)))
+
+        manager.cleanup(names=["a"], admin_required=False,
+                        superclass=utils.RandomNameGeneratorMixin)
+
+        self.assertEqual(set(managers[:3]), set(running[:3]))
+        self.assertEqual([True, True, True, managers[3]], running[3:])
+        threads = dict((args[0], kwargs["threads"]) for args, kwargs
+                       in mock_seek_and_destroy.call_args_list)
+        self.assertEqual({managers[0]: 3, managers[1]: 2, managers[2]: 3,
+                          managers[3]: 10}, threads)
+
+    @ddt.data({"threads_count": 5, "consumers_count": 1, "threads": 5},
+              {"threads_count": 2, "consumers_count": 1, "threads": 2},
+              {"threads_count": 7, "consumers_count": 2, "threads": 3})
+    @ddt.unpack
+    @mock.patch("%s.CONF" % BASE)
+    @mock.patch("%s.broker.run" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_managers_with_same_order_and_few_threads(
+            self, mock_find_resource_managers, mock_broker_run, mock_conf,
+            threads_count, consumers_count, threads):
+        mock_conf.cleanup.cleanup_threads = threads_count
+        managers = [mock.MagicMock(_order=1, _threads=20) for i in range(3)]
+        mock_find_resource_managers.return_value = managers
+
+        manager.cleanup(names=["a"], admin_required=False,
+                        superclass=utils.RandomNameGeneratorMixin)
+
+        publisher, consumer = mock_broker_run.call_args[0]
+        self.assertEqual({"consumers_count": consumers_count},
+                         mock_broker_run.call_args[1])
+        jobs = []
+        publisher(jobs)
+        self.assertEqual([(m, threads) for m in managers], jobs)
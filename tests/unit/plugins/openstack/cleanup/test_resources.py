@@ -23,6 +23,7 @@ from novaclient import exceptions as nova_exc
 from watcherclient.common.apiclient import exceptions as watcher_exceptions
 
 from rally import consts
+from rally import exceptions
 from rally.plugins.openstack.cleanup import resources
 from tests.unit import test
 
@@ -639,11 +640,37 @@ class GlanceImageTestCase(test.TestCase):
 
         client = glance._client.return_value
 
-        deleted_image = mock.Mock(status="DELETED")
-        client.get_image.side_effect = [glance.raw_resource, deleted_image]
-
         glance.delete()
         client.delete_image.assert_called_once_with(glance.raw_resource.id)
+        self.assertFalse(client.get_image.called)
+
+    @ddt.data({"status": "active", "deleted": False},
+              {"status": "deleted", "deleted": True},
+              {"error": Exception(), "deleted": False},
+              {"error": exceptions.GetResourceNotFound(resource="image"),
+               "deleted": True})
+    @ddt.unpack
+    def test_is_deleted(self, deleted, status=None, error=None):
+        glance = resources.GlanceImage(resource=mock.Mock())
+        glance._client = mock.Mock()
+        client = glance._client.return_value
+        if error is None:
+            client.get_image.return_value = mock.Mock(status=status)
+        else:
+            client.get_image.side_effect = error
+
+        self.assertEqual(deleted, glance.is_deleted())
+        client.get_image.assert_called_once_with(glance.raw_resource.id)
+
+    @mock.patch("%s.CONF" % BASE)
+    def test_timeout_and_interval(self, mock_conf):
+        mock_conf.benchmark.glance_image_delete_timeout = 30
+        mock_conf.benchmark.glance_image_delete_poll_interval = 2
+        self.assertEqual(30, resources.GlanceImage._timeout)
+        self.assertEqual(2, resources.GlanceImage()._interval)
+
+        mock_conf.benchmark.glance_image_delete_timeout = 60
+        self.assertEqual(60, resources.GlanceImage._timeout)
 
 
 class CeilometerTestCase(test.TestCase):
@@ -46,7 +46,8 @@ class AdminCleanupTestCase(test.TestCase):
 
     @mock.patch("rally.common.plugin.discover.itersubclasses")
     @mock.patch("%s.manager.find_resource_managers" % ADMIN,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _threads=20),
+                              mock.MagicMock(_order=2, _threads=20)])
     @mock.patch("%s.manager.SeekAndDestroy" % ADMIN)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_resource_managers,
                      mock_itersubclasses):
@@ -74,20 +75,23 @@ class AdminCleanupTestCase(test.TestCase):
                       ctx["users"],
                       api_versions=None,
                       resource_classes=[ResourceClass],
-                      task_id="task_id"),
+                      task_id="task_id",
+                      threads=20),
             mock.call().exterminate(),
             mock.call(mock_find_resource_managers.return_value[1],
                       ctx["admin"],
                       ctx["users"],
                       api_versions=None,
                       resource_classes=[ResourceClass],
-                      task_id="task_id"),
+                      task_id="task_id",
+                      threads=20),
             mock.call().exterminate()
         ])
 
     @mock.patch("rally.common.plugin.discover.itersubclasses")
     @mock.patch("%s.manager.find_resource_managers" % ADMIN,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _threads=20),
+                              mock.MagicMock(_order=2, _threads=20)])
     @mock.patch("%s.manager.SeekAndDestroy" % ADMIN)
     def test_cleanup_admin_with_api_versions(self,
                                              mock_seek_and_destroy,
@@ -125,13 +129,15 @@ class AdminCleanupTestCase(test.TestCase):
                       ctx["users"],
                       api_versions=ctx["config"]["api_versions"],
                       resource_classes=[ResourceClass],
-                      task_id=ctx["task"]["uuid"]),
+                      task_id=ctx["task"]["uuid"],
+                      threads=20),
             mock.call().exterminate(),
             mock.call(mock_find_resource_managers.return_value[1],
                       ctx["admin"],
                       ctx["users"],
                       api_versions=ctx["config"]["api_versions"],
                       resource_classes=[ResourceClass],
-                      task_id=ctx["task"]["uuid"]),
+                      task_id=ctx["task"]["uuid"],
+                      threads=20),
             mock.call().exterminate()
         ])
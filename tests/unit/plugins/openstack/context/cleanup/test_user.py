@@ -46,7 +46,8 @@ class UserCleanupTestCase(test.TestCase):
 
     @mock.patch("rally.common.plugin.discover.itersubclasses")
     @mock.patch("%s.manager.find_resource_managers" % ADMIN,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _threads=20),
+                              mock.MagicMock(_order=2, _threads=20)])
     @mock.patch("%s.manager.SeekAndDestroy" % ADMIN)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_resource_managers,
                      mock_itersubclasses):
@@ -71,17 +72,20 @@ class UserCleanupTestCase(test.TestCase):
         mock_seek_and_destroy.assert_has_calls([
             mock.call(mock_find_resource_managers.return_value[0],
                       None, ctx["users"], api_versions=None,
-                      resource_classes=[ResourceClass], task_id="task_id"),
+                      resource_classes=[ResourceClass], task_id="task_id",
+                      threads=20),
             mock.call().exterminate(),
             mock.call(mock_find_resource_managers.return_value[1],
                       None, ctx["users"], api_versions=None,
-                      resource_classes=[ResourceClass], task_id="task_id"),
+                      resource_classes=[ResourceClass], task_id="task_id",
+                      threads=20),
             mock.call().exterminate()
         ])
 
     @mock.patch("rally.common.plugin.discover.itersubclasses")
     @mock.patch("%s.manager.find_resource_managers" % ADMIN,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _threads=20),
+                              mock.MagicMock(_order=2, _threads=20)])
     @mock.patch("%s.manager.SeekAndDestroy" % ADMIN)
     def test_cleanup_user_with_api_versions(
             self,
@@ -121,13 +125,15 @@ class UserCleanupTestCase(test.TestCase):
                       ctx["users"],
                       api_versions=ctx["config"]["api_versions"],
                       resource_classes=[ResourceClass],
-                      task_id="task_id"),
+                      task_id="task_id",
+                      threads=20),
             mock.call().exterminate(),
             mock.call(mock_find_resource_managers.return_value[1],
                       None,
                       ctx["users"],
                       api_versions=ctx["config"]["api_versions"],
                       resource_classes=[ResourceClass],
-                      task_id="task_id"),
+                      task_id="task_id",
+                      threads=20),
             mock.call().exterminate()
         ])
@@ -14,12 +14,14 @@
 #    under the License.
 
 import collections
+import random
 
 import ddt
 import mock
 
 from rally.common.plugin import plugin
 from rally.task.processing import charts
+from rally.task.processing import utils
 from tests.unit import test
 
 CHARTS = "rally.task.processing.charts."
@@ -93,6 +95,21 @@ class ChartTestCase(test.TestCase):
             chart._merge_atomic_actions(atomic_actions)
         )
 
+    @mock.patch(CHARTS + "utils.AtomicMerger")
+    def test__get_atomic_merger(self, mock_atomic_merger):
+        chart = self.Chart(self.wload_info)
+        chart._get_atomic_names()
+        chart._merge_atomic_actions([])
+        chart._merge_atomic_actions([])
+
+        mock_atomic_merger.assert_called_once_with(
+            self.wload_info["statistics"]["atomics"])
+        merger = mock_atomic_merger.return_value
+        self.assertEqual(merger, chart._get_atomic_merger())
+        merger.get_merged_names.assert_called_once_with()
+        self.assertEqual([mock.call([]), mock.call([])],
+                         merger.merge_atomic_actions.call_args_list)
+
 
 class MainStackedAreaChartTestCase(test.TestCase):
 
@@ -256,6 +273,35 @@ class LoadProfileChartTestCase(test.TestCase):
             chart.add_iteration({"timestamp": ts, "duration": duration})
         self.assertEqual(expected, chart.render())
 
+    def test_add_columns(self):
+        rand = random.Random(42)
+        iterations = [{"timestamp": 100 + rand.uniform(0, 50),
+                       "duration": rand.choice([0.01, 1, 10, 40]) *
+                       rand.random(),
+                       "error": [], "atomic_actions": []}
+                      for i in range(500)]
+        iterations.append({"timestamp": 100, "duration": 0.5, "error": [],
+                           "atomic_actions": []})
+        workload = {"total_iteration_count": len(iterations), "data": [],
+                    "load_duration": 100, "start_time": 100,
+                    "statistics": {"atomics": {}}}
+        columns = utils.IterationColumns(workload)
+        expected_chart = charts.LoadProfileChart(workload)
+        for iteration in iterations:
+            columns.add_iteration(iteration)
+            expected_chart.add_iteration(iteration)
+        expected = expected_chart.render()[0][1]
+
+        for numpy in set([None, charts.numpy]):
+            with mock.patch.object(charts, "numpy", numpy):
+                chart = charts.LoadProfileChart(workload)
+                chart.add_columns(columns)
+            result = chart.render()[0][1]
+
+            self.assertEqual([x for x, y in expected], [x for x, y in result])
+            for (x, expected_y), (x, y) in zip(expected, result):
+                self.assertAlmostEqual(expected_y, y)
+
 
 @ddt.ddt
 class HistogramChartTestCase(test.TestCase):
@@ -319,6 +365,24 @@ class HistogramChartTestCase(test.TestCase):
         chart = self.HistogramChart({"total_iteration_count": base_size})
         self.assertEqual(expected, chart._init_views(min_value, max_value))
 
+    def test_add_values_to_bins(self):
+        chart = self.HistogramChart({"total_iteration_count": 1000})
+        values = ([None, 0, 1.2, 4.2, 4.3, 5] +
+                  [1.2 + 0.003 * i for i in range(1000)] +
+                  # the borders of bins
+                  chart._data["bar"]["views"][2]["x"])
+
+        chart._add_values("bar", values)
+
+        for view in chart._data["bar"]["views"]:
+            expected = [0] * view["bins"]
+            for value in values:
+                for bin_i, bin_v in enumerate(view["x"]):
+                    if (value or 0) <= bin_v:
+                        expected[bin_i] += 1
+                        break
+            self.assertEqual(expected, view["y"])
+
 
 class MainHistogramChartTestCase(test.TestCase):
 
@@ -795,3 +859,89 @@ class ModuleTestCase(test.TestCase):
     @ddt.unpack
     def test_validate_output(self, args, expected=None):
         self.assertEqual(expected, charts.validate_output(*args))
+
+
+@ddt.ddt
+class AddColumnsTestCase(test.TestCase):
+
+    def _get_workload(self, failed_iteration_count):
+        iterations = []
+        for i in range(30):
+            actions = [("foo", 0.1 * (i % 4 + 1))]
+            if i % 5:
+                actions.append(("bar", 0.5))
+            if i % 7 == 3:
+                actions.append(("foo", 0.2))
+            iteration = generate_iteration(
+                1.5 + i % 4, ["Error", "", ""] if i % 6 == 5 else [],
+                *actions)
+            iteration.update({"timestamp": 100 + i * 0.5,
+                              "idle_duration": i % 3 * 0.1})
+            iterations.append(iteration)
+        return {"total_iteration_count": len(iterations),
+                "failed_iteration_count": failed_iteration_count,
+                "min_duration": 1.5, "max_duration": 4.5,
+                "load_duration": 20, "start_time": 100,
+                "statistics": {"atomics": collections.OrderedDict([
+                    ("foo", {"count": 1, "min_duration": 0.1,
+                             "max_duration": 0.4}),
+                    ("bar", {"count": 1, "min_duration": 0.5,
+                             "max_duration": 0.5})])},
+                "data": iterations}
+
+    @ddt.data(*[(chart_cls, failed)
+                for chart_cls in (charts.MainStackedAreaChart,
+                                  charts.AtomicStackedAreaChart,
+                                  charts.AtomicAvgChart,
+                                  charts.LoadProfileChart,
+                                  charts.MainHistogramChart,
+                                  charts.AtomicHistogramChart,
+                                  charts.MainStatsTable)
+                for failed in (0, 5)])
+    @ddt.unpack
+    def test_add_columns(self, chart_cls, failed_iteration_count):
+        workload = self._get_workload(failed_iteration_count)
+        columns = utils.IterationColumns(workload)
+        by_iteration = chart_cls(workload)
+        for iteration in workload["data"]:
+            columns.add_iteration(iteration)
+            by_iteration.add_iteration(iteration)
+        by_columns = chart_cls(workload)
+        by_columns.add_columns(columns)
+
+        self.assertEqual(by_iteration.render(), by_columns.render())
+
+    @ddt.data(charts.MainStackedAreaChart,
+              charts.AtomicStackedAreaChart,
+              charts.AtomicAvgChart,
+              charts.AtomicHistogramChart)
+    def test_add_columns_by_iterations(self, chart_cls):
+        class Chart(chart_cls):
+            def _map_columns(self, columns):
+                return None
+
+        workload = self._get_workload(5)
+        columns = utils.IterationColumns(workload)
+        by_iteration = chart_cls(workload)
+        for iteration in workload["data"]:
+            columns.add_iteration(iteration)
+            by_iteration.add_iteration(iteration)
+        by_columns = Chart(workload)
+        by_columns.add_columns(columns)
+
+        self.assertEqual(by_iteration.render(), by_columns.render())
+
+    def test_add_columns_of_lazy_data(self):
+        workload = self._get_workload(0)
+        workload["start_time"] = 99.9
+        columns = utils.IterationColumns(workload)
+        for iteration in workload["data"]:
+            columns.add_iteration(iteration)
+        expected = charts.LoadProfileChart(workload)
+        expected.add_columns(columns)
+
+        workload["data"] = iter(workload["data"])
+        chart = charts.LoadProfileChart(workload)
+        chart.add_columns(columns)
+
+        self.assertEqual(expected.render(), chart.render())
@@ -17,6 +17,7 @@ import json
 
 import ddt
 import mock
+import six
 
 from rally.task.processing import plot
 from tests.unit import test
@@ -44,7 +45,9 @@ class PlotTestCase(test.TestCase):
             {"timestamp": i + 2, "error": [],
              "duration": i + 5, "idle_duration": i,
              "output": {"additive": [], "complete": []},
-             "atomic_actions": {"foo_action": i + 10}} for i in range(10)]
+             "atomic_actions": [{"name": "foo_action", "started_at": 0,
+                                 "finished_at": i + 10}]}
+            for i in range(10)]
         workload = {
             "data": iterations, "sla": {}, "pass_sla": True,
             "position": 0,
@@ -82,6 +85,18 @@ class PlotTestCase(test.TestCase):
              "output_errors": [],
              "sla": {}, "sla_success": True, "table": "main_stats"},
             result)
+        for mock_ins in (mock_charts.MainStatsTable,
+                         mock_charts.MainStackedAreaChart,
+                         mock_charts.AtomicStackedAreaChart,
+                         mock_charts.LoadProfileChart,
+                         mock_charts.MainHistogramChart,
+                         mock_charts.AtomicHistogramChart,
+                         mock_charts.AtomicAvgChart):
+            mock_ins.assert_called_once_with(workload)
+            columns = mock_ins.return_value.add_columns.call_args[0][0]
+            self.assertEqual(list(range(5, 15)), list(columns.duration))
+            self.assertEqual(list(range(10, 20)),
+                             list(columns.atomics["foo_action"]))
 
     @ddt.data(
         {"hooks": [], "expected": []},
@@ -218,7 +233,8 @@ class PlotTestCase(test.TestCase):
 
     @ddt.data({},
               {"include_libs": True},
-              {"include_libs": False})
+              {"include_libs": False},
+              {"workers": 4})
     @ddt.unpack
     @mock.patch(PLOT + "_process_workloads")
     @mock.patch(PLOT + "ui_utils.get_template")
@@ -233,16 +249,138 @@ class PlotTestCase(test.TestCase):
 
         self.assertEqual(html, "tasks_html")
         mock_get_template.assert_called_once_with("task/report.html")
-        mock__process_workloads.assert_called_once_with(["foo", "bar"])
-        if "include_libs" in ddt_kwargs:
-            mock_get_template.return_value.render.assert_called_once_with(
-                version="42.0", data="\"scenarios\"",
-                source="\"source\"",
-                include_libs=ddt_kwargs["include_libs"])
-        else:
-            mock_get_template.return_value.render.assert_called_once_with(
-                version="42.0", data="\"scenarios\"",
-                source="\"source\"", include_libs=False)
+        mock__process_workloads.assert_called_once_with(
+            ["foo", "bar"], ddt_kwargs.get("workers", 1))
+        mock_get_template.return_value.render.assert_called_once_with(
+            version="42.0", data="\"scenarios\"", source="\"source\"",
+            include_libs=ddt_kwargs.get("include_libs", False))
+
+    @ddt.data({"workers": 1, "count": 3},
+              {"workers": 4, "count": 1},
+              {"workers": 0, "count": 1, "cpu_count": 4})
+    @ddt.unpack
+    @mock.patch(PLOT + "multiprocessing")
+    @mock.patch(PLOT + "_process_workload")
+    def test__iter_processed_workloads_sequentially(
+            self, mock__process_workload, mock_multiprocessing, workers,
+            count, cpu_count=1):
+        mock_multiprocessing.cpu_count.return_value = cpu_count
+        mock__process_workload.side_effect = lambda w, cfg, pos: (w, pos)
+        prepared = [("w%s" % i, "cfg", i) for i in range(count)]
+
+        self.assertEqual(
+            [("w%s" % i, i) for i in range(count)],
+            list(plot._iter_processed_workloads(prepared, workers)))
+        self.assertFalse(mock_multiprocessing.Pool.called)
+
+    @ddt.data({"workers": 2, "processes": 2},
+              {"workers": 8, "processes": 3},
+              {"workers": 0, "processes": 2, "cpu_count": 2})
+    @ddt.unpack
+    @mock.patch(PLOT + "multiprocessing")
+    def test__iter_processed_workloads_in_pool(self, mock_multiprocessing,
+                                               workers, processes,
+                                               cpu_count=1):
+        mock_multiprocessing.cpu_count.return_value = cpu_count
+        mock_pool = mock_multiprocessing.Pool.return_value
+        submitted = []
+
+        def apply_async(func, args):
+            self.assertEqual(plot._process_prepared_workload, func)
+            submitted.append(args[0])
+            return mock.Mock(**{"get.return_value": args[0][0]["name"]})
+
+        mock_pool.apply_async.side_effect = apply_async
+        data = [mock.MagicMock() for i in range(3)]
+        prepared = [({"name": "w%s" % i, "data": data[i]}, "cfg", 0)
+                    for i in range(3)]
+
+        results = plot._iter_processed_workloads(prepared, workers)
+        self.assertEqual("w0", next(results))
+        # workloads are submitted only within the window of the processes
+        # count
+        self.assertEqual(prepared[:min(processes + 1, 3)], submitted)
+        self.assertEqual(["w1", "w2"], list(results))
+        mock_multiprocessing.Pool.assert_called_once_with(
+            processes, plot._init_worker)
+        # lazy workload data is read by the processes, not here
+        self.assertEqual(prepared, submitted)
+        for d in data:
+            self.assertFalse(d.__iter__.called)
+        mock_pool.close.assert_called_once_with()
+        mock_pool.terminate.assert_called_once_with()
+        mock_pool.join.assert_called_once_with()
+
+    @mock.patch(PLOT + "db.engine_reset_after_fork")
+    def test__init_worker(self, mock_engine_reset_after_fork):
+        plot._init_worker()
+        mock_engine_reset_after_fork.assert_called_once_with()
+
+    @mock.patch(PLOT + "multiprocessing")
+    def test__iter_processed_workloads_in_pool_fails(self,
+                                                     mock_multiprocessing):
+        mock_pool = mock_multiprocessing.Pool.return_value
+        mock_pool.apply_async.return_value.get.side_effect = RuntimeError
+        prepared = [({"name": "w1", "data": []}, "cfg", 0),
+                    ({"name": "w2", "data": []}, "cfg", 0)]
+
+        self.assertRaises(RuntimeError, list,
+                          plot._iter_processed_workloads(prepared, 2))
+        self.assertFalse(mock_pool.close.called)
+        mock_pool.terminate.assert_called_once_with()
+        mock_pool.join.assert_called_once_with()
+
+    @mock.patch(PLOT + "_process_workload")
+    def test__iter_processed_workloads_with_real_pool(self,
+                                                      mock__process_workload):
+        mock__process_workload.side_effect = lambda w, cfg, pos: {
+            "name": w["name"], "pos": pos}
+        prepared = [({"name": "Foo.bar_%s" % i, "data": []}, {}, i)
+                    for i in range(10)]
+
+        self.assertEqual(
+            [{"name": "Foo.bar_%s" % i, "pos": i} for i in range(10)],
+            list(plot._iter_processed_workloads(prepared, 3)))
+
+    @mock.patch(PLOT + "_process_workload")
+    @mock.patch(PLOT + "objects.Workload.format_workload_config")
+    @mock.patch(PLOT + "ui_utils.get_template")
+    @mock.patch("rally.common.version.version_string", return_value="42.0")
+    def test_write_plot(self, mock_version_string, mock_get_template,
+                        mock_format_workload_config, mock__process_workload):
+        mock_get_template.return_value.render.side_effect = (
+            lambda **kw: "<%(version)s|%(source)s|%(data)s|%(include_libs)s>"
+            % kw)
+        mock_format_workload_config.side_effect = lambda w: w["name"]
+        mock__process_workload.side_effect = lambda w, cfg, pos: {
+            "cfg": cfg, "pos": pos}
+
+        def get_tasks():
+            return [{"subtasks": [{"workloads": [{"name": "Foo.b",
+                                                  "data": []},
+                                                 {"name": "Foo.a",
+                                                  "data": []}]},
+                                  {"workloads": [{"name": "Foo.b",
+                                                  "data": []}]}]},
+                    {"subtasks": [{"workloads": [{"name": "Bar.c",
+                                                  "data": []}]}]}]
+
+        stream = six.StringIO()
+        plot.write_plot(get_tasks(), stream, include_libs=True, workers=2)
+
+        self.assertEqual(plot.plot(get_tasks(), include_libs=True),
+                         stream.getvalue())
+        self.assertEqual(
+            "<42.0|%s|%s|True>" % (
+                json.dumps(json.dumps({"Foo.b": ["Foo.b", "Foo.b"],
+                                       "Foo.a": ["Foo.a"],
+                                       "Bar.c": ["Bar.c"]},
+                                      indent=2, sort_keys=True)),
+                json.dumps([{"cfg": "Bar.c", "pos": 0},
+                            {"cfg": "Foo.a", "pos": 0},
+                            {"cfg": "Foo.b", "pos": 0},
+                            {"cfg": "Foo.b", "pos": 1}])),
+            stream.getvalue())
 
     @mock.patch(PLOT + "objects.Workload.format_workload_config")
     @mock.patch(PLOT + "objects.Task")
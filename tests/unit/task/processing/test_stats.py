@@ -0,0 +1,121 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+
+from rally.task.processing import charts
+from rally.task.processing import stats
+from tests.unit import test
+
+
+def generate_iterations(count, error_every=0, atomics_count=1):
+    iterations = []
+    for i in range(count):
+        error = []
+        if error_every and not i % error_every:
+            error = ["Error", "msg", ""]
+        iterations.append({
+            "duration": 1.5 + i % 7, "timestamp": i, "idle_duration": 0,
+            "error": error, "output": {"additive": [], "complete": []},
+            "atomic_actions": [
+                {"name": "foo", "started_at": 0,
+                 "finished_at": 0.1 * (i % 5 + 1)}] * atomics_count + [
+                {"name": "bar", "started_at": 0,
+                 "finished_at": 0.2 + i % 3}]})
+    return iterations
+
+
+@ddt.ddt
+class WorkloadStatsTestCase(test.TestCase):
+
+    def _get_stats(self, iterations):
+        workload_stats = stats.WorkloadStats()
+        for iteration in iterations:
+            workload_stats.add_iteration(iteration)
+        return workload_stats
+
+    def _get_main_stats_table(self, iterations, atomics):
+        table = charts.MainStatsTable(
+            {"total_iteration_count": len(iterations),
+             "statistics": {"atomics": atomics}})
+        for iteration in iterations:
+            table.add_iteration(iteration)
+        return table.to_dict()
+
+    @ddt.data({"count": 1},
+              {"count": 10},
+              {"count": 42, "error_every": 3},
+              {"count": 100, "error_every": 1})
+    @ddt.unpack
+    def test_to_dict(self, count, error_every=0):
+        iterations = generate_iterations(count, error_every)
+
+        result = self._get_stats(iterations).to_dict()
+
+        durations = [i["duration"] for i in iterations]
+        self.assertEqual(count, result["total_iteration_count"])
+        self.assertEqual(len([i for i in iterations if i["error"]]),
+                         result["failed_iteration_count"])
+        self.assertEqual(min(durations), result["min_duration"])
+        self.assertEqual(max(durations), result["max_duration"])
+        self.assertEqual(["foo", "bar"],
+                         list(result["statistics"]["atomics"]))
+        self.assertEqual(
+            self._get_main_stats_table(iterations,
+                                       result["statistics"]["atomics"]),
+            result["statistics"]["durations"])
+
+    def test_to_dict_with_multiple_atomic_calls(self):
+        iterations = (generate_iterations(3) +
+                      generate_iterations(5, atomics_count=2) +
+                      generate_iterations(4))
+
+        result = self._get_stats(iterations).to_dict()
+
+        atomics = result["statistics"]["atomics"]
+        self.assertEqual(2, atomics["foo"]["count"])
+        self.assertEqual(1, atomics["bar"]["count"])
+        durations = result["statistics"]["durations"]
+        self.assertEqual(["foo (x2)", "bar"],
+                         [row["name"] for row in durations["atomics"]])
+        self.assertEqual(5, durations["atomics"][0]["count"])
+        self.assertEqual(12, durations["atomics"][1]["count"])
+        self.assertEqual(self._get_main_stats_table(iterations, atomics),
+                         durations)
+
+    def test_to_dict_without_iterations(self):
+        result = stats.WorkloadStats().to_dict()
+
+        self.assertEqual(0, result["total_iteration_count"])
+        self.assertEqual(0, result["failed_iteration_count"])
+        self.assertEqual(0, result["min_duration"])
+        self.assertEqual(0, result["max_duration"])
+        self.assertEqual({}, result["statistics"]["atomics"])
+        self.assertEqual(
+            {"total": {"name": "total", "count": 0, "min": "n/a",
+                       "median": "n/a", "90%ile": "n/a", "95%ile": "n/a",
+                       "max": "n/a", "avg": "n/a", "success": "n/a"},
+             "atomics": []},
+            result["statistics"]["durations"])
+
+    def test_merge(self):
+        iterations = (generate_iterations(10, error_every=4) +
+                      generate_iterations(7, atomics_count=2) +
+                      generate_iterations(20, error_every=2))
+        expected = self._get_stats(iterations).to_dict()
+
+        for chunk_size in (1, 5, 10, 16):
+            workload_stats = stats.WorkloadStats()
+            for i in range(0, len(iterations), chunk_size):
+                workload_stats.merge(
+                    self._get_stats(iterations[i:i + chunk_size]))
+            self.assertEqual(expected, workload_stats.to_dict())
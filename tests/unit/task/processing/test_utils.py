@@ -14,6 +14,8 @@
 #    under the License.
 
 import collections
+import math
+
 import ddt
 
 from rally.task.processing import utils
@@ -95,3 +97,94 @@ class AtomicMergerTestCase(test.TestCase):
         self.assertEqual(collections.OrderedDict([("foo", 1.1),
                                                   ("bar (x2)", 2.4)]),
                          atomic_merger.merge_atomic_actions(atomic_actions))
+
+        atomic_actions = [{"name": "bar",
+                           "started_at": 2.3,
+                           "finished_at": 3.5},
+                          {"name": "spam",
+                           "started_at": 0,
+                           "finished_at": 2.3},
+                          {"name": "foo",
+                           "started_at": 0,
+                           "finished_at": 1.1},
+                          {"name": "bar",
+                           "started_at": 1.1,
+                           "finished_at": 2.3},
+                          {"name": "foo",
+                           "started_at": 2.3,
+                           "finished_at": 3.5}]
+        self.assertEqual(collections.OrderedDict([("bar (x2)", 2.4)]),
+                         atomic_merger.merge_atomic_actions(atomic_actions))
+
+
+class IterationColumnsTestCase(test.TestCase):
+
+    def test_add_iteration(self):
+        workload = {"statistics": {"atomics": collections.OrderedDict(
+            [("foo", {"count": 1}), ("bar", {"count": 2})])}}
+        columns = utils.IterationColumns(workload)
+        columns.add_iteration(
+            {"timestamp": 10, "duration": 3, "idle_duration": 1,
+             "error": [],
+             "atomic_actions": [
+                 {"name": "foo", "started_at": 0, "finished_at": 1.5},
+                 {"name": "bar", "started_at": 1.5, "finished_at": 2},
+                 {"name": "bar", "started_at": 2, "finished_at": 3},
+                 {"name": "spam", "started_at": 3, "finished_at": 4}]})
+        columns.add_iteration(
+            {"timestamp": 11, "duration": 2, "error": ["Error", "", ""],
+             "atomic_actions": [
+                 {"name": "bar", "started_at": 0, "finished_at": 2}]})
+
+        self.assertEqual(2, len(columns))
+        self.assertEqual([10, 11], list(columns.timestamp))
+        self.assertEqual([3, 2], list(columns.duration))
+        self.assertEqual([1, 0], list(columns.idle_duration))
+        self.assertEqual([0, 1], list(columns.failed))
+        self.assertEqual(["foo", "bar (x2)"], list(columns.atomics))
+        self.assertEqual(1.5, columns.atomics["foo"][0])
+        self.assertTrue(math.isnan(columns.atomics["foo"][1]))
+        self.assertEqual(1.5, columns.atomics["bar (x2)"][0])
+        self.assertTrue(math.isnan(columns.atomics["bar (x2)"][1]))
+
+    def test_iterations(self):
+        workload = {"statistics": {"atomics": collections.OrderedDict(
+            [("foo", {"count": 1}), ("bar", {"count": 2})])}}
+        columns = utils.IterationColumns(workload)
+        columns.add_iteration(
+            {"timestamp": 10, "duration": 3, "idle_duration": 1,
+             "error": [],
+             "atomic_actions": [
+                 {"name": "bar", "started_at": 0, "finished_at": 1},
+                 {"name": "foo", "started_at": 1, "finished_at": 1.5},
+                 {"name": "bar", "started_at": 2, "finished_at": 3}]})
+        columns.add_iteration(
+            {"timestamp": 11, "duration": 2, "error": ["Error", "", ""],
+             "atomic_actions": [
+                 {"name": "foo", "started_at": 0, "finished_at": 2}]})
+
+        iterations = list(columns.iterations())
+        self.assertEqual(
+            [{"timestamp": 10, "duration": 3, "idle_duration": 1,
+              "error": [], "output": {"additive": [], "complete": []},
+              "atomic_actions": [
+                  {"name": "foo", "started_at": 0, "finished_at": 0.5,
+                   "children": []},
+                  {"name": "bar", "started_at": 0, "finished_at": 2,
+                   "children": []},
+                  {"name": "bar", "started_at": 0, "finished_at": 0,
+                   "children": []}]},
+             {"timestamp": 11, "duration": 2, "idle_duration": 0,
+              "error": ["", "", ""],
+              "output": {"additive": [], "complete": []},
+              "atomic_actions": [
+                  {"name": "foo", "started_at": 0, "finished_at": 2,
+                   "children": []}]}],
+            iterations)
+
+        rebuilt = utils.IterationColumns(workload)
+        for iteration in iterations:
+            rebuilt.add_iteration(iteration)
+        self.assertEqual(list(columns.failed), list(rebuilt.failed))
+        self.assertEqual([2.0], list(rebuilt.atomics["bar (x2)"])[:1])
+        self.assertTrue(math.isnan(rebuilt.atomics["bar (x2)"][1]))
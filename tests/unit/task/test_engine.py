@@ -26,6 +26,7 @@ from rally.common import validation
 from rally import consts
 from rally import exceptions
 from rally.task import engine
+from rally.task.processing import stats
 from tests.unit import fakes
 from tests.unit import test
 
@@ -629,6 +630,74 @@ class TaskEngineTestCase(test.TestCase):
         mock_scenario_get.assert_called_once_with(name)
 
 
+class WorkloadDataWriterTestCase(test.TestCase):
+
+    def test_write_chunks(self):
+        workload = mock.Mock(spec=objects.Workload)
+        writer = engine.WorkloadDataWriter(workload, batch_size=2,
+                                           queue_size=5)
+        for i in range(5):
+            writer.add(i, {"raw": [i]})
+
+        writer.start()
+        writer.close()
+
+        self.assertEqual(
+            [mock.call([(0, {"raw": [0]}), (1, {"raw": [1]})]),
+             mock.call([(2, {"raw": [2]}), (3, {"raw": [3]})]),
+             mock.call([(4, {"raw": [4]})])],
+            workload.add_workload_data_chunks.call_args_list)
+
+    def test_add_waits_for_space_in_queue(self):
+        workload = mock.Mock(spec=objects.Workload)
+        is_writing = threading.Event()
+        can_write = threading.Event()
+
+        def add_workload_data_chunks(chunks):
+            is_writing.set()
+            can_write.wait()
+
+        workload.add_workload_data_chunks.side_effect = (
+            add_workload_data_chunks)
+        writer = engine.WorkloadDataWriter(workload, batch_size=10,
+                                           queue_size=1)
+        writer.start()
+        writer.add(0, {"raw": []})
+        is_writing.wait()
+        writer.add(1, {"raw": []})
+
+        adder = threading.Thread(target=writer.add, args=(2, {"raw": []}))
+        adder.start()
+        adder.join(0.2)
+        self.assertTrue(adder.is_alive())
+
+        can_write.set()
+        adder.join()
+        writer.close()
+        self.assertEqual(
+            [0, 1, 2],
+            [chunk[0] for call in
+             workload.add_workload_data_chunks.call_args_list
+             for chunk in call[0][0]])
+
+    @mock.patch("rally.task.engine.LOG")
+    def test_write_chunks_failed(self, mock_log):
+        workload = mock.Mock(spec=objects.Workload)
+        workload.add_workload_data_chunks.side_effect = [
+            MyException(), None]
+        writer = engine.WorkloadDataWriter(workload, batch_size=1,
+                                           queue_size=2)
+        writer.add(0, {"raw": []})
+        writer.add(1, {"raw": []})
+
+        writer.start()
+        self.assertRaises(MyException, writer.close)
+
+        self.assertEqual(2, workload.add_workload_data_chunks.call_count)
+        mock_log.error.assert_called_once_with(
+            "Failed to store chunks [0] of workload data: MyException")
+
+
 class ResultConsumerTestCase(test.TestCase):
 
     @mock.patch("rally.common.objects.Task.get_status")
@@ -696,7 +765,7 @@ class ResultConsumerTestCase(test.TestCase):
         self.assertFalse(workload.add_workload_data.called)
         workload.set_results.assert_called_once_with(
             full_duration=1, sla_results=mock_sla_results, load_duration=0,
-            start_time=None)
+            start_time=None, stats=stats.WorkloadStats().to_dict())
 
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
@@ -808,6 +877,37 @@ class ResultConsumerTestCase(test.TestCase):
         mock_sla_instance.set_unexpected_failure.assert_has_calls(
             [mock.call(exc)])
 
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_with_failed_data_writer(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_log):
+        mock_sla_instance = mock.MagicMock()
+        mock_sla_checker.return_value = mock_sla_instance
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        task = mock.MagicMock()
+        subtask = mock.Mock(spec=objects.Subtask)
+        workload = mock.Mock(spec=objects.Workload)
+        exc = MyException()
+        workload.add_workload_data_chunks.side_effect = exc
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque(
+            [[{"duration": 1, "timestamp": 3}]])
+        runner.event_queue = collections.deque()
+
+        with engine.ResultConsumer(key, task, subtask, workload,
+                                   runner, False):
+            pass
+
+        mock_sla_instance.set_unexpected_failure.assert_called_once_with(exc)
+        workload.set_results.assert_called_once_with(
+            load_duration=mock.ANY, full_duration=mock.ANY,
+            sla_results=mock_sla_instance.results.return_value,
+            start_time=3, stats=mock.ANY)
+
     @mock.patch("rally.task.engine.CONF")
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
@@ -816,6 +916,8 @@ class ResultConsumerTestCase(test.TestCase):
             self, mock_sla_checker, mock_result_consumer_wait_and_abort,
             mock_task_get_status, mock_conf):
         mock_conf.raw_result_chunk_size = 2
+        mock_conf.raw_result_write_batch_size = 10
+        mock_conf.raw_result_write_queue_size = 10
         mock_sla_instance = mock.MagicMock()
         mock_sla_checker.return_value = mock_sla_instance
         mock_task_get_status.return_value = consts.TaskStatus.RUNNING
@@ -853,14 +955,18 @@ class ResultConsumerTestCase(test.TestCase):
         self.assertEqual([{"duration": 7, "timestamp": 1}],
                          consumer_obj.results)
 
-        workload.add_workload_data.assert_has_calls([
-            mock.call(0, {"raw": [{"duration": 2, "timestamp": 2},
-                                  {"duration": 1, "timestamp": 3}]}),
-            mock.call(1, {"raw": [{"duration": 4, "timestamp": 2},
-                                  {"duration": 3, "timestamp": 3}]}),
-            mock.call(2, {"raw": [{"duration": 6, "timestamp": 2},
-                                  {"duration": 5, "timestamp": 3}]}),
-            mock.call(3, {"raw": [{"duration": 7, "timestamp": 1}]})])
+        chunks = [chunk for call in
+                  workload.add_workload_data_chunks.call_args_list
+                  for chunk in call[0][0]]
+        self.assertEqual([
+            (0, {"raw": [{"duration": 2, "timestamp": 2},
+                         {"duration": 1, "timestamp": 3}]}),
+            (1, {"raw": [{"duration": 4, "timestamp": 2},
+                         {"duration": 3, "timestamp": 3}]}),
+            (2, {"raw": [{"duration": 6, "timestamp": 2},
+                         {"duration": 5, "timestamp": 3}]}),
+            (3, {"raw": [{"duration": 7, "timestamp": 1}]})], chunks)
+        self.assertFalse(workload.add_workload_data.called)
 
     @mock.patch("rally.task.engine.LOG")
     @mock.patch("rally.task.hook.HookExecutor")
@@ -916,7 +1022,8 @@ class ResultConsumerTestCase(test.TestCase):
             load_duration=0,
             sla_results=mock_sla_results,
             hooks_results=mock_hook_results,
-            start_time=None)
+            start_time=None,
+            stats=stats.WorkloadStats().to_dict())
 
     @mock.patch("rally.task.engine.threading.Thread")
     @mock.patch("rally.task.engine.threading.Event")
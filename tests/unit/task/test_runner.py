@@ -15,11 +15,15 @@
 
 import collections
 import multiprocessing
+import threading
+import time
 
 import ddt
 import mock
 
+from rally.common import utils as rutils
 from rally.plugins.common.runners import serial
+from rally.task.processing import charts
 from rally.task import runner
 from tests.unit import fakes
 from tests.unit import test
@@ -129,6 +133,264 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
                          ["Exception", "Something went wrong"])
 
 
+class AddStartLagTestCase(test.TestCase):
+
+    def test_add_start_lag(self):
+        result = {"output": {"additive": [], "complete": []}}
+        runner.add_start_lag(result, 0.5)
+        runner.add_start_lag(result, -0.001)
+
+        self.assertEqual([0.5, 0.0], [o["data"][0][1]
+                                      for o in result["output"]["additive"]])
+        for output in result["output"]["additive"]:
+            self.assertIsNone(charts.validate_output("additive", output))
+
+
+class WorkerThreadPoolTestCase(test.TestCase):
+
+    def _run_pool(self, size, times, method_name="do_it", timeout=0):
+        result_queue = collections.deque()
+        event_queue = collections.deque()
+        pool = runner.WorkerThreadPool(
+            size, rutils.DequeAsQueue(result_queue), fakes.FakeScenario,
+            method_name, {"task": {"uuid": "uuid"}}, {},
+            rutils.DequeAsQueue(event_queue), timeout=timeout)
+        for i in range(times):
+            pool.wait_for_slot()
+            pool.submit(i)
+        started_threads = len(pool._threads)
+        pool.join()
+        return result_queue, event_queue, started_threads
+
+    def test_submit_and_join(self):
+        results, events, threads = self._run_pool(3, 10)
+
+        self.assertEqual(10, len(results))
+        self.assertEqual(list(range(1, 11)),
+                         sorted(e["value"] for e in events))
+        self.assertLessEqual(threads, 3)
+        for result in results:
+            self.assertEqual([], result["error"])
+
+    def test_submit_with_timeout(self):
+        results, events, threads = self._run_pool(2, 4, timeout=10)
+
+        self.assertEqual(4, len(results))
+        self.assertLessEqual(threads, 2)
+
+    def test_submit_failed_iterations(self):
+        results, events, threads = self._run_pool(
+            2, 4, method_name="something_went_wrong")
+
+        self.assertEqual(4, len(results))
+        for result in results:
+            self.assertEqual("Something went wrong", result["error"][1])
+
+    @mock.patch(BASE + "_run_scenario_once", side_effect=[RuntimeError, {}])
+    def test_thread_survives_unexpected_error(self, mock__run_scenario_once):
+        results, events, threads = self._run_pool(1, 2)
+
+        self.assertEqual([{}], list(results))
+        self.assertEqual(1, threads)
+
+    def test_submit_with_scheduled_at(self):
+        result_queue = collections.deque()
+        pool = runner.WorkerThreadPool(
+            1, rutils.DequeAsQueue(result_queue), fakes.FakeScenario,
+            "do_it", {"task": {"uuid": "uuid"}}, {}, mock.Mock())
+        pool.wait_for_slot()
+        pool.submit(0, scheduled_at=time.time() - 10)
+        pool.wait_for_slot()
+        pool.submit(1)
+        pool.join()
+
+        results = sorted(result_queue,
+                         key=lambda r: len(r["output"]["additive"]))
+        self.assertEqual([], results[0]["output"]["additive"])
+        lag_output = results[1]["output"]["additive"]
+        self.assertEqual(1, len(lag_output))
+        self.assertEqual("Start lag", lag_output[0]["title"])
+        self.assertGreaterEqual(lag_output[0]["data"][0][1], 10)
+
+    def test_release_slot(self):
+        pool = runner.WorkerThreadPool(1, None, None, None, None, None, None)
+        pool.wait_for_slot()
+        pool.release_slot()
+        pool.wait_for_slot()
+        pool.release_slot()
+        pool.join()
+        self.assertEqual([], pool._threads)
+
+    @mock.patch(BASE + "rutils")
+    def test_iteration_handle(self, mock_rutils):
+        thread = mock.Mock(ident=42)
+        handle = runner._IterationHandle(thread)
+
+        self.assertEqual(42, handle.ident)
+        self.assertTrue(handle.isAlive())
+        handle.finish()
+        self.assertFalse(handle.isAlive())
+        handle.terminate()
+        self.assertFalse(mock_rutils.terminate_thread.called)
+        self.assertFalse(mock_rutils.cancel_thread_termination.called)
+
+    @mock.patch(BASE + "rutils")
+    def test_iteration_handle_terminate(self, mock_rutils):
+        handle = runner._IterationHandle(mock.Mock(ident=42))
+
+        handle.terminate()
+        handle.terminate()
+        mock_rutils.terminate_thread.assert_called_once_with(42)
+        self.assertFalse(handle.isAlive())
+
+        handle.finish()
+        mock_rutils.cancel_thread_termination.assert_called_once_with(42)
+        self.assertFalse(handle.isAlive())
+
+    def test_timeout_at_the_end_of_iteration(self):
+        handles = []
+        timed_out = collections.deque()
+
+        class IterationHandle(runner._IterationHandle):
+            def __init__(self, thread):
+                super(IterationHandle, self).__init__(thread)
+                handles.append(self)
+
+        def timeout_thread():
+            while True:
+                if not timed_out:
+                    time.sleep(0.001)
+                    continue
+                handle = timed_out[0]
+                if handle is None:
+                    return
+                handle.terminate()
+                timed_out.popleft()
+
+        def run_scenario_once(cls, method_name, context, args, event_queue):
+            if context["iteration"] % 2:
+                # NOTE: the timeout fires right as the iteration completes.
+                #     Threading primitives are not used here, since the
+                #     timeout exception can leave them in a broken state.
+                timed_out.append(handles[-1])
+                while timed_out:
+                    pass
+            return {"iteration": context["iteration"], "error": [],
+                    "output": {"additive": [], "complete": []}}
+
+        timeout = threading.Thread(target=timeout_thread)
+        timeout.start()
+
+        result_queue = collections.deque()
+        pool = runner.WorkerThreadPool(
+            1, rutils.DequeAsQueue(result_queue), fakes.FakeScenario,
+            "do_it", {"task": {"uuid": "uuid"}}, {}, mock.Mock())
+        with mock.patch(BASE + "_IterationHandle", IterationHandle):
+            with mock.patch(BASE + "_run_scenario_once",
+                            side_effect=run_scenario_once):
+                for i in range(100):
+                    pool.wait_for_slot()
+                    pool.submit(i, scheduled_at=time.time())
+                pool.join()
+        timed_out.append(None)
+        timeout.join()
+
+        self.assertEqual(100, len(result_queue))
+        for i, result in enumerate(result_queue):
+            if result["error"]:
+                # NOTE: the timeout exception came before the result of
+                #     the terminated iteration was stored
+                self.assertEqual(1, (i + 1) % 2)
+                self.assertEqual("ThreadTimeoutException", result["error"][0])
+            else:
+                self.assertEqual(i + 1, result["iteration"])
+        # NOTE: the slot is released
+        self.assertTrue(pool._slots.acquire(False))
+
+
+class BatchedQueueTestCase(test.TestCase):
+
+    def test_put_and_flush(self):
+        channel = mock.Mock()
+        queue = runner.BatchedQueue(channel, "foo", batch_size=3,
+                                    flush_interval=1000)
+
+        queue.put(1)
+        queue.put(2)
+        self.assertFalse(channel.put.called)
+        queue.put(3)
+        channel.put.assert_called_once_with(("foo", [1, 2, 3]))
+
+        queue.put(4)
+        queue.flush()
+        self.assertEqual([mock.call(("foo", [1, 2, 3])),
+                          mock.call(("foo", [4]))],
+                         channel.put.call_args_list)
+        self.assertFalse(queue._flusher.is_alive())
+
+    def test_put_flushed_by_interval(self):
+        channel = mock.Mock()
+        queue = runner.BatchedQueue(channel, "foo", batch_size=100,
+                                    flush_interval=0.001)
+
+        queue.put(1)
+        for i in range(1000):
+            if channel.put.called:
+                break
+            time.sleep(0.001)
+        queue.flush()
+        channel.put.assert_called_once_with(("foo", [1]))
+
+    def test_put_from_several_threads(self):
+        channel = mock.Mock()
+        queue = runner.BatchedQueue(channel, "foo", batch_size=1000,
+                                    flush_interval=1000)
+
+        threads = [threading.Thread(target=queue.put, args=(i,))
+                   for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        queue.flush()
+
+        channel.put.assert_called_once_with(("foo", mock.ANY))
+        self.assertEqual(list(range(10)),
+                         sorted(channel.put.call_args[0][0][1]))
+
+    def test_flush_without_items(self):
+        channel = mock.Mock()
+        queue = runner.BatchedQueue(channel, "foo")
+
+        queue.flush()
+        self.assertFalse(channel.put.called)
+
+    def test_close(self):
+        channel = mock.Mock()
+        runner.BatchedQueue(channel, "foo").close()
+        channel.close.assert_called_once_with()
+
+    @mock.patch(BASE + "os.getpid", return_value=42)
+    def test__run_worker_process(self, mock_getpid):
+        channel = mock.Mock()
+        result_queue = runner.BatchedQueue(channel, "result")
+        event_queue = runner.BatchedQueue(channel, "event")
+
+        def worker_process(result_queue, foo, event_queue, info):
+            event_queue.put({"type": "iteration", "value": 1})
+            result_queue.put(foo)
+
+        runner._run_worker_process(worker_process, result_queue, "foo",
+                                   event_queue, info={})
+
+        self.assertEqual(
+            [mock.call(("event", [{"type": "iteration", "value": 1}])),
+             mock.call(("result", ["foo"])),
+             mock.call((runner.BatchedQueue.EXIT, 42))],
+            sorted(channel.put.call_args_list[:2]) +
+            channel.put.call_args_list[2:])
+
+
 @ddt.ddt
 class ScenarioRunnerTestCase(test.TestCase):
 
@@ -201,6 +463,55 @@ class ScenarioRunnerTestCase(test.TestCase):
         self.assertEqual(processes, process.join.call_count)
         mock_result_queue.close.assert_called_once_with()
 
+    @mock.patch(BASE + "ScenarioRunner.send_event")
+    @mock.patch(BASE + "ScenarioRunner._send_result")
+    def test__join_processes_with_batched_queues(
+            self, mock_scenario_runner__send_result,
+            mock_scenario_runner_send_event):
+        processes = [mock.Mock(pid=i) for i in range(3)]
+        # the last process is killed without sending of the exit message
+        processes[-1].is_alive.return_value = False
+        channel = mock.Mock()
+        channel.get.side_effect = [
+            ("result", ["r1", "r2"]),
+            ("event", [{"type": "iteration", "value": 1}]),
+            (runner.BatchedQueue.EXIT, 0),
+            runner.Queue.Empty(),
+            (runner.BatchedQueue.EXIT, 1)]
+        channel.get_nowait.side_effect = [("result", ["r3"]),
+                                          runner.Queue.Empty()]
+        result_queue = runner.BatchedQueue(channel, "result")
+        event_queue = runner.BatchedQueue(channel, "event")
+
+        runner_obj = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+        process_pool = collections.deque(processes)
+        runner_obj._join_processes(process_pool, result_queue, event_queue)
+
+        self.assertEqual(0, len(process_pool))
+        for process in processes:
+            process.join.assert_called_once_with()
+        self.assertFalse(processes[0].is_alive.called)
+        self.assertEqual(
+            [mock.call("r1"), mock.call("r2"), mock.call("r3")],
+            mock_scenario_runner__send_result.call_args_list)
+        mock_scenario_runner_send_event.assert_called_once_with(
+            type="iteration", value=1)
+        channel.get.assert_called_with(
+            timeout=runner_obj.WORKER_CHECK_INTERVAL)
+        channel.close.assert_called_once_with()
+
+    @mock.patch(BASE + "multiprocessing.Queue")
+    def test__create_queues(self, mock_queue):
+        result_queue, event_queue = runner.ScenarioRunner._create_queues()
+
+        self.assertIsInstance(result_queue, runner.BatchedQueue)
+        self.assertIsInstance(event_queue, runner.BatchedQueue)
+        self.assertEqual(mock_queue.return_value, result_queue.channel)
+        self.assertEqual(mock_queue.return_value, event_queue.channel)
+        self.assertNotEqual(result_queue.tag, event_queue.tag)
+
     def _get_runner(self, task="mock_me", config="mock_me", batch_size=0):
         class ScenarioRunner(runner.ScenarioRunner):
             def _run_scenario(self, *args, **kwargs):
@@ -442,8 +442,9 @@ class TaskAPITestCase(test.TestCase):
         mock_task_exporter.make.assert_called_once_with(
             reporter, [t.to_dict.return_value for t in tasks],
             output_dest, api=self.task_inst.api)
-        self.assertEqual([mock.call(u, detailed=True) for u in task_id],
-                         mock_task_get.call_args_list)
+        self.assertEqual(
+            [mock.call(u, detailed=True, lazy_data=True) for u in task_id],
+            mock_task_get.call_args_list)
 
     @mock.patch("rally.api.objects.Task")
     def test_get_detailed(self, mock_task):
@@ -452,7 +453,8 @@ class TaskAPITestCase(test.TestCase):
         self.assertEqual(
             task.to_dict.return_value,
             self.task_inst.get(task_id="task_uuid", detailed=True))
-        mock_task.get.assert_called_once_with("task_uuid", detailed=True)
+        mock_task.get.assert_called_once_with("task_uuid", detailed=True,
+                                              lazy_data=False)
         self.assertFalse(task.extend_results.called)
         task.to_dict.assert_called_once_with()
 
@@ -464,9 +466,11 @@ class TaskAPITestCase(test.TestCase):
         tasks = self.task_inst.list()
         self.assertEqual([self.task], tasks)
 
+    @mock.patch("rally.api.stats.WorkloadStats")
     @mock.patch("rally.api.objects.Task")
     @mock.patch("rally.api.objects.Deployment.get")
-    def test_import_results(self, mock_deployment_get, mock_task):
+    def test_import_results(self, mock_deployment_get, mock_task,
+                            mock_workload_stats):
         mock_deployment_get.return_value = fakes.FakeDeployment(
             uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
             status=consts.DeployStatus.DEPLOY_FINISHED)
@@ -483,7 +487,7 @@ class TaskAPITestCase(test.TestCase):
                     "sla": "sla-config",
                     "sla_results": {"sla": "sla=result"},
                     "args": "scen-args",
-                    "data": ["data-raw"]}
+                    "data": [{"timestamp": 1}]}
 
         task_results = {"subtasks": [
             {"title": "subtask-title",
@@ -516,18 +520,22 @@ class TaskAPITestCase(test.TestCase):
         work_load = sub_task.add_workload.return_value
         work_load.add_workload_data.assert_called_once_with(
             0, {"raw": workload["data"]})
+        mock_workload_stats.return_value.add_iteration.assert_called_once_with(
+            {"timestamp": 1})
         work_load.set_results.assert_called_once_with(
             full_duration=workload["full_duration"],
             load_duration=workload["load_duration"],
             sla_results=workload["sla_results"]["sla"],
-            hooks_results=workload["hooks"], start_time=workload["start_time"])
+            hooks_results=workload["hooks"], start_time=workload["start_time"],
+            stats=mock_workload_stats.return_value.to_dict.return_value)
 
+    @mock.patch("rally.api.stats.WorkloadStats")
     @mock.patch("rally.api.objects.Task")
     @mock.patch("rally.api.objects.Deployment.get")
     @mock.patch("rally.api.CONF")
     def test_import_results_chunk_size(self, mock_conf,
                                        mock_deployment_get,
-                                       mock_task):
+                                       mock_task, mock_workload_stats):
         mock_deployment_get.return_value = fakes.FakeDeployment(
             uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
             status=consts.DeployStatus.DEPLOY_FINISHED)
@@ -584,7 +592,38 @@ class TaskAPITestCase(test.TestCase):
             full_duration=workload["full_duration"],
             load_duration=workload["load_duration"],
             sla_results=workload["sla_results"]["sla"],
-            hooks_results=workload["hooks"], start_time=workload["start_time"])
+            hooks_results=workload["hooks"], start_time=workload["start_time"],
+            stats=mock_workload_stats.return_value.to_dict.return_value)
+
+    @mock.patch("rally.api.objects.Task")
+    @mock.patch("rally.api.objects.Deployment.get")
+    def test_import_results_with_several_workloads(self, mock_deployment_get,
+                                                   mock_task):
+        mock_deployment_get.return_value = fakes.FakeDeployment(
+            uuid="deployment_uuid", admin="fake_admin", users=["fake_user"],
+            status=consts.DeployStatus.DEPLOY_FINISHED)
+        workloads = [{"name": "scenario%d" % i, "description": "",
+                      "full_duration": 3, "load_duration": 1,
+                      "start_time": 23.77, "position": i, "runner": {},
+                      "context": {}, "hooks": [], "sla": {},
+                      "sla_results": {"sla": []}, "args": {},
+                      "data": [{"timestamp": i, "duration": 1}]}
+                     for i in range(2)]
+        task_results = {"subtasks": [{"title": "subtask",
+                                      "workloads": workloads}]}
+        sub_task = mock_task.return_value.add_subtask.return_value
+        workload_objs = [mock.Mock(), mock.Mock()]
+        sub_task.add_workload.side_effect = workload_objs
+
+        self.task_inst.import_results(
+            deployment=mock_deployment_get.return_value["uuid"],
+            task_results=task_results)
+
+        for workload, workload_obj in zip(workloads, workload_objs):
+            workload_obj.add_workload_data.assert_called_once_with(
+                0, {"raw": workload["data"]})
+            stats = workload_obj.set_results.call_args[1]["stats"]
+            self.assertEqual(1, stats["total_iteration_count"])
 
     @mock.patch("rally.api.objects.Deployment.get")
     def test_import_results_with_inconsistent_deployment(